@@ -10,7 +10,8 @@ from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import path, reverse
 
-from ladder.models import Season, Player, Ladder, Result, League, LadderSubscription, Prospect, DraftRemoval
+from ladder.snapshot import close_season
+from ladder.models import Season, Player, Ladder, Result, League, LadderSubscription, Prospect, DraftRemoval, Match, PlayerRating
 
 
 # ------------------------------
@@ -137,6 +138,21 @@ class SeasonAdmin(DraftHelpers, admin.ModelAdmin):
     date_hierarchy = "start_date"
     fields = ("name", "start_date", "end_date", "season_round", "is_draft")
     change_form_template = "admin/ladder/season/change_form_with_workspace_link.html"
+    actions = ["close_seasons"]
+
+    @admin.action(description="Close selected seasons (freeze their pages)")
+    def close_seasons(self, request, queryset):
+        closed, skipped = 0, []
+        for season in queryset:
+            if not season.is_closed:
+                skipped.append(str(season))
+                continue
+            close_season(season)
+            closed += 1
+        if closed:
+            self.message_user(request, f"Closed {closed} season(s).", messages.SUCCESS)
+        if skipped:
+            self.message_user(request, f"Not finished yet, left open: {', '.join(skipped)}.", messages.WARNING)
 
     # --- urls ---
 
@@ -287,6 +303,10 @@ class SeasonAdmin(DraftHelpers, admin.ModelAdmin):
             .prefetch_related("league_set__player")
         )
 
+        ratings = dict(
+            PlayerRating.objects.filter(player__league__ladder__season=season).values_list("player_id", "rating")
+        )
+
         divisions = []
         for ladder in ladders:
             rows = []
@@ -319,6 +339,7 @@ class SeasonAdmin(DraftHelpers, admin.ModelAdmin):
                         "total": total,
                         "avg": avg,
                         "played": played,
+                        "rating": ratings.get(player.id),
                     }
                 )
 
@@ -669,6 +690,21 @@ class ResultAdmin(admin.ModelAdmin):
     date_hierarchy = "date_added"
 
 
+@admin.register(Match)
+class MatchAdmin(admin.ModelAdmin):
+    """Read only, matches are derived from results."""
+    list_filter = ["ladder__season"]
+    search_fields = ["winner__first_name", "winner__last_name", "loser__first_name", "loser__last_name"]
+    list_display = ("ladder", "winner", "loser", "losing_score", "date")
+    date_hierarchy = "date"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(LadderSubscription)
 class LadderSubscriptionAdmin(admin.ModelAdmin):
     list_display = ("ladder", "user", "subscribed_at")
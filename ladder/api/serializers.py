@@ -1,4 +1,4 @@
-from ladder.models import Season, Player, Ladder, League, Result
+from ladder.models import Season, Player, Ladder, League, Result, PlayerCareerStats, PlayerRating
 from rest_framework import serializers
 
 
@@ -8,10 +8,25 @@ class SeasonSerializer(serializers.HyperlinkedModelSerializer):
         fields = ['name', 'start_date', 'end_date', 'season_round']
 
 
+class PlayerCareerStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlayerCareerStats
+        fields = ['played', 'won', 'points', 'possible_matches', 'completion']
+
+
+class PlayerRatingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PlayerRating
+        fields = ['rating', 'matches']
+
+
 class PlayerSerializer(serializers.HyperlinkedModelSerializer):
+    career_stats = PlayerCareerStatsSerializer(read_only=True)
+    rating = PlayerRatingSerializer(read_only=True)
+
     class Meta:
         model = Player
-        fields = ['first_name', 'last_name']
+        fields = ['first_name', 'last_name', 'career_stats', 'rating']
 
 
 class LadderSerializer(serializers.HyperlinkedModelSerializer):
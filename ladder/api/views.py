@@ -5,34 +5,54 @@ from ladder.api.serializers import (
     LeagueSerializer,
     ResultSerializer
 )
-from ladder.models import Season, Player, Ladder, League, Result
+from django.db.models import Q
+from django.utils.decorators import method_decorator
+
+from ladder.conditional import condition_on_version
+from ladder.models import Season, Player, Ladder, League, Result, DataVersion
 from rest_framework import permissions, viewsets
 
-class SeasonViewSet(viewsets.ModelViewSet):
+
+def _data_state(request, *args, **kwargs):
+    # list endpoints can show any object, so they change whenever anything is written
+    return DataVersion.summary(Q(scope=DataVersion.SITE))
+
+
+class ConditionalListMixin:
+    """
+    Answers unchanged list requests with 304 Not Modified
+    """
+
+    @method_decorator(condition_on_version(_data_state))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class SeasonViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Season.objects.all()
     serializer_class = SeasonSerializer
     permission_classes = [permissions.DjangoModelPermissionsOrAnonReadOnly]
 
 
-class PlayerViewSet(viewsets.ModelViewSet):
-    queryset = Player.objects.all()
+class PlayerViewSet(ConditionalListMixin, viewsets.ModelViewSet):
+    queryset = Player.objects.select_related('career_stats', 'rating')
     serializer_class = PlayerSerializer
     permission_classes = [permissions.DjangoModelPermissions]
 
 
-class LadderViewSet(viewsets.ModelViewSet):
+class LadderViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Ladder.objects.all()
     serializer_class = LadderSerializer
     permission_classes = [permissions.DjangoModelPermissionsOrAnonReadOnly]
 
 
-class LeagueViewSet(viewsets.ModelViewSet):
+class LeagueViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = League.objects.all()
     serializer_class = LeagueSerializer
     permission_classes = [permissions.DjangoModelPermissionsOrAnonReadOnly]
 
 
-class ResultViewSet(viewsets.ModelViewSet):
+class ResultViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Result.objects.all()
     serializer_class = ResultSerializer
     permission_classes = [permissions.IsAdminUser]
@@ -0,0 +1,57 @@
+import hashlib
+from functools import wraps
+
+from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+"""
+Conditional GET support for pages whose content is covered by ladder data versions.
+The view's state function returns (token, last_modified) for the data it shows, and unchanged pages are
+answered with 304 Not Modified. Browsers are told to revalidate on every use rather than cache blindly.
+"""
+
+
+def _viewer(request):
+    # everything that changes the page for the same data: the user (names, nav), the url and the format asked for
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    return f'{user_id}:{request.get_full_path()}:{request.META.get("HTTP_ACCEPT", "")}'
+
+
+def condition_on_version(state_func):
+    """
+    Decorator for views, state_func(request, *args, **kwargs) returns (token, last_modified) or None to skip
+    validation, e.g. when the object does not exist and the view is left to 404 or redirect.
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            # flashed messages are shown once, so a page carrying them must not be revalidated later
+            if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+                return view(request, *args, **kwargs)
+
+            state = state_func(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+
+            token, last_modified = state
+            etag = quote_etag(hashlib.md5(f'{token}:{_viewer(request)}'.encode()).hexdigest())
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.headers.setdefault('ETag', etag)
+            if timestamp:
+                response.headers.setdefault('Last-Modified', http_date(timestamp))
+            if request.user.is_authenticated:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return inner
+    return decorator
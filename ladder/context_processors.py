@@ -1,15 +1,46 @@
-from ladder.models import Season
+from ladder.models import DataVersion, Season
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+NAVIGATION_CACHE_KEY = 'ladder:navigation'
+
+_local_navigation = (None, None)  # (season list version, data)
+
+
+def _navigation_data():
+    """
+    The navigation for the current version of the season list, which only season saves and deletes move on. Each
+    process keeps its own copy beside the shared one, both are replaced as soon as the version moves.
+    """
+    global _local_navigation
+    version = DataVersion.current(DataVersion.SEASONS, 0).version
+    local_version, data = _local_navigation
+    if data is None or local_version != version:
+        data = cache.get_or_set(f'{NAVIGATION_CACHE_KEY}:{version}', _query_navigation,
+                                settings.LADDER_CACHE_TIMEOUT)
+        _local_navigation = (version, data)
+    return data
+
+
+def _query_navigation():
+    seasons = Season.objects.filter(is_draft=False)
+    return {
+        'navigation': list(seasons.order_by('-start_date')[1:5]),
+        'season_count': seasons.count(),
+        'season_first': seasons.latest('start_date'),
+    }
 
 
 def navigation(request):
     """
-    Generates the urls for the top navigation
+    Generates the urls for the top navigation, only looked up when a template uses them
     """
-    season_list = Season.objects.filter(is_draft=False).order_by('-start_date')[1:5]
-    season_first = Season.objects.filter(is_draft=False).latest('start_date')
-    season_total = Season.objects.filter(is_draft=False).count()
-    return {'navigation': season_list, 'season_count': season_total, 'season_first': season_first}
+    data = SimpleLazyObject(_navigation_data)  # the version is read once per request
+    return {
+        name: SimpleLazyObject(lambda name=name: data[name])
+        for name in ('navigation', 'season_count', 'season_first')
+    }
 
 
 def umami_context(request):
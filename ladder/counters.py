@@ -0,0 +1,40 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ladder.models import DataVersion, Ladder, Match, Player, Season
+
+"""
+Site wide totals shown on the homepage, counted once per site data version and served from the cache in between.
+"""
+
+
+class SiteCounters(namedtuple('SiteCounters', ['seasons', 'divisions', 'matches', 'players', 'first_year',
+                                               'current_season', 'previous_season'])):
+
+    @property
+    def current_year(self):
+        return self.current_season.start_date.year
+
+    @classmethod
+    def current(cls):
+        """
+        Counters for the current site version, any write moves the version on so they are counted afresh
+        """
+        version = DataVersion.current(DataVersion.SITE, 0).version
+        return cache.get_or_set('site_counters:%d' % version, cls.count, settings.LADDER_CACHE_TIMEOUT)
+
+    @classmethod
+    def count(cls):
+        current_season = Season.objects.filter(is_draft=False).latest('start_date')
+        return cls(
+            seasons=Season.objects.count(),
+            divisions=Ladder.objects.count(),
+            matches=Match.objects.count(),
+            players=Player.objects.count(),
+            first_year=Season.objects.order_by('start_date')[0].start_date.year,
+            current_season=current_season,
+            previous_season=Season.objects.filter(is_draft=False, start_date__lt=current_season.start_date)
+            .order_by('-start_date').first(),
+        )
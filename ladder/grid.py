@@ -0,0 +1,76 @@
+from collections import namedtuple
+
+from django.db.models import prefetch_related_objects
+
+from ladder.models import Result, result_points
+
+"""
+Results matrix behind the ladder grids (season, ladder and add pages, excel export).
+Every cell is worked out in one pass over the ladder's results, so templates only walk rows and cells.
+"""
+
+GridCell = namedtuple('GridCell', ['opponent', 'score', 'inaccurate', 'is_self'])
+
+
+class GridRow(object):
+    def __init__(self, position, player):
+        self.position = position
+        self.player = player
+        self.cells = []
+        self.played = 0
+        self.won = 0
+        self.points = 0
+
+    @property
+    def average(self):
+        return self.points / self.played if self.played else 0
+
+
+class LadderGrid(object):
+    def __init__(self, ladder, players, results):
+        """
+        players in league order, results as (player_id, opponent_id, result, inaccurate_flag) tuples
+        """
+        self.ladder = ladder
+        self.rows = [GridRow(position, player) for position, player in enumerate(players, start=1)]
+        index = {player.id: i for i, player in enumerate(players)}
+
+        size = len(players)
+        matrix = [[None] * size for _ in range(size)]
+        for player_id, opponent_id, score, inaccurate in results:
+            row = index.get(player_id)
+            if row is None:
+                continue
+            # totals count every result, even against a player since moved out of the ladder
+            self.rows[row].played += 1
+            self.rows[row].won += score == 9
+            self.rows[row].points += result_points(score)
+            column = index.get(opponent_id)
+            if column is not None:
+                matrix[row][column] = (score, inaccurate)
+
+        for i, row in enumerate(self.rows):
+            for j, opponent in enumerate(players):
+                score, inaccurate = matrix[i][j] or (None, False)
+                row.cells.append(GridCell(opponent, score, inaccurate, i == j))
+
+    @classmethod
+    def for_ladders(cls, ladders):
+        """
+        Grids for ladders in league order, reading all of their results in one query
+        """
+        ladders = list(ladders)
+        prefetch_related_objects(ladders, 'league_set__player')
+        results = {}
+        for ladder_id, *row in Result.objects.filter(ladder__in=ladders).values_list(
+                'ladder_id', 'player_id', 'opponent_id', 'result', 'inaccurate_flag'):
+            results.setdefault(ladder_id, []).append(row)
+
+        return [
+            cls(ladder, [league.player for league in ladder.league_set.all()], results.get(ladder.id, ()))
+            for ladder in ladders
+        ]
+
+    @classmethod
+    def for_ladder(cls, ladder):
+        return cls.for_ladders([ladder])[0]
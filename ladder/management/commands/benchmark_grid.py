@@ -0,0 +1,94 @@
+import itertools
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+
+from ladder.grid import LadderGrid
+from ladder.models import Player, Result
+
+# grid markup as it was rendered before LadderGrid: every cell scans the row player's results, and so does
+# the total
+BEFORE = Template('''{% load ladder_extras %}
+{% for league in leagues %}{% with player_counter=forloop.counter %}
+<tr><td>{{ player_counter }}</td><td>{% get_player_name league.player user %}</td>
+{% for opponent in leagues %}{% with column_counter=forloop.counter %}
+{% if column_counter == player_counter %}<td class="box_grey"></td>{% else %}
+<td data-player="{{ league.player.id }}" data-opp="{{ opponent.player.id }}">
+{% for result in results_dict|getkey:league.player.id %}
+{% if league.player == result.player and opponent.player == result.opponent %}
+{% if result.inaccurate_flag %}<span>{{ result.result }} *</span>{% else %}{{ result.result }}{% endif %}
+{% endif %}
+{% endfor %}
+</td>{% endif %}
+{% endwith %}{% endfor %}
+<td>{{ results_dict|gettotal:league.player.id }}</td></tr>
+{% endwith %}{% endfor %}''')
+
+AFTER = Template('''{% load ladder_extras %}
+{% for row in grid.rows %}
+<tr><td>{{ row.position }}</td><td>{% get_player_name row.player user %}</td>
+{% for cell in row.cells %}
+{% if cell.is_self %}<td class="box_grey"></td>{% else %}
+<td data-player="{{ row.player.id }}" data-opp="{{ cell.opponent.id }}">
+{% if cell.score is not None %}
+{% if cell.inaccurate %}<span>{{ cell.score }} *</span>{% else %}{{ cell.score }}{% endif %}
+{% endif %}
+</td>{% endif %}
+{% endfor %}
+<td>{{ row.points }}</td></tr>
+{% endfor %}''')
+
+
+class League(object):
+    def __init__(self, player):
+        self.player = player
+
+
+class Command(BaseCommand):
+    help = 'Times rendering one division grid with the old template loops and with LadderGrid, no database needed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=20, help='Players in the division (default 20)')
+        parser.add_argument('--repeat', type=int, default=50, help='Timed renders per approach (default 50)')
+
+    def handle(self, *args, **options):
+        rng = random.Random(1)
+        players = [Player(id=n, first_name=f'Bench{n}', last_name=f'Player{n}')
+                   for n in range(1, options['players'] + 1)]
+        results = []
+        for winner, loser in itertools.combinations(players, 2):
+            if rng.random() > 0.75:
+                continue  # unplayed
+            if rng.random() > 0.5:
+                winner, loser = loser, winner
+            results.append(Result(player=winner, opponent=loser, result=9, inaccurate_flag=False))
+            results.append(Result(player=loser, opponent=winner, result=rng.randrange(9), inaccurate_flag=False))
+        user = AnonymousUser()
+
+        def before():
+            results_dict = {}
+            for result in results:
+                results_dict.setdefault(result.player.id, []).append(result)
+            return BEFORE.render(Context({'leagues': [League(p) for p in players], 'results_dict': results_dict,
+                                          'user': user}))
+
+        def after():
+            rows = [(r.player.id, r.opponent.id, r.result, r.inaccurate_flag) for r in results]
+            return AFTER.render(Context({'grid': LadderGrid(None, players, rows), 'user': user}))
+
+        self.stdout.write(f'{len(players)} players, {len(results) // 2} matches, {options["repeat"]} renders each')
+        timings = {}
+        for label, render in (('template loops', before), ('LadderGrid', after)):
+            runs = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                render()
+                runs.append((time.perf_counter() - started) * 1000)
+            timings[label] = statistics.median(runs)
+            self.stdout.write(f'{label:<15} median {timings[label]:8.3f} ms, min {min(runs):8.3f} ms')
+
+        self.stdout.write(f"speedup x{timings['template loops'] / timings['LadderGrid']:.1f}")
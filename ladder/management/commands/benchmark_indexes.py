@@ -0,0 +1,133 @@
+import datetime
+import itertools
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Max
+
+from ladder.models import Season, Ladder, Player, League, Result
+
+
+class Command(BaseCommand):
+    help = ('Seeds a throwaway test database and prints EXPLAIN output and timings for the Result access paths '
+            'without and with the composite indexes. Needs permission to create the test database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seasons', type=int, default=10, help='Seasons to seed (default 10)')
+        parser.add_argument('--divisions', type=int, default=6, help='Divisions per season (default 6)')
+        parser.add_argument('--players', type=int, default=12, help='Players per division (default 12)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query (default 20)')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            sample = self.seed(options['seasons'], options['divisions'], options['players'])
+            self.stdout.write(f"Seeded {Result.objects.count()} results on {connection.vendor}.")
+
+            self.toggle_indexes(add=False)
+            before = self.run(sample, options['repeat'], 'without composite indexes')
+            self.toggle_indexes(add=True)
+            after = self.run(sample, options['repeat'], 'with composite indexes')
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write('\n== Summary (median ms) ==')
+        for label in before:
+            speedup = before[label] / after[label] if after[label] else 0
+            self.stdout.write(f'{label:<55} {before[label]:>8.3f} {after[label]:>8.3f}  x{speedup:.1f}')
+
+    def seed(self, seasons, divisions, players):
+        """
+        Writes a deterministic history with bulk inserts and returns a sample result from the newest season.
+        """
+        rng = random.Random(1)
+        people = Player.objects.bulk_create(
+            [Player(first_name=f'Bench{n}', last_name=f'Player{n}') for n in range(divisions * players)]
+        )
+
+        start = datetime.date(2000, 1, 1)
+        for season_number in range(seasons):
+            season_start = start + datetime.timedelta(days=season_number * 120)
+            season = Season.objects.create(
+                name=f'Benchmark {season_number}', season_round=season_number % 3 + 1,
+                start_date=season_start, end_date=season_start + datetime.timedelta(days=110),
+            )
+            rng.shuffle(people)
+            for division in range(divisions):
+                ladder = Ladder.objects.create(season=season, division=division + 1, ladder_type='First to 9')
+                members = people[division * players:(division + 1) * players]
+                League.objects.bulk_create(
+                    [League(ladder=ladder, player=p, sort_order=i * 10) for i, p in enumerate(members, start=1)]
+                )
+
+                results = []
+                for winner, loser in itertools.combinations(members, 2):
+                    if rng.random() > 0.75:
+                        continue  # unplayed
+                    if rng.random() > 0.5:
+                        winner, loser = loser, winner
+                    played_on = season_start + datetime.timedelta(days=rng.randrange(110))
+                    results.append(Result(ladder=ladder, player=winner, opponent=loser, result=9,
+                                          date_added=played_on, inaccurate_flag=False))
+                    results.append(Result(ladder=ladder, player=loser, opponent=winner, result=rng.randrange(9),
+                                          date_added=played_on, inaccurate_flag=False))
+                Result.objects.bulk_create(results, batch_size=500)
+
+        return Result.objects.filter(ladder__season=season).select_related('ladder__season').first()
+
+    def queries(self, sample):
+        ladder, season = sample.ladder, sample.ladder.season
+        return [
+            ('add / result_entry_edit: pair lookup',
+             Result.objects.filter(ladder=ladder, player=sample.player_id, opponent=sample.opponent_id)),
+            ('get_latest_results: newest in ladder',
+             Result.objects.filter(ladder=ladder).order_by('-date_added')[:10]),
+            ('get_email_latest / subscription_email: since date',
+             Result.objects.filter(ladder=ladder, date_added__gte=season.end_date - datetime.timedelta(days=7))),
+            ('player_history: top opponents',
+             Result.objects.filter(player=sample.player_id).values('opponent')
+             .annotate(times_played=Count('opponent'), last_played=Max('date_added')).order_by('-times_played')[:10]),
+            ('head_to_head: pair across seasons',
+             Result.objects.filter(player=sample.player_id, opponent=sample.opponent_id, result__lt=9)
+             .order_by('-ladder__season__end_date')),
+            ('get_progress: results per day in season',
+             Result.objects.filter(ladder__season=season).values('date_added')
+             .annotate(added_count=Count('id')).order_by('date_added')),
+        ]
+
+    def run(self, sample, repeat, title):
+        self.stdout.write(f'\n== {title} ==')
+        timings = {}
+        for label, queryset in self.queries(sample):
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                runs.append((time.perf_counter() - started) * 1000)
+            timings[label] = statistics.median(runs)
+
+            self.stdout.write(f'\n-- {label}: median {timings[label]:.3f} ms, min {min(runs):.3f} ms')
+            self.stdout.write(queryset.explain())
+        return timings
+
+    def toggle_indexes(self, add):
+        """
+        Drops or recreates the Result Meta constraints and indexes. Constraints go first because some backends
+        (SQLite) rebuild the table, and with it the Meta indexes, when a constraint changes.
+        """
+        for group, add_sql, remove_sql in (
+            (Result._meta.constraints, 'add_constraint', 'remove_constraint'),
+            (Result._meta.indexes, 'add_index', 'remove_index'),
+        ):
+            with connection.cursor() as cursor:
+                existing = connection.introspection.get_constraints(cursor, Result._meta.db_table)
+            with connection.schema_editor() as editor:
+                for option in group:
+                    if add and option.name not in existing:
+                        getattr(editor, add_sql)(Result, option)
+                    elif not add and option.name in existing:
+                        getattr(editor, remove_sql)(Result, option)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ladder.models import Season
+from ladder.snapshot import close_season
+
+
+class Command(BaseCommand):
+    help = 'Freezes finished seasons into snapshots their pages are rendered from, args: --season id or --all'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season',
+                            action='store',
+                            dest='season',
+                            default=False,
+                            help='ID of season to close')
+        parser.add_argument('--all',
+                            action='store_true',
+                            help='Close every finished season that has no snapshot yet')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            seasons = [season for season in Season.objects.filter(snapshot__isnull=True, is_draft=False)
+                       if season.is_closed]
+        elif options['season'] is not False:
+            seasons = list(Season.objects.filter(pk=options['season']))
+            if not seasons:
+                raise CommandError('Season (%s) does not exist' % options['season'])
+        else:
+            raise CommandError('--season or --all option not set')
+
+        for season in seasons:
+            try:
+                close_season(season)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'Closed {season}')
+
+        self.stdout.write(self.style.SUCCESS(f'Closed {len(seasons)} season(s).'))
@@ -1,32 +1,186 @@
-from xlwt import *
-from django.core.management.base import BaseCommand, CommandError
 import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
+import django
+import xlwt
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from openpyxl import Workbook as XlsxWorkbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
 
-class Export(object):
-    def __init__(self, year, season_round):
-        from ladder.models import Ladder, Result, Season, League
-
-        season = Season.objects.get(start_date__year=year, season_round=season_round)
-
-        ladders = Ladder.objects.filter(season=season)
+Formula = namedtuple('Formula', ['text'])
 
-        results = Result.objects.filter(ladder__season=season)
-        league = League.objects.filter(ladder__season=season)
+COLUMN_WIDTHS = {0: 5, 1: 16, 2: 26, **{column: 6 for column in range(3, 25)}}
 
-        results_dict = {}
 
-        for result in results:
-            results_dict.setdefault(result.player.id, []).append(result)
+class Export(object):
+    def __init__(self, season):
+        from ladder.grid import LadderGrid
+        from ladder.models import Ladder
 
         self.season = season
-        self.ladders = ladders
-        self.results = results_dict
-        self.league = league
+        self.grids = LadderGrid.for_ladders(Ladder.objects.filter(season=season))
+
+    @property
+    def filename(self):
+        return 'ladder' + self.season.start_date.strftime('%b') + '-' + self.season.end_date.strftime('%b%Y') + 'Results'
+
+    def sheet(self):
+        """
+        The sheet a row at a time, in order, as (row, height, {column: (value, style)}) with height None for the
+        default, so each file format writes rows out as they are produced. Rows and columns count from 0, styles
+        are named, see the writers, and column widths are COLUMN_WIDTHS.
+        """
+        pending = {}  # cells placed on a row ahead of the one being written, {row: {column: (value, style)}}
+
+        def finish(number, height, cells):
+            # the rows with pending cells before this one, then this one with any of its own
+            for ahead in sorted(row for row in pending if row < number):
+                yield ahead, None, pending.pop(ahead)
+            yield number, height, {**pending.pop(number, {}), **cells}
+
+        row = 1
+        yield from finish(row, 600, {
+            1: ('ROUND', 'title'),
+            2: (str(self.season.season_round), 'title'),
+            5: (self.season.start_date.strftime('%b') + ' - ' + self.season.end_date.strftime('%d %B %Y'), 'title'),
+        })
+
+        for grid in self.grids:
+            ladder = grid.ladder
+            row += 2
+            yield from finish(row, 450, {5: ('DIVISION', 'bold'), 8: (str(ladder.division), 'bold'),
+                                         14: ('LAST ROUND', 'bold')})
+
+            # header row with a number per opponent column
+            row += 1
+            header = row
+            size = len(grid.rows)
+            cells = {1: ('NAME', 'bold'), **{2 + position: (position, 'bold') for position in range(1, size + 1)}}
+            for offset, label in enumerate(('Div', 'PLD', 'WON', 'TOTAL')):
+                cells[3 + size + offset] = (label, 'bold')
+            yield from finish(header, 450, cells)
+
+            first_letter, last_letter = 'D', get_column_letter(3 + size)
+            pld_letter, won_letter = get_column_letter(5 + size), get_column_letter(6 + size)
+
+            # division wide won and played beside the header, on the first two player rows
+            span = f'{first_letter}{header + 2}:{last_letter}{header + size + 1}'
+            pending.setdefault(header + 1, {})[7 + size] = (Formula(f'COUNTIF({span},9)'), 'bold')
+            pending.setdefault(header + 2, {})[7 + size] = (Formula(f'COUNT({span})'), 'bold')
+
+            for grid_row in grid.rows:
+                row += 1
+                cells = {0: (grid_row.position, 'bold'), 1: (grid_row.player.first_name, 'bold'),
+                         2: (grid_row.player.last_name, 'bold')}
+                for column, cell in enumerate(grid_row.cells, start=3):
+                    if cell.is_self:
+                        cells[column] = ('', 'grey')
+                    elif cell.score is not None:
+                        cells[column] = (cell.score, 'inaccurate' if cell.inaccurate else 'bold')
+
+                # played, won and total formulas
+                span = f'{first_letter}{row + 1}:{last_letter}{row + 1}'
+                cells[3 + size] = (ladder.division, 'bold')
+                cells[4 + size] = (Formula(f'COUNT({span})'), 'bold')
+                cells[5 + size] = (Formula(f'COUNTIF({span},9)'), 'bold')
+                cells[6 + size] = (Formula(f'SUM({span}) + {pld_letter}{row + 1} + ({won_letter}{row + 1}*2)'), 'bold')
+                yield from finish(row, 450, cells)
+
+        # a division of fewer than two players leaves its totals on rows of their own
+        for ahead in sorted(pending):
+            yield ahead, None, pending[ahead]
+
+    def save_xls(self, folder):
+        styles = {}
+        for name, font_height, colour in (('bold', 280, None), ('title', 400, None), ('grey', None, 'gray40'),
+                                          ('inaccurate', 280, 'red')):
+            style = xlwt.XFStyle()
+            if font_height:
+                style.font = xlwt.Font()
+                style.font.name = 'Times New Roman'
+                style.font.height = font_height
+                style.font.bold = True
+            if colour:
+                style.pattern = xlwt.Pattern()
+                style.pattern.pattern = xlwt.Pattern.SOLID_PATTERN
+                style.pattern.pattern_fore_colour = xlwt.Style.colour_map[colour]
+            styles[name] = style
+
+        w = xlwt.Workbook(encoding='utf-8')
+        ws = w.add_sheet('Sheet 1')
+        for column, width in COLUMN_WIDTHS.items():
+            ws.col(column).width = 256 * width
+        for row, height, columns in self.sheet():
+            if height is not None:
+                ws.row(row).height_mismatch = 1
+                ws.row(row).height = height
+            for column, (value, style) in columns.items():
+                ws.write(row, column, xlwt.Formula(value.text) if isinstance(value, Formula) else value, styles[style])
+
+        filename = os.path.join(folder, self.filename + '.xls')
+        w.save(filename)
+        return filename
+
+    def save_xlsx(self, folder):
+        """
+        Streams the sheet a row at a time with openpyxl's write only mode, each row appended as it is produced
+        """
+        bold = Font(name='Times New Roman', size=14, bold=True)
+        styles = {
+            'bold': (bold, None),
+            'title': (Font(name='Times New Roman', size=20, bold=True), None),
+            'grey': (None, PatternFill('solid', fgColor='969696')),
+            'inaccurate': (bold, PatternFill('solid', fgColor='FF0000')),
+        }
+
+        wb = XlsxWorkbook(write_only=True)
+        ws = wb.create_sheet('Sheet 1')
+        for column, width in COLUMN_WIDTHS.items():
+            ws.column_dimensions[get_column_letter(column + 1)].width = width
+
+        appended = 0
+        for row, height, columns in self.sheet():
+            for _ in range(appended, row):
+                ws.append([])  # rows left empty
+            if height is not None:
+                ws.row_dimensions[row + 1].height = height / 20  # twips to points
+            values = [None] * (max(columns) + 1 if columns else 0)
+            for column, (value, style) in columns.items():
+                cell = WriteOnlyCell(ws, value='=' + value.text if isinstance(value, Formula) else value)
+                font, fill = styles[style]
+                if font:
+                    cell.font = font
+                if fill:
+                    cell.fill = fill
+                values[column] = cell
+            ws.append(values)
+            appended = row + 1
+
+        filename = os.path.join(folder, self.filename + '.xlsx')
+        wb.save(filename)
+        return filename
+
+    def save(self, folder, file_format):
+        return self.save_xlsx(folder) if file_format == 'xlsx' else self.save_xls(folder)
+
+
+def export_season(season_id, folder, file_format):
+    from ladder.models import Season
+    return Export(Season.objects.get(pk=season_id)).save(folder, file_format)
+
+
+def init_worker():
+    # workers started without fork need the app registry, forked ones must not share the parent's connections
+    django.setup()
+    connections.close_all()
 
 
 class Command(BaseCommand):
-    help = 'Exports XLS, args: year, round and optional dir (default project root)'
+    help = 'Exports XLS, args: year and round or --all, optional dir (default project root) and --format'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -45,6 +199,26 @@ class Command(BaseCommand):
             help='Round of ladder'
         )
 
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Export every published season, one file each'
+        )
+
+        parser.add_argument(
+            '--format',
+            choices=['xls', 'xlsx'],
+            default='xls',
+            help='Legacy xls (default) or xlsx, written a row at a time'
+        )
+
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Worker processes for --all (default one per cpu)'
+        )
+
         parser.add_argument(
             '--dir',
             action='store',
@@ -54,19 +228,27 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-
-        def getkey(value, arg):
-            try:
-                return value[arg]
-            except KeyError:
-                return {}
+        from ladder.models import Season
 
         # where generated files will be saved
-        folder = options['dir'] + '/'
+        folder = options['dir']
 
         if os.access(folder, os.W_OK) is False:
             raise CommandError('Directory (%s) is not writeable, change in code' % folder)
 
+        if options['all']:
+            season_ids = list(Season.objects.filter(is_draft=False).values_list('id', flat=True))
+            if options['workers'] > 1:
+                # children must open their own connections rather than inherit this one
+                connections.close_all()
+                with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as pool:
+                    filenames = list(pool.map(export_season, season_ids, [folder] * len(season_ids),
+                                              [options['format']] * len(season_ids)))
+            else:
+                filenames = [export_season(season_id, folder, options['format']) for season_id in season_ids]
+            self.stdout.write(f'Exported {len(filenames)} seasons to {folder}')
+            return
+
         # make arg checks
         if options['year'] is False:
             raise CommandError('--year option not set')
@@ -74,146 +256,7 @@ class Command(BaseCommand):
         if options['round'] is False:
             raise CommandError('--round option not set')
 
-        # workbook setup stuff
-        w = Workbook(encoding='utf-8')
-        ws = w.add_sheet('Sheet 1')
+        season = Season.objects.get(start_date__year=options['year'], season_round=options['round'])
+        filename = Export(season).save(folder, options['format'])
 
-        font0 = Font()
-        font0.name = 'Times New Roman'
-        font0.height = 280
-        font0.bold = True
-
-        font1 = Font()
-        font1.name = 'Times New Roman'
-        font1.height = 400
-        font1.bold = True
-
-        style0 = XFStyle()
-        style0.font = font0
-        style1 = XFStyle()
-        style1.font = font1
-
-        #Grey box
-        pattern = Pattern()
-        pattern.pattern = Pattern.SOLID_PATTERN
-        pattern.pattern_fore_colour = Style.colour_map['gray40']
-
-        grey_box_style = XFStyle()
-        grey_box_style.pattern = pattern
-
-        #Red box
-        pattern = Pattern()
-        pattern.pattern = Pattern.SOLID_PATTERN
-        pattern.pattern_fore_colour = Style.colour_map['red']
-
-        inaccurate_style = XFStyle()
-        inaccurate_style.pattern = pattern
-        inaccurate_style.font = font0
-
-        # export
-        export = Export(options['year'], options['round'])
-        col = 1
-
-        ws.row(1).height_mismatch = 1
-        ws.row(1).height = 600
-        ws.col(0).width = 256 * 5
-
-        ws.write(col, 1, 'ROUND', style1)
-        ws.write(col, 2, str(export.season.season_round), style1)
-        ws.write(col, 5, export.season.start_date.strftime('%b') + ' - ' + export.season.end_date.strftime('%d %B %Y'), style1)
-
-        for ladder in export.ladders:
-            col += 2
-            ws.row(col).height_mismatch = 1
-            ws.row(col).height = 450
-            ws.write(col, 5, 'DIVISION', style0)
-            ws.write(col, 8, ladder.division.__str__(), style0)
-            ws.write(col, 14, 'LAST ROUND', style0)
-
-            col += 1
-            ws.row(col).height_mismatch = 1
-            ws.row(col).height = 450
-            ws.write(col, 1, 'NAME', style0)
-            ws.col(1).width = 256 * 16
-            ws.col(2).width = 256 * 26
-
-            #col width for results
-            for i in range(3, 25):
-                ws.col(i).width = 256 * 6
-
-            # names and row numbers
-            count = 1
-            for i in ladder.league_set.all():
-                ws.row(col + count).height_mismatch = 1
-                ws.row(col + count).height = 450
-                # row numbers and name
-                ws.write(col + count, 0, count, style0)
-                ws.write(col + count, 1, i.player.first_name, style0)
-                ws.write(col + count, 2, i.player.last_name, style0)
-                # col numbers
-                ws.write(col, 2 + count, count, style0)
-                count += 1
-
-            ws.write(col, 2 + count, 'Div', style0)
-            ws.write(col, 2 + count + 1, 'PLD', style0)
-            ws.write(col, 2 + count + 2, 'WON', style0)
-            ws.write(col, 2 + count + 3, 'TOTAL', style0)
-
-            # total won col/row for later use
-            total_won_col = col + 1
-            total_won_row = 2 + count + 4
-            # total played col/row for later use
-            total_played_col = col + 2
-            total_played_row = 2 + count + 4
-
-            player_counter = 0
-            for league in ladder.league_set.all():
-                col += 1
-                row = 3
-                # loop through players
-                column_counter = 0  # disable for now, think can use other count for greybox check
-                for opponent in ladder.league_set.all():
-                    # loop through op
-                    if column_counter == player_counter:
-                        ws.write(col, row, '', grey_box_style)
-                    else:
-                        # result
-                        for result in getkey(export.results, league.player.id):
-                            if league.player.id == result.player.id and opponent.player.id == result.opponent.id:
-                                if result.inaccurate_flag:
-                                    ws.write(col, row, result.result, inaccurate_style)
-                                else:
-                                    ws.write(col, row, result.result, style0)
-
-                    row += 1
-                    column_counter += 1
-
-                # populate formula's
-                frow = (col + 1).__str__()
-
-                #pld / won
-                last_l = chr(row + ord("A") - 1)
-                ws.write(col, row, league.ladder.division, style0)
-                ws.write(col, row + 1, Formula('COUNT(D' + frow + ':' + last_l + frow + ')'), style0)
-                ws.write(col, row + 2, Formula('COUNTIF(D' + frow + ':' + last_l + frow + ',9)'), style0)
-
-                # total
-                pld_l = chr(row + 2 + ord("A") - 1)
-                won_l = chr(row + 3 + ord("A") - 1)
-                ws.write(col, row + 3,
-                         Formula('SUM(D' + frow + ':' + last_l + frow + ') + ' + pld_l + frow + ' + (' + won_l + frow + '*2)'),
-                         style0)
-
-                player_counter += 1
-
-            #won stats
-            last_r = chr(total_won_row - 4 + ord("A") - 1)
-            ws.write(total_won_col, total_won_row,
-                     Formula('COUNTIF(D' + total_played_col.__str__() + ':' + last_r + (col + 1).__str__() + ',9)'), style0)
-            ws.write(total_played_col, total_played_row,
-                     Formula('COUNT(D' + total_played_col.__str__() + ':' + last_r + (col + 1).__str__() + ')'), style0)
-
-        filename = 'ladder' + export.season.start_date.strftime('%b') + '-' + export.season.end_date.strftime('%b%Y') + 'Results.xls'
-        w.save(folder + filename)
-
-        print('Export complete to file: ' + folder + filename)
\ No newline at end of file
+        print('Export complete to file: ' + filename)
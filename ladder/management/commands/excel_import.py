@@ -1,14 +1,56 @@
+import datetime
 import os
-from collections import defaultdict
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from openpyxl import load_workbook
-from ladder.models import Season, Player, Ladder, League, LadderSubscription
-import datetime
+
+from ladder.models import DataVersion, Ladder, LadderSubscription, League, Player, PlayerCareerStats, Season, \
+    SeasonSnapshot, normalize_name
+
+"""
+Imports a season's divisions and players from a spreadsheet laid out like the excel_export sheet: a DIVISION row
+naming each division followed by a row per player giving position, first and last name. Players are matched on
+their case and accent folded names, so a sheet's differently capitalised name finds the existing player.
+
+The sheet is read in one pass, every player, ladder, league and subscription it could touch is loaded up front,
+and the missing rows are written with bulk inserts in one transaction, so an import either completes or changes
+nothing. Bulk inserts skip the model signals, the caches, career stats and snapshots they would have updated are
+brought up to date at the end.
+"""
+
+
+def read_sheet(file_location):
+    """
+    [(division, position, first_name, last_name)] in sheet order, streamed from the first worksheet
+    """
+    book = load_workbook(file_location, read_only=True, data_only=True)
+    try:
+        sheet = book.worksheets[0]
+        entries = []
+        division = None
+        for number, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            row = tuple(row) + (None,) * (9 - len(row))  # trailing empty cells are not returned
+            if row[5] == 'DIVISION':
+                division = int(row[8])
+            elif row[0] and row[1] != 'NAME':
+                if division is None:
+                    raise CommandError('Row %d names a player before any DIVISION row' % number)
+                entries.append((division, int(row[0]), str(row[1]).strip(), str(row[2] or '').strip()))
+        return entries
+    finally:
+        book.close()  # read only workbooks hold the file open
+
+
+def name_key(first_name, last_name):
+    """
+    What a sheet name is matched to a player on, the sheet's "John Smith" is the database's "john smith"
+    """
+    return normalize_name(first_name), normalize_name(last_name)
 
 
 class Command(BaseCommand):
-    help = 'Exports XLS, args: --season'
+    help = 'Imports divisions and players into a season from an XLSX, args: --season --file, optional --dry-run'
 
     def add_arguments(self, parser):
         parser.add_argument('--season',
@@ -23,6 +65,10 @@ class Command(BaseCommand):
                             default=False,
                             help='File location of import speadsheet')
 
+        parser.add_argument('--dry-run',
+                            action='store_true',
+                            help='Print what would be created without writing anything')
+
     def handle(self, *args, **options):
 
         # make arg checks
@@ -32,66 +78,109 @@ class Command(BaseCommand):
         file_location = options['file']
 
         if os.access(file_location, os.R_OK) is False:
-            raise CommandError('Directory (%s) is not writeable, change in code' % file_location)
+            raise CommandError('File (%s) is not readable' % file_location)
 
         # make arg checks
         if options['season'] is False:
             raise CommandError('--season id option not set')
 
-        # book = open_workbook(file_location)
-        book = load_workbook(file_location)
-        season = Season.objects.get(pk=options['season'])
-        sh1 = book['Sheet1']  # always first sheet
-        player_list = defaultdict(dict)  # initialize defaultdict for our player list.
-        current_div = {}  # set the division counter to 0
-        subscriptions_created = 0
-
-        # save all players then set up ladder
-        for rows in sh1.iter_rows(values_only=True):
-
-            # save division numbers and load ladder
-            if rows[5] == 'DIVISION':
-                current_div = rows[8]
-                try:
-                    ladder = Ladder.objects.get(season=season, division=current_div)
-                except:
-                    ladder = Ladder(season=season, division=current_div, ladder_type="First to 9")
-                    ladder.save()
-
-            # save players
-            if rows[0] and rows[1] != 'NAME':
-                position = rows[0]
-                first_name = rows[1]
-                last_name = rows[2]
-
-                # populate our array for later use
-                player_list[current_div][position] = {'first_name': first_name, 'last_name': last_name}
-
-                try:
-                    player_object = Player.objects.get(first_name=first_name, last_name=last_name)
-                except:
-                    print('No match for player: ' + first_name + ' ' + last_name)
-                    try:
-                        player_object = Player(first_name=first_name, last_name=last_name)
-                        player_object.save()
-                    except:
-                        print('Failed to create player: ' + first_name + ' ' + last_name)
-
-                try:
-                    League.objects.get(ladder=ladder, player=player_object)
-                except League.MultipleObjectsReturned:
-                    pass
-                except:
-                    League.objects.create(ladder=ladder, player=player_object, sort_order=position * 10)
-
-                # Auto-subscribe players who have linked user accounts
-                subscription, created = LadderSubscription.objects.get_or_create(
-                    ladder=ladder,
-                    user=player_object.user,
-                    defaults={'subscribed_at': datetime.date.today()}
+        try:
+            season = Season.objects.get(pk=options['season'])
+        except Season.DoesNotExist:
+            raise CommandError('Season (%s) does not exist' % options['season'])
+
+        entries = read_sheet(file_location)
+        names = {}
+        for _, _, first_name, last_name in entries:
+            names.setdefault(name_key(first_name, last_name), (first_name, last_name))  # first spelling is kept
+
+        # everything the sheet could match, one query each
+        players = {}
+        for player in Player.objects.filter(search_first__in={first for first, _ in names},
+                                            search_last__in={last for _, last in names}).order_by('id'):
+            players.setdefault((player.search_first, player.search_last), player)  # oldest of any duplicates
+        ladders = {ladder.division: ladder for ladder in Ladder.objects.filter(season=season)}
+        leagues = set(League.objects.filter(ladder__season=season).values_list('ladder__division', 'player_id'))
+        subscriptions = set(LadderSubscription.objects.filter(ladder__season=season)
+                            .values_list('ladder__division', 'user_id'))
+
+        new_divisions = sorted({division for division, _, _, _ in entries} - set(ladders))
+        new_players = sorted(name for key, name in names.items() if key not in players)
+        new_leagues, new_subscriptions = [], []
+        seen = set()
+        for division, position, first_name, last_name in entries:
+            key = name_key(first_name, last_name)
+            player = players.get(key)
+            if (division, key) in seen or player is not None and (division, player.id) in leagues:
+                continue
+            seen.add((division, key))
+            new_leagues.append((division, position, first_name, last_name))
+
+        # players already in a division are subscribed too if they have not been, but only those with a linked
+        # user account can be
+        for division, _, first_name, last_name in entries:
+            player = players.get(name_key(first_name, last_name))
+            if player is not None and player.user_id and (division, player.user_id) not in subscriptions:
+                new_subscriptions.append((division, player.user_id))
+                subscriptions.add((division, player.user_id))
+
+        self.report(season, new_divisions, new_players, new_leagues, new_subscriptions,
+                    options['dry_run'] or options['verbosity'] > 1)
+        if options['dry_run'] or not (new_leagues or new_subscriptions):
+            return
+
+        with transaction.atomic():
+            if new_divisions:
+                Ladder.objects.bulk_create(
+                    [Ladder(season=season, division=division, ladder_type='First to 9') for division in new_divisions]
                 )
-                if created:
-                    subscriptions_created += 1
+                ladders = {ladder.division: ladder for ladder in Ladder.objects.filter(season=season)}
 
-        print('built good')
-        print(f'Created {subscriptions_created} new email subscriptions')
+            if new_players:
+                Player.objects.bulk_create(
+                    [Player(first_name=first_name, last_name=last_name, search_first=normalize_name(first_name),
+                            search_last=normalize_name(last_name)) for first_name, last_name in new_players],
+                    batch_size=500,
+                )
+                # not every database returns the new ids from a bulk insert
+                new_keys = [name_key(*name) for name in new_players]
+                for player in Player.objects.filter(search_first__in={first for first, _ in new_keys},
+                                                    search_last__in={last for _, last in new_keys}).order_by('id'):
+                    players.setdefault((player.search_first, player.search_last), player)
+
+            League.objects.bulk_create(
+                [League(ladder=ladders[division], player=players[name_key(first_name, last_name)],
+                        sort_order=position * 10)
+                 for division, position, first_name, last_name in new_leagues],
+                batch_size=500,
+            )
+            LadderSubscription.objects.bulk_create(
+                [LadderSubscription(ladder=ladders[division], user_id=user_id, subscribed_at=datetime.date.today())
+                 for division, user_id in new_subscriptions],
+                batch_size=500,
+            )
+
+            # what the League and Ladder signals would have done row by row
+            ladder_ids = [ladders[division].id for division in {division for division, _, _, _ in new_leagues}]
+            player_ids = set(League.objects.filter(ladder_id__in=ladder_ids).values_list('player_id', flat=True))
+            PlayerCareerStats.refresh(player_ids)
+            SeasonSnapshot.objects.filter(season=season).delete()
+            DataVersion.bump(season_ids=[season.id], ladder_ids=ladder_ids,
+                             player_ids=[players[name_key(*name)].id for name in new_players])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {len(new_leagues)} players into {season}: {len(new_divisions)} new divisions, '
+            f'{len(new_players)} new players, {len(new_subscriptions)} new email subscriptions.'))
+
+    def report(self, season, new_divisions, new_players, new_leagues, new_subscriptions, detail):
+        if detail:
+            for division in new_divisions:
+                self.stdout.write(f'+ division {division}')
+            for first_name, last_name in new_players:
+                self.stdout.write(f'+ player {first_name} {last_name}')
+            for division, position, first_name, last_name in new_leagues:
+                self.stdout.write(f'+ division {division} position {position}: {first_name} {last_name}')
+            for division, user_id in new_subscriptions:
+                self.stdout.write(f'+ division {division} subscription for user {user_id}')
+        if not (new_leagues or new_subscriptions):
+            self.stdout.write(f'Nothing to import, every player is already in {season}.')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ladder.models import PlayerCareerStats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds every player\'s career stats from the full result history'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = PlayerCareerStats.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt career stats for {rows} players.'))
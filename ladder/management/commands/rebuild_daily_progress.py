@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ladder.models import Season, SeasonDailyProgress
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily progress series behind the season progress charts, args: optional --season id'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season',
+                            action='store',
+                            dest='season',
+                            default=False,
+                            help='ID of season (default all seasons)')
+
+    def handle(self, *args, **options):
+        seasons = Season.objects.all()
+        if options['season'] is not False:
+            seasons = seasons.filter(pk=options['season'])
+
+        with transaction.atomic():
+            rows = SeasonDailyProgress.rebuild(seasons)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} days of progress across {seasons.count()} seasons.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ladder.models import PairStats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the head to head stats of every pair of players from the match table'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = PairStats.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt head to head stats for {rows} pairs.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ladder import ratings
+
+
+class Command(BaseCommand):
+    help = 'Recomputes every player rating by replaying the whole match history in date order'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Matches read and written per batch (default 2000)')
+
+    def handle(self, *args, **options):
+        def progress(season, total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{season}: {total} matches rated so far')
+
+        with transaction.atomic():
+            total = ratings.replay(chunk_size=options['chunk_size'], progress=progress)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings from {total} matches.'))
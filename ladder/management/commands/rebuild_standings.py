@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ladder.models import Ladder, LadderStanding
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the ladder standings table from results, args: optional --season id'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season',
+                            action='store',
+                            dest='season',
+                            default=False,
+                            help='ID of season (default all seasons)')
+
+    def handle(self, *args, **options):
+        ladders = Ladder.objects.all()
+        if options['season'] is not False:
+            ladders = ladders.filter(season_id=options['season'])
+
+        with transaction.atomic():
+            rows = LadderStanding.rebuild(ladders)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} standings across {ladders.count()} ladders.'))
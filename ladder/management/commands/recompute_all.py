@@ -0,0 +1,160 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+
+from ladder import ratings
+from ladder.models import DataVersion, Ladder, LadderStanding, Match, PairStats, Player, PlayerCareerStats, Season, \
+    SeasonDailyProgress, SeasonSnapshot
+from ladder.snapshot import close_season
+
+"""
+Rebuilds every derived table from the results. The work is split into shards (a season's standings, a batch of
+players' career stats, ...) run across worker processes, each with its own database connection. Shards run in
+phases, the matches first as most tables are built from them, and the snapshots of closed seasons last as they
+are built from the rest.
+"""
+
+PLAYERS_PER_SHARD = 2000
+
+
+def matches_shard(season_id):
+    return Match.rebuild(Ladder.objects.filter(season_id=season_id))
+
+
+def standings_shard(season_id):
+    return LadderStanding.rebuild(Ladder.objects.filter(season_id=season_id))
+
+
+def daily_progress_shard(season_id):
+    return SeasonDailyProgress.rebuild(Season.objects.filter(pk=season_id))
+
+
+def career_stats_shard(player_ids):
+    PlayerCareerStats.refresh(player_ids)
+    return len(player_ids)
+
+
+def pair_stats_shard(_):
+    return PairStats.rebuild()
+
+
+def ratings_shard(_):
+    # a rating depends on every earlier match so the replay cannot be split
+    return ratings.replay()
+
+
+def snapshots_shard(season_id):
+    season = Season.objects.get(pk=season_id)
+    if not season.is_closed:
+        SeasonSnapshot.objects.filter(season=season).delete()  # reopened by a date change
+        return 0
+    close_season(season)
+    return 1
+
+
+# stage name -> shard function
+STAGES = {
+    'matches': matches_shard,
+    'standings': standings_shard,
+    'daily_progress': daily_progress_shard,
+    'career_stats': career_stats_shard,
+    'pair_stats': pair_stats_shard,
+    'ratings': ratings_shard,
+    'snapshots': snapshots_shard,
+}
+
+# stages run together, each phase waits for the one before
+PHASES = [
+    ['matches'],
+    ['standings', 'daily_progress', 'career_stats', 'pair_stats', 'ratings'],
+    ['snapshots'],
+]
+
+
+def shards():
+    """
+    (stage, argument) for every unit of work
+    """
+    for season_id in Season.objects.values_list('id', flat=True):
+        yield 'matches', season_id
+        yield 'standings', season_id
+        yield 'daily_progress', season_id
+    player_ids = list(Player.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(player_ids), PLAYERS_PER_SHARD):
+        yield 'career_stats', player_ids[start:start + PLAYERS_PER_SHARD]
+    yield 'pair_stats', None
+    yield 'ratings', None
+    # only seasons already closed are frozen again, closing one is left to close_season
+    for season_id in SeasonSnapshot.objects.values_list('season_id', flat=True):
+        yield 'snapshots', season_id
+
+
+def run_shard(stage, argument):
+    """
+    Runs one shard in its own transaction, returns (stage, rows, seconds)
+    """
+    started = time.perf_counter()
+    with transaction.atomic():
+        rows = STAGES[stage](argument)
+    return stage, rows, time.perf_counter() - started
+
+
+def init_worker():
+    # workers started without fork need the app registry, forked ones must not share the parent's connections
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Rebuilds matches, standings, daily progress, career stats, pair stats, ratings and closed season '
+            'snapshots for every season using a pool of processes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Worker processes (default one per cpu), 1 runs everything in this process')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stdout.write('SQLite takes one writer at a time, running in this process.')
+            workers = 1
+
+        work = list(shards())
+        timings = {stage: [0, 0.0] for stage in STAGES}
+        started = time.perf_counter()
+
+        def record(stage, rows, seconds):
+            timings[stage][0] += rows
+            timings[stage][1] += seconds
+
+        if workers > 1:
+            # children must open their own connections rather than inherit this one
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                for phase in PHASES:
+                    futures = [pool.submit(run_shard, stage, argument) for stage, argument in work if stage in phase]
+                    for future in as_completed(futures):
+                        record(*future.result())
+        else:
+            for phase in PHASES:
+                for stage, argument in work:
+                    if stage in phase:
+                        record(*run_shard(stage, argument))
+
+        # cached pages were built from the old rows
+        DataVersion.bump(
+            season_ids=Season.objects.values_list('id', flat=True),
+            ladder_ids=Ladder.objects.values_list('id', flat=True),
+            player_ids=Player.objects.values_list('id', flat=True),
+        )
+
+        for stage, (rows, seconds) in timings.items():
+            rate = rows / seconds if seconds else 0
+            self.stdout.write(f'{stage:<14} {rows:>8} rows {seconds:8.2f}s {rate:10.0f} rows/s')
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {len(work)} shards in {time.perf_counter() - started:.2f}s '
+            f'with {workers} worker(s).'))
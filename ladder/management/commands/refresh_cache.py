@@ -1,36 +1,190 @@
-from django.core.management.base import BaseCommand, CommandError
-from django.test.client import RequestFactory
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
 from django.urls import reverse
 
-from ladder.models import Season
-from ladder.views import season as season_view
+from ladder.models import DataVersion, League, Season
+
+"""
+Warms the page caches by requesting every season, division, player and ajax url, current season first.
+
+By default pages are rendered in this process, which fills a cache shared between processes (memcached, redis).
+With the per-process local memory cache pass --base-url so the running server renders them into its own caches,
+rendering in this process would only warm a cache that goes away with the command, so it is refused.
+"""
+
+# url to request, what kind of page it is, and a function of the user giving the cache key the page fills
+Target = namedtuple('Target', ['path', 'kind', 'cache_key'])
+
+
+def _fragment(name, scope, object_id):
+    return lambda user: make_template_fragment_key(name, [DataVersion.current(scope, object_id).cache_key(user)])
+
+
+def _ajax(prefix, season_id, suffix=''):
+    return lambda user: prefix + DataVersion.current(DataVersion.SEASON, season_id).cache_key(user) + suffix
+
+
+def targets(players='current'):
+    """
+    Every url to warm in priority order, the current season and its players first
+    """
+    seasons = list(Season.objects.filter(is_draft=False).order_by('-start_date').prefetch_related('ladder_set'))
+    if not seasons:
+        return
+
+    yield Target(reverse('index'), 'index', None)
+    yield Target(reverse('list'), 'list', None)
+    for position, season in enumerate(seasons):
+        args = (season.start_date.year, season.season_round)
+        yield Target(reverse('season', args=args), 'season', _fragment('season_grid', DataVersion.SEASON, season.id))
+        for ladder in sorted(season.ladder_set.all(), key=lambda ladder: ladder.division):
+            yield Target(reverse('ladder', args=args + (ladder.division,)), 'ladder',
+                         _fragment('ladder_grid', DataVersion.LADDER, ladder.id))
+        yield Target(reverse('season_ajax_stats') + '?id=%d' % season.id, 'ajax',
+                     _ajax('season_ajax_stats:', season.id, ':0'))
+        yield Target(reverse('season_ajax_progress') + '?id=%d' % season.id, 'ajax',
+                     _ajax('season_ajax_progress:', season.id))
+        if position == 0:
+            # the homepage asks for the current season's stats with its leaders
+            yield Target(reverse('season_ajax_stats') + '?id=%d&leader=1' % season.id, 'ajax',
+                         _ajax('season_ajax_stats:', season.id, ':1'))
+
+    leagues = League.objects.all() if players == 'all' else League.objects.filter(ladder__season=seasons[0])
+    for player_id in leagues.order_by('player_id').values_list('player_id', flat=True).distinct():
+        yield Target(reverse('player_history', args=(player_id,)), 'player', None)
 
 
 class Command(BaseCommand):
-    help = 'Refreshes cached pages'
+    help = 'Warms the page caches for anonymous and signed in visitors, current season first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent requests (default 4)')
+        parser.add_argument('--players', choices=['current', 'all'], default='current',
+                            help='Player pages to warm, of the current season (default) or everyone')
+        parser.add_argument('--user', help='Username to warm the signed in pages as (default the first active '
+                                           'non superuser)')
+        parser.add_argument('--anonymous-only', action='store_true', help='Skip the signed in pages')
+        parser.add_argument('--base-url', help='Request pages from a running server, e.g. http://web:8000, instead '
+                                               'of rendering them in this process (required with a local memory '
+                                               'cache)')
 
     def handle(self, *args, **options):
-        """
-        Script that calls all season pages to refresh the cache on them if it has expired.
+        self.base_url = (options['base_url'] or '').rstrip('/')
+        backend = caches['default']
+        if not self.base_url and isinstance(backend, (LocMemCache, DummyCache)):
+            raise CommandError(f'The {type(backend).__name__} cache is not shared with the server, pages rendered '
+                               f'here would be lost with this process. Pass --base-url to warm a running server.')
+        self.verbosity = options['verbosity']
+        self.host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        self.local = threading.local()
+
+        variants = [('anonymous', AnonymousUser(), None)]
+        login = None
+        if not options['anonymous_only']:
+            user = self.warm_user(options['user'])
+            if user is not None:
+                login = Client(HTTP_HOST=self.host)
+                login.force_login(user)
+                variants.append(('signed in', user, login.cookies))
 
-        Any time/date settings create postfixes on the caching key, for now the solution is to disable them.
+        work = [(variant, target) for target in targets(options['players']) for variant in variants]
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(pool.map(lambda job: self.warm(*job), work))
+        finally:
+            if login is not None:
+                login.logout()  # drops the session made for the run
+
+        self.report(results, time.perf_counter() - started)
+
+    def warm_user(self, username):
+        users = User.objects.filter(is_active=True)
+        if username:
+            user = users.filter(username=username).first()
+            if user is None:
+                raise CommandError('User (%s) does not exist or is inactive' % username)
+            return user
+        user = users.filter(is_superuser=False).order_by('id').first()
+        if user is None:
+            self.stderr.write('No active user to warm the signed in pages as, warming anonymous pages only.')
+        return user
+
+    def warm(self, variant, target):
         """
+        Requests one page, returns (variant, kind, cache state, status, milliseconds)
+        """
+        name, user, cookies = variant
+        # a page's cache entry can only be seen from here when this process shares the cache it fills
+        state = 'n/a'
+        if target.cache_key is not None and not self.base_url:
+            state = 'hit' if cache.get(target.cache_key(user)) is not None else 'miss'
+
+        started = time.perf_counter()
+        try:
+            status = self.fetch(target.path, cookies)
+        finally:
+            connections.close_all()  # this thread's connections, the pool threads are not reused after the run
+        elapsed = (time.perf_counter() - started) * 1000
 
-        if settings.USE_I18N:
-            raise CommandError('USE_I18N in settings must be disabled.')
+        if self.verbosity > 1:
+            self.stdout.write(f'{status} {elapsed:8.1f} ms {state:<4} {name:<9} {target.path}')
+        return name, target.kind, state, status, elapsed
 
-        if settings.USE_L10N:
-            raise CommandError('USE_L10N in settings must be disabled.')
+    def fetch(self, path, cookies):
+        if self.base_url:
+            request = urllib.request.Request(self.base_url + path, headers={'Host': self.host})
+            if cookies:
+                request.add_header('Cookie', '; '.join(f'{key}={morsel.value}' for key, morsel in cookies.items()))
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                    return response.status
+            except urllib.error.HTTPError as e:
+                return e.code
 
-        if settings.USE_TZ:
-            raise CommandError('USE_TZ in settings must be disabled.')
+        # django's test client is not thread safe, each pool thread gets its own
+        clients = getattr(self.local, 'clients', None)
+        if clients is None:
+            clients = self.local.clients = {}
+        key = id(cookies)
+        if key not in clients:
+            clients[key] = Client(HTTP_HOST=self.host)
+            if cookies:
+                clients[key].cookies.load({name: morsel.value for name, morsel in cookies.items()})
+        return clients[key].get(path).status_code
 
-        self.factory = RequestFactory()
-        seasons = Season.objects.all()
-        for season in seasons:
-            path = reverse('ladder:season', args=(str(season.end_date.year), str(season.season_round)))
-            # use the request factory to generate the correct url for the cache hash
-            request = self.factory.get(path)
+    def report(self, results, elapsed):
+        self.stdout.write(f'{"page":<8} {"variant":<9} {"pages":>6} {"hits":>5} {"misses":>6} {"errors":>6} '
+                          f'{"median":>9} {"max":>9}')
+        groups = {}
+        for name, kind, state, status, ms in results:
+            groups.setdefault((kind, name), []).append((state, status, ms))
+        for (kind, name), rows in groups.items():
+            times = [ms for _, _, ms in rows]
+            self.stdout.write(
+                f'{kind:<8} {name:<9} {len(rows):>6} '
+                f'{sum(state == "hit" for state, _, _ in rows):>5} '
+                f'{sum(state == "miss" for state, _, _ in rows):>6} '
+                f'{sum(status != 200 for _, status, _ in rows):>6} '
+                f'{statistics.median(times):>6.1f} ms {max(times):>6.1f} ms'
+            )
 
-            season_view(request, season.end_date.year, season.season_round)
\ No newline at end of file
+        errors = sum(status != 200 for _, _, _, status, _ in results)
+        style = self.style.SUCCESS if not errors else self.style.WARNING
+        self.stdout.write(style(f'Warmed {len(results)} pages in {elapsed:.1f}s, {errors} did not return 200.'))
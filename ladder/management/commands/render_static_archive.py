@@ -0,0 +1,138 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.test.client import RequestFactory
+from django.urls import resolve, reverse
+
+from ladder.models import DataVersion, Ladder, Season
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip copies are written without it
+    brotli = None
+
+MANIFEST = 'manifest.json'
+
+
+class Command(BaseCommand):
+    help = ('Renders the anonymous pages of closed seasons, and the season list when no season is open, to '
+            'static files for nginx to serve')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.STATIC_ARCHIVE_ROOT,
+                            help='Directory to write to (default settings.STATIC_ARCHIVE_ROOT)')
+        parser.add_argument('--force', action='store_true', help='Render every page even if unchanged')
+
+    def handle(self, *args, **options):
+        self.output = options['output']
+        self.verbosity = options['verbosity']
+        manifest_path = os.path.join(self.output, MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {'pages': {}}
+        previous = manifest['pages']
+
+        self.factory = RequestFactory()
+        pages = {}
+        rendered = 0
+        for path, token in self.pages():
+            entry = previous.get(path)
+            if not options['force'] and entry is not None and entry['token'] == token:
+                pages[path] = entry
+                continue
+            entry = self.render(path, token)
+            if entry is not None:
+                pages[path] = entry
+                rendered += 1
+
+        # pages of seasons that were reopened or removed go back to django
+        removed = 0
+        for path in set(previous) - set(pages):
+            self.remove(previous[path]['file'])
+            removed += 1
+
+        os.makedirs(self.output, exist_ok=True)
+        self.write(manifest_path, json.dumps(
+            {'generated': datetime.datetime.now().isoformat(timespec='seconds'), 'pages': pages}, indent=1
+        ).encode())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{rendered} pages rendered, {len(pages) - rendered} unchanged, {removed} removed.'))
+
+    def pages(self):
+        """
+        (path, token) of every page to archive, a page is rendered again when its token changes
+        """
+        # every page carries the navigation, which lists the published seasons
+        published = Season.objects.filter(is_draft=False).order_by('id')
+        navigation = hashlib.md5(
+            repr(list(published.values_list('id', 'name', 'start_date', 'season_round'))).encode()
+        ).hexdigest()[:12]
+
+        closed = [season for season in published if season.is_closed]
+        # the season list shows the current season's live standings, it is only archived while no season is
+        # open, otherwise it is left to django (and a copy from before the season opened is removed)
+        if len(closed) == len(published):
+            seasons_token, _ = DataVersion.summary(Q(scope=DataVersion.SEASON))
+            yield reverse('list'), f'{seasons_token}:{navigation}'
+
+        versions = dict(DataVersion.objects.filter(
+            scope=DataVersion.SEASON, object_id__in=[season.id for season in closed]
+        ).values_list('object_id', 'version'))
+        ladders = {}
+        for season_id, division in Ladder.objects.filter(season__in=closed).values_list('season_id', 'division'):
+            ladders.setdefault(season_id, []).append(division)
+
+        for season in closed:
+            token = f'{versions.get(season.id, 0)}:{navigation}'
+            args = (season.start_date.year, season.season_round)
+            yield reverse('season', args=args), token
+            for division in sorted(ladders.get(season.id, ())):
+                yield reverse('ladder', args=args + (division,)), token
+
+    def render(self, path, token):
+        request = self.factory.get(path)
+        request.user = AnonymousUser()
+        match = resolve(path)
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.status_code != 200:
+            self.stderr.write(f'Skipped {path}: status {response.status_code}')
+            return None
+
+        content = response.content
+        file = os.path.join(path.strip('/'), 'index.html')
+        self.write(os.path.join(self.output, file), content)
+        self.write(os.path.join(self.output, file + '.gz'), gzip.compress(content, 9, mtime=0))
+        if brotli is not None:
+            self.write(os.path.join(self.output, file + '.br'), brotli.compress(content))
+        elif os.path.exists(os.path.join(self.output, file + '.br')):
+            os.remove(os.path.join(self.output, file + '.br'))  # left by a run that had brotli
+
+        if self.verbosity > 1:
+            self.stdout.write(f'Rendered {path}')
+        return {'token': token, 'file': file, 'bytes': len(content), 'sha256': hashlib.sha256(content).hexdigest(),
+                'brotli': brotli is not None}
+
+    def remove(self, file):
+        for suffix in ('', '.gz', '.br'):
+            try:
+                os.remove(os.path.join(self.output, file + suffix))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def write(filename, content):
+        # written aside and moved into place so nginx never serves half a file
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename + '.tmp', 'wb') as f:
+            f.write(content)
+        os.replace(filename + '.tmp', filename)
@@ -1,86 +1,259 @@
 import datetime
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
 from django.core.management.base import BaseCommand
-from django.core.mail import EmailMessage
+from django.db.models import Exists, F, OuterRef, Q, Subquery
 from django.template.loader import get_template
 
-from ladder.models import Season, LadderSubscription
+from ladder.models import LadderSubscription, Match, Season
 from tennis.settings import SUBSCRIPTION_EMAIL
 
+"""
+Emails subscribers the results added to their ladders since their last email.
+
+Each subscription remembers the newest match it has been emailed about, so a run finds everything entered since
+whenever it last ran, a late or repeated run sends nothing twice, and the work grows with new results rather than
+with the number of ladders. Until its first email a subscription is sent the matches played since it subscribed,
+and no earlier than yesterday as the daily email this replaced did.
+
+Each ladder's results are rendered once and shared by all of its subscribers, only the greeting and unsubscribe
+links are rendered per message. With --digest a user following several ladders gets one email with a section for
+each rather than an email per ladder. Messages are sent in batches, each batch over one SMTP connection, from a
+small pool of threads. A batch whose connection drops is retried with backoff from the message that failed, and a
+message the server refuses is skipped without holding up the rest.
+
+To try it locally send to the MailHog service of docker-compose.yml (EMAIL_HOST=mail, EMAIL_PORT=1025 in
+.env.dev) and read the messages at http://127.0.0.1:8002/
+"""
+
+SITE = 'highgate-ladder.co.uk'
+BATCH_SIZE = 50
+WORKERS = 4
+RETRIES = 3
+BACKOFF = 2  # seconds before the first retry, doubled for each one after
+
+
+def ladder_section(ladder, buckets):
+    """
+    The results part of a ladder's email from its get_email_latest() buckets, the same for every subscriber
+    """
+    return get_template('ladder/ladder/subscription/section.html').render({
+        'ladder': ladder,
+        'buckets': buckets,
+        'user': User(),  # subscribers are all signed up users, who see names in full
+        'protocol': 'https',
+        'domain': SITE,
+    })
+
+
+def unsubscribe_url(subscription):
+    return f"https://{SITE}/unsubscribe/{subscription.unsubscribe_token}/"
+
+
+def email_subject(season, entries):
+    if len(entries) == 1:
+        return f"{entries[0][0].ladder} Result Update"
+    divisions = ', '.join(str(subscription.ladder.division) for subscription, _ in entries)
+    return f"{season} Result Update - Divisions: {divisions}"
+
+
+def build_message(user, subject, entries):
+    """
+    One email to a user made of [(subscription, section)], a single ladder's or a digest of several
+    """
+    urls = [unsubscribe_url(subscription) for subscription, _ in entries]
+    message = get_template("ladder/ladder/subscription/email.html").render({
+        'subject': subject,
+        'user': user,
+        'entries': [{'ladder': subscription.ladder, 'section': section, 'unsubscribe_url': url}
+                    for (subscription, section), url in zip(entries, urls)],
+    })
+
+    mail = EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=SUBSCRIPTION_EMAIL,
+        to=[user.email],
+        reply_to=[SUBSCRIPTION_EMAIL],
+    )
+    mail.extra_headers = {
+        # a digest lists every ladder's link, each one unsubscribes from that ladder only
+        'List-Unsubscribe': ', '.join([f'<mailto:unsubscribe@{SITE}>'] + [f'<{url}>' for url in urls]),
+        'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click',
+    }
+    mail.content_subtype = "html"
+    return mail
+
+
+def is_connection_error(error):
+    # smtplib's errors are OSErrors too, only a dropped connection or a server closing it (421) is worth a retry
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return isinstance(error, smtplib.SMTPServerDisconnected) or not isinstance(error, smtplib.SMTPException)
+
+
+def send_batch(messages, retries=RETRIES, backoff=BACKOFF):
+    """
+    Sends the messages over one connection. When the connection drops it is reopened after a backoff and sending
+    carries on from the message that failed, a message the server refuses (a bad address, a 5xx) is skipped.
+    Returns (sent messages, number failed).
+    """
+    sent, failed = [], 0
+    position = attempt = 0
+    while position < len(messages):
+        try:
+            with get_connection() as connection:
+                while position < len(messages):
+                    message = messages[position]
+                    # messages are handed over one at a time so a failure never sends the earlier ones twice
+                    try:
+                        connection.send_messages([message])
+                        sent.append(message)
+                    except (smtplib.SMTPException, OSError) as e:
+                        if is_connection_error(e):
+                            raise
+                        print(f"Skipped email to {message.to[0]}: {e}")
+                        failed += 1
+                    position += 1
+        except (smtplib.SMTPException, OSError) as e:
+            if attempt == retries:
+                print(f"Giving up on {len(messages) - position} emails to {messages[position].to[0]} and after: {e}")
+                return sent, failed + len(messages) - position
+            print(f"Sending failed ({e}), retrying in {backoff * 2 ** attempt}s")
+            time.sleep(backoff * 2 ** attempt)
+            attempt += 1
+    return sent, failed
+
+
+def send_messages(messages, batch_size=BATCH_SIZE, workers=WORKERS, on_sent=None):
+    """
+    Sends the messages in batches from a pool of threads, returns (sent, failed). on_sent is called here with
+    the messages of each batch that went out as the batch finishes.
+    """
+    batches = [messages[start:start + batch_size] for start in range(0, len(messages), batch_size)]
+    sent = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(send_batch, batch) for batch in batches]):
+            batch_sent, batch_failed = future.result()
+            sent += len(batch_sent)
+            failed += batch_failed
+            if on_sent is not None and batch_sent:
+                on_sent(batch_sent)
+    return sent, failed
+
 
-def send_ladder_emails(days=1, dry_run=False):
-    # search current season ladders that have result in last `days`
+def first_email_cutoff():
+    """
+    Matches dated before this are not new to a subscription that has not been emailed yet, as with the daily
+    email this replaced. Match ids don't follow match dates, so there is no id to start from.
+    """
+    return datetime.date.today() - datetime.timedelta(days=1)
+
+
+def due_subscriptions(season):
+    """
+    Subscriptions to the season's ladders with matches entered since their last email, in one query. Each has
+    the id of its ladder's newest match as newest_match.
+    """
+    newest = Match.objects.filter(ladder=OuterRef('ladder')).order_by('-id').values('id')[:1]
+    played_since_subscribing = Match.objects.filter(ladder=OuterRef('ladder'), date__gte=OuterRef('subscribed_at'))
+    played_since_subscribing = played_since_subscribing.filter(date__gte=first_email_cutoff())
+    return (
+        LadderSubscription.objects.filter(ladder__season=season)
+        .annotate(newest_match=Subquery(newest))
+        .filter(Q(last_notified_match_id__lt=F('newest_match'))
+                | Q(last_notified_match_id__isnull=True) & Exists(played_since_subscribing))
+        .select_related('user', 'ladder__season')
+        .order_by('ladder__division', 'id')
+    )
+
+
+def send_ladder_emails(dry_run=False, batch_size=BATCH_SIZE, workers=WORKERS, digest=False):
     season = Season.objects.filter(is_draft=False).latest('start_date')
     print(f"Season: {season}")
-    ladders = season.ladder_set.all()
-
-    date_from = datetime.datetime.now() - datetime.timedelta(days=days)
-
-    sent = 0
-    skipped = 0
-
-    for ladder in ladders:
-        print(f"Checking ladder: {ladder}")
-
-        # check ladder has results in period
-        if ladder.result_set.filter(date_added__gte=date_from).count() == 0:
-            print("No results in past period")
-            skipped += 1
-            continue
-
-        subscriptions = ladder.laddersubscription_set.all()
-        for subscription in subscriptions:
-            unsubscribe_url = f"https://highgate-ladder.co.uk/unsubscribe/{subscription.unsubscribe_token}/"
-
-            message = get_template("ladder/ladder/subscription/email.html").render({
-                'ladder': ladder,
-                'user': subscription.user,
-                'unsubscribe_url': unsubscribe_url,
-                'protocol': 'https',
-                'domain': 'highgate-ladder.co.uk'
-            })
-
-            if dry_run:
-                print(f"[DRY-RUN] Would send to {subscription.user.email} for {ladder}")
-                sent += 1
-                continue
-
-            mail = EmailMessage(
-                subject=f"{ladder} Result Update",
-                body=message,
-                from_email=SUBSCRIPTION_EMAIL,
-                to=[subscription.user.email],
-                reply_to=[SUBSCRIPTION_EMAIL],
-            )
-            mail.extra_headers = {
-                'List-Unsubscribe': f'<mailto:unsubscribe@highgate-ladder.co.uk>, <{unsubscribe_url}>',
-                'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click',
-            }
-            mail.content_subtype = "html"
-            mail.send()
-            sent += 1
-
-    print(f"Done. Ladders skipped (no recent results): {skipped}. Emails processed: {sent}.")
+
+    # the results part is rendered once for each ladder and starting point, usually one per ladder
+    sections = {}
+    emails = {}
+    for subscription in due_subscriptions(season):
+        ladder = subscription.ladder
+        if subscription.last_notified_match_id is None:
+            start = {'since': max(subscription.subscribed_at, first_email_cutoff())}
+        else:
+            start = {'after_match': subscription.last_notified_match_id}
+        key = (ladder.id, subscription.newest_match) + tuple(start.values())
+        if key not in sections:
+            # nothing entered while the run is going is shown, it is left for the next run
+            sections[key] = ladder_section(ladder, ladder.get_email_latest(until_match=subscription.newest_match,
+                                                                           **start))
+
+        # one email per subscription, or per user for a digest, each made of [(subscription, section)]
+        email_key = subscription.user_id if digest else subscription.id
+        emails.setdefault(email_key, (subscription.user, []))[1].append((subscription, sections[key]))
+
+    messages = {}
+    for user, entries in emails.values():
+        subject = email_subject(season, entries)
+        if dry_run:
+            print(f"[DRY-RUN] Would send to {user.email}: {subject}")
+        messages[build_message(user, subject, entries)] = [subscription for subscription, _ in entries]
+
+    def mark_notified(sent_messages):
+        # a subscription moves on only once its email has gone, a failed one is tried again next run
+        newest = {}
+        for message in sent_messages:
+            for subscription in messages[message]:
+                newest.setdefault(subscription.newest_match, []).append(subscription.id)
+        for match_id, subscription_ids in newest.items():
+            LadderSubscription.objects.filter(id__in=subscription_ids).update(last_notified_match_id=match_id)
+
+    if dry_run:
+        sent, failed = len(messages), 0
+    else:
+        sent, failed = send_messages(list(messages), batch_size, workers, on_sent=mark_notified)
+    print(f"Done. Ladders with new results: {len({key[0] for key in sections})}. Emails processed: {sent}. "
+          f"Failed: {failed}.")
+    return sent, failed
 
 
 class Command(BaseCommand):
     help = "Send ladder email updates to subscribers."
 
     def add_arguments(self, parser):
-        parser.add_argument(
-            "--days",
-            type=int,
-            default=1,
-            help="Look back this many days for results (default: 1)"
-        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
             help="Do not send emails; just print what would be sent."
         )
+        parser.add_argument(
+            "--digest",
+            action="store_true",
+            help="Send each user one email covering all of their ladders rather than one per ladder."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Emails sent per SMTP connection (default: {BATCH_SIZE})"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help=f"Batches sent at once (default: {WORKERS})"
+        )
 
     def handle(self, *args, **options):
-        days = options["days"]
         dry_run = options["dry_run"]
-        self.stdout.write(f"Sending ladder emails (days={days}, dry_run={dry_run})...")
-        send_ladder_emails(days=days, dry_run=dry_run)
-        self.stdout.write(self.style.SUCCESS("Finished sending ladder emails."))
+        digest = options["digest"]
+        self.stdout.write(f"Sending ladder emails (dry_run={dry_run}, digest={digest})...")
+        _, failed = send_ladder_emails(dry_run=dry_run, batch_size=options["batch_size"],
+                                       workers=options["workers"], digest=digest)
+        if failed:
+            self.stdout.write(self.style.WARNING(f"Finished sending ladder emails, {failed} could not be sent."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Finished sending ladder emails."))
@@ -0,0 +1,67 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+
+
+def populate_standings(apps, schema_editor):
+    Result = apps.get_model('ladder', 'Result')
+    LadderStanding = apps.get_model('ladder', 'LadderStanding')
+
+    points = Case(When(result=9, then=Value(12)), default=F('result') + Value(1), output_field=IntegerField())
+    totals = (
+        Result.objects
+        .values('ladder_id', 'player_id')
+        .annotate(played=Count('id'), won=Count('id', filter=Q(result=9)), points=Sum(points))
+        .order_by()
+    )
+
+    rows = [
+        LadderStanding(
+            ladder_id=row['ladder_id'],
+            player_id=row['player_id'],
+            played=row['played'],
+            won=row['won'],
+            points=row['points'],
+            average=row['points'] / row['played'],
+        )
+        for row in totals
+    ]
+
+    # most points first, ties broken by average
+    rows.sort(key=lambda r: (r.ladder_id, -r.points, -r.average, r.player_id))
+    position, current_ladder = 0, None
+    for row in rows:
+        position = position + 1 if row.ladder_id == current_ladder else 1
+        current_ladder = row.ladder_id
+        row.position = position
+
+    LadderStanding.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0015_draftremoval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LadderStanding',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('won', models.PositiveIntegerField(default=0)),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(default=0)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('ladder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='ladder.ladder')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='ladder.player')),
+            ],
+            options={
+                'ordering': ['position'],
+                'indexes': [models.Index(fields=['ladder', 'position'], name='ladder_ladd_ladder__b3e23c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ladder', 'player'), name='ladder_standing_unique_player')],
+            },
+        ),
+        migrations.RunPython(populate_standings, migrations.RunPython.noop),
+    ]
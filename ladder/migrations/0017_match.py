@@ -0,0 +1,64 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:02
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_matches(apps, schema_editor):
+    Result = apps.get_model('ladder', 'Result')
+    Match = apps.get_model('ladder', 'Match')
+
+    # newest row wins when a player has more than one row against the same opponent
+    rows = {}
+    for result in Result.objects.order_by('id').iterator():
+        rows[(result.ladder_id, result.player_id, result.opponent_id)] = result
+
+    matches = []
+    for (ladder_id, player_id, opponent_id), winner_row in rows.items():
+        if winner_row.result != 9:
+            continue
+        loser_row = rows.get((ladder_id, opponent_id, player_id))
+        if loser_row is None or loser_row.result == 9:
+            continue  # incomplete or invalid pair
+        matches.append(Match(
+            ladder_id=ladder_id,
+            winner_id=player_id,
+            loser_id=opponent_id,
+            losing_score=loser_row.result,
+            date=winner_row.date_added,
+            entered_by_id=winner_row.entered_by_id or loser_row.entered_by_id,
+            inaccurate_flag=bool(winner_row.inaccurate_flag or loser_row.inaccurate_flag),
+        ))
+    Match.objects.bulk_create(matches, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0016_ladderstanding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('losing_score', models.IntegerField()),
+                ('date', models.DateField(verbose_name='Date added')),
+                ('inaccurate_flag', models.BooleanField(default=False)),
+                ('entered_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entered_matches', to=settings.AUTH_USER_MODEL)),
+                ('ladder', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='ladder.ladder')),
+                ('loser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches_lost', to='ladder.player')),
+                ('winner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches_won', to='ladder.player')),
+            ],
+            options={
+                'ordering': ['-date', '-id'],
+                'indexes': [models.Index(fields=['ladder', 'date'], name='ladder_matc_ladder__58bf24_idx')],
+                'constraints': [models.UniqueConstraint(models.F('ladder'), django.db.models.functions.comparison.Least('winner', 'loser'), django.db.models.functions.comparison.Greatest('winner', 'loser'), name='match_unique_pair')],
+            },
+        ),
+        migrations.RunPython(populate_matches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:03
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Sum, Value, When
+
+
+def remove_duplicate_results(apps, schema_editor):
+    """
+    Keep the newest row of any (ladder, player, opponent) duplicates, then recount the affected standings.
+    """
+    Result = apps.get_model('ladder', 'Result')
+    LadderStanding = apps.get_model('ladder', 'LadderStanding')
+
+    duplicates = (
+        Result.objects.values('ladder_id', 'player_id', 'opponent_id')
+        .annotate(rows=Count('id'), newest=Max('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+
+    affected = set()
+    for row in duplicates:
+        Result.objects.filter(
+            ladder_id=row['ladder_id'], player_id=row['player_id'], opponent_id=row['opponent_id'],
+        ).exclude(id=row['newest']).delete()
+        affected.add((row['ladder_id'], row['player_id']))
+
+    points = Case(When(result=9, then=Value(12)), default=F('result') + Value(1), output_field=IntegerField())
+    for ladder_id, player_id in affected:
+        totals = Result.objects.filter(ladder_id=ladder_id, player_id=player_id).aggregate(
+            played=Count('id'), won=Count('id', filter=Q(result=9)), points=Sum(points),
+        )
+        LadderStanding.objects.filter(ladder_id=ladder_id, player_id=player_id).update(
+            played=totals['played'],
+            won=totals['won'],
+            points=totals['points'],
+            average=totals['points'] / totals['played'],
+        )
+
+    for ladder_id in {ladder_id for ladder_id, _ in affected}:
+        standings = LadderStanding.objects.filter(ladder_id=ladder_id).order_by('-points', '-average', 'player_id')
+        for position, standing in enumerate(standings, start=1):
+            if standing.position != position:
+                standing.position = position
+                standing.save(update_fields=['position'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0017_match'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_results, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['ladder', 'date_added'], name='result_ladder_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['player', 'opponent'], name='result_player_opponent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='result',
+            constraint=models.UniqueConstraint(fields=('ladder', 'player', 'opponent'), name='result_unique_ladder_player_opponent'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+
+
+def populate_career_stats(apps, schema_editor):
+    Player = apps.get_model('ladder', 'Player')
+    Result = apps.get_model('ladder', 'Result')
+    League = apps.get_model('ladder', 'League')
+    PlayerCareerStats = apps.get_model('ladder', 'PlayerCareerStats')
+
+    points = Case(When(result=9, then=Value(12)), default=F('result') + Value(1), output_field=IntegerField())
+    totals = {
+        row['player_id']: row
+        for row in Result.objects.values('player_id')
+        .annotate(played=Count('id'), won=Count('id', filter=Q(result=9)), points=Sum(points))
+        .order_by()
+    }
+    ladder_sizes = dict(
+        League.objects.values('ladder_id').annotate(players=Count('id')).order_by().values_list('ladder_id', 'players')
+    )
+    possible = {}
+    for player_id, ladder_id in League.objects.filter(ladder__season__is_draft=False).values_list('player_id', 'ladder_id'):
+        possible[player_id] = possible.get(player_id, 0) + ladder_sizes[ladder_id] - 1
+
+    rows = []
+    for player_id in Player.objects.values_list('id', flat=True):
+        row = totals.get(player_id, {'played': 0, 'won': 0, 'points': 0})
+        possible_matches = possible.get(player_id, 0)
+        rows.append(PlayerCareerStats(
+            player_id=player_id,
+            played=row['played'],
+            won=row['won'],
+            points=row['points'] or 0,
+            possible_matches=possible_matches,
+            completion=row['played'] / possible_matches * 100.00 if possible_matches else 0,
+        ))
+    PlayerCareerStats.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0018_result_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerCareerStats',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='career_stats', serialize=False, to='ladder.player')),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('won', models.PositiveIntegerField(default=0)),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('possible_matches', models.PositiveIntegerField(default=0)),
+                ('completion', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_career_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0019_playercareerstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('season', 'Season'), ('ladder', 'Ladder')], max_length=6)),
+                ('object_id', models.PositiveIntegerField()),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'object_id'), name='data_version_unique_object')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0020_dataversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dataversion',
+            name='scope',
+            field=models.CharField(choices=[('season', 'Season'), ('ladder', 'Ladder'), ('player', 'Player')], max_length=6),
+        ),
+    ]
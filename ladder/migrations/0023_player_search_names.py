@@ -0,0 +1,46 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:15
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize(value):
+    folded = unicodedata.normalize('NFKD', value or '')
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    return ' '.join(folded.lower().split())
+
+
+def populate_search_names(apps, schema_editor):
+    Player = apps.get_model('ladder', 'Player')
+    players = list(Player.objects.only('id', 'first_name', 'last_name'))
+    for player in players:
+        player.search_first = normalize(player.first_name)
+        player.search_last = normalize(player.last_name)
+    Player.objects.bulk_update(players, ['search_first', 'search_last'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0022_dataversion_site_scope'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='search_first',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='search_last',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='dataversion',
+            name='scope',
+            field=models.CharField(choices=[('season', 'Season'), ('ladder', 'Ladder'), ('player', 'Player'), ('site', 'Whole site'), ('players', 'Player list')], max_length=10),
+        ),
+        migrations.RunPython(populate_search_names, migrations.RunPython.noop),
+    ]
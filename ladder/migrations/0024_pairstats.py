@@ -0,0 +1,60 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Sum, Value, When
+from django.db.models.functions import Greatest, Least
+
+
+def populate_pair_stats(apps, schema_editor):
+    Match = apps.get_model('ladder', 'Match')
+    PairStats = apps.get_model('ladder', 'PairStats')
+
+    low_won = Q(winner_id=F('low'))
+    rows = (
+        Match.objects.annotate(low=Least('winner', 'loser'), high=Greatest('winner', 'loser'))
+        .values('low', 'high')
+        .annotate(
+            played=Count('id'),
+            low_wins=Count('id', filter=low_won),
+            high_wins=Count('id', filter=~low_won),
+            low_points=Sum(Case(When(low_won, then=Value(12)), default=F('losing_score') + Value(1),
+                                output_field=IntegerField())),
+            high_points=Sum(Case(When(low_won, then=F('losing_score') + Value(1)), default=Value(12),
+                                 output_field=IntegerField())),
+            last_played=Max('date'),
+        )
+        .order_by()
+    )
+    PairStats.objects.bulk_create(
+        [PairStats(player_low_id=row.pop('low'), player_high_id=row.pop('high'), **row) for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0023_player_search_names'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PairStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('low_wins', models.PositiveIntegerField(default=0)),
+                ('high_wins', models.PositiveIntegerField(default=0)),
+                ('low_points', models.PositiveIntegerField(default=0)),
+                ('high_points', models.PositiveIntegerField(default=0)),
+                ('last_played', models.DateField(null=True)),
+                ('player_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pair_stats_high', to='ladder.player')),
+                ('player_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pair_stats_low', to='ladder.player')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('player_low', 'player_high'), name='pair_stats_unique_pair')],
+            },
+        ),
+        migrations.RunPython(populate_pair_stats, migrations.RunPython.noop),
+    ]
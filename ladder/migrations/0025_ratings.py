@@ -0,0 +1,74 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_ratings(apps, schema_editor):
+    # the same replay as ladder.ratings.replay(), with its constants inlined
+    Season = apps.get_model('ladder', 'Season')
+    Match = apps.get_model('ladder', 'Match')
+    PlayerRating = apps.get_model('ladder', 'PlayerRating')
+    SeasonRating = apps.get_model('ladder', 'SeasonRating')
+    MatchRating = apps.get_model('ladder', 'MatchRating')
+
+    ratings, played = {}, {}
+    for season in Season.objects.order_by('start_date', 'id'):
+        events, snapshot = [], {}
+        matches = Match.objects.filter(ladder__season=season).order_by('date', 'id')
+        for match_id, winner_id, loser_id in matches.values_list('id', 'winner_id', 'loser_id').iterator(2000):
+            winner = ratings.get(winner_id, 1500.0)
+            loser = ratings.get(loser_id, 1500.0)
+            change = 32 * (1 - 1 / (1 + 10 ** ((loser - winner) / 400)))
+            ratings[winner_id] = snapshot[winner_id] = winner + change
+            ratings[loser_id] = snapshot[loser_id] = loser - change
+            played[winner_id] = played.get(winner_id, 0) + 1
+            played[loser_id] = played.get(loser_id, 0) + 1
+            events.append(MatchRating(match_id=match_id, season_id=season.id, winner_id=winner_id,
+                                      loser_id=loser_id, change=change))
+        MatchRating.objects.bulk_create(events, batch_size=500)
+        SeasonRating.objects.bulk_create(
+            [SeasonRating(season_id=season.id, player_id=p, rating=r) for p, r in snapshot.items()], batch_size=500)
+
+    PlayerRating.objects.bulk_create(
+        [PlayerRating(player_id=p, rating=r, matches=played[p]) for p, r in ratings.items()], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0024_pairstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerRating',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='ladder.player')),
+                ('rating', models.FloatField()),
+                ('matches', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MatchRating',
+            fields=[
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to='ladder.match')),
+                ('change', models.FloatField()),
+                ('loser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ladder.player')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ladder.season')),
+                ('winner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ladder.player')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeasonRating',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField()),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_ratings', to='ladder.player')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='ladder.season')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('season', 'player'), name='season_rating_unique_player')],
+            },
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
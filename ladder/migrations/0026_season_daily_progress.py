@@ -0,0 +1,48 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_daily_progress(apps, schema_editor):
+    Match = apps.get_model('ladder', 'Match')
+    SeasonDailyProgress = apps.get_model('ladder', 'SeasonDailyProgress')
+
+    counts = (
+        Match.objects.values('ladder__season_id', 'ladder__season__start_date', 'date')
+        .annotate(added=Count('id'))
+        .order_by('ladder__season_id', 'date')
+    )
+    rows, season_id, cumulative = [], None, 0
+    for row in counts:
+        if row['ladder__season_id'] != season_id:
+            season_id, cumulative = row['ladder__season_id'], 0
+        cumulative += row['added']
+        rows.append(SeasonDailyProgress(season_id=season_id, day=(row['date'] - row['ladder__season__start_date']).days,
+                                        added=row['added'], cumulative=cumulative))
+    SeasonDailyProgress.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0025_ratings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonDailyProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.IntegerField()),
+                ('added', models.PositiveIntegerField(default=0)),
+                ('cumulative', models.PositiveIntegerField(default=0)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_progress', to='ladder.season')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('season', 'day'), name='season_daily_progress_unique_day')],
+            },
+        ),
+        migrations.RunPython(populate_daily_progress, migrations.RunPython.noop),
+    ]
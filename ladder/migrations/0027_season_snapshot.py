@@ -0,0 +1,22 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0026_season_daily_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonSnapshot',
+            fields=[
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='ladder.season')),
+                ('data', models.JSONField()),
+                ('created', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
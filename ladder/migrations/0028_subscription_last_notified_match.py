@@ -0,0 +1,19 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0027_season_snapshot'),
+    ]
+
+    operations = [
+        # left empty, the first run after this sends what the daily email would have, see first_email_cutoff
+        migrations.AddField(
+            model_name='laddersubscription',
+            name='last_notified_match_id',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
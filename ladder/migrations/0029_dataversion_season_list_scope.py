@@ -0,0 +1,18 @@
+# Generated by Django 5.2.14 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ladder', '0028_subscription_last_notified_match'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dataversion',
+            name='scope',
+            field=models.CharField(choices=[('season', 'Season'), ('ladder', 'Ladder'), ('player', 'Player'), ('site', 'Whole site'), ('players', 'Player list'), ('seasons', 'Season list')], max_length=10),
+        ),
+    ]
@@ -1,17 +1,34 @@
 from datetime import date
+import unicodedata
 import uuid
+from django.conf import settings
 from django.db import models
-from django.db.models import Avg, Count
+from django.db.models import Count, Sum, Max, Q, F, Case, When, Value, IntegerField, OuterRef, Subquery
 from django.contrib.auth.models import User
-from django.db.models.functions import TruncDate
+from django.db.models.functions import Coalesce, Least, Greatest
 from django.urls import reverse
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 import datetime
 
 from django.utils.timezone import now
 
 
+# Points rule: a win (9) is worth 12 (9 + 2 for winning + 1 for playing), anything else result + 1
+POINTS_EXPRESSION = Case(
+    When(result=9, then=Value(12)),
+    default=F('result') + Value(1),
+    output_field=IntegerField(),
+)
+
+
+def result_points(result):
+    """
+    The points rule above for a single score, for totals worked out in Python
+    """
+    return 12 if result == 9 else result + 1
+
+
 class Season(models.Model):
     name = models.CharField(max_length=150)
     start_date = models.DateField('Start date')
@@ -28,46 +45,91 @@ class Season(models.Model):
     def __str__(self):
         return str(self.start_date.year) + ' Round ' + str(self.season_round)
 
-    def get_stats(self):
+    @property
+    def is_closed(self):
         """
-        Generates the season stats
+        Published and finished, so its results will not change again
         """
-        # Get aggregated counts directly from related tables
-        player_count = League.objects.filter(ladder__season=self).count()
-        results_count = Result.objects.filter(ladder__season=self).count() / 2
+        return not self.is_draft and self.end_date < date.today()
 
-        # Calculate total possible games by iterating through ladders
-        # but get league counts efficiently
-        ladder_league_counts = self.ladder_set.annotate(
-            league_count=models.Count('league')
-        ).values_list('league_count', flat=True)
-
-        total_games_count = 0.0
-        for league_count in ladder_league_counts:
-            total_games_count += (league_count * (league_count - 1)) / 2
+    def cache_timeout(self):
+        """
+        Cache timeout for renders of the season and its ladders, closed seasons are kept until evicted
+        """
+        return None if self.is_closed else settings.LADDER_CACHE_TIMEOUT
 
-        # Avoid division by zero
-        percentage_played = (results_count / total_games_count) * 100 if total_games_count > 0 else 0
+    def get_stats(self):
+        """
+        Generates the season stats
+        """
+        return Season.stats_for([self])[self.id]
 
-        return {
-            'divisions': self.ladder_set.count(),
-            'percentage_played': "{0:.2f}".format(percentage_played),
-            'total_games_count': total_games_count,
-            'results_count': results_count,
-            'player_count': player_count
-        }
+    @classmethod
+    def stats_for(cls, seasons):
+        """
+        get_stats() of several seasons keyed by season id, from two grouped queries across all of them
+        """
+        seasons = list(seasons)
+        totals = {season.id: {'divisions': 0, 'player_count': 0, 'total_games_count': 0.0, 'results_count': 0}
+                  for season in seasons}
+
+        # league counts per ladder give the divisions, players and possible games
+        ladder_league_counts = (
+            Ladder.objects.filter(season__in=seasons)
+            .annotate(league_count=models.Count('league'))
+            .values_list('season_id', 'league_count')
+        )
+        for season_id, league_count in ladder_league_counts:
+            totals[season_id]['divisions'] += 1
+            totals[season_id]['player_count'] += league_count
+            totals[season_id]['total_games_count'] += (league_count * (league_count - 1)) / 2
+
+        match_counts = (
+            Match.objects.filter(ladder__season__in=seasons)
+            .values_list('ladder__season_id')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        for season_id, results_count in match_counts:
+            totals[season_id]['results_count'] = results_count
+
+        stats = {}
+        for season_id, row in totals.items():
+            # Avoid division by zero
+            total_games_count = row['total_games_count']
+            percentage_played = (row['results_count'] / total_games_count) * 100 if total_games_count > 0 else 0
+            stats[season_id] = {
+                'divisions': row['divisions'],
+                'percentage_played': "{0:.2f}".format(percentage_played),
+                'total_games_count': total_games_count,
+                'results_count': row['results_count'],
+                'player_count': row['player_count'],
+            }
+        return stats
 
     def get_leader_stats(self, user):
         """
-        Generates the list of leaders for current season
+        Generates the list of leaders for current season, for every division with two queries:
+        the ladders annotated with their player and match counts, and the top standings.
         """
-        current_leaders = {}
+        players = League.objects.filter(ladder=OuterRef('pk')).values('ladder').annotate(n=Count('id')).values('n')
+        played = Match.objects.filter(ladder=OuterRef('pk')).values('ladder').annotate(n=Count('id')).values('n')
+        ladders = self.ladder_set.annotate(
+            player_count=Coalesce(Subquery(players), 0),
+            matches_played=Coalesce(Subquery(played), 0),
+        )
 
-        # Prefetch related data to avoid N+1 queries
-        ladders = self.ladder_set.prefetch_related('league_set__player')
+        leaders = {
+            standing.ladder_id: standing
+            for standing in LadderStanding.objects.filter(ladder__season=self, position=1).select_related('player')
+        }
 
+        current_leaders = {}
         for ladder in ladders:
-            current_leaders[ladder.id] = ladder.get_leader(user=user)
+            league_count = 0 if self.is_draft else ladder.player_count
+            current_leaders[ladder.id] = ladder.leader_stats(
+                leaders.get(ladder.id), league_count, ladder.matches_played, user
+            )
 
         return {
             'current_leaders': current_leaders,
@@ -80,76 +142,80 @@ class Season(models.Model):
           - season_start (YYYY-MM-DD)
           - today_day (int, clamped to [0, season_length])
         """
-        # Daily result counts
-        daily_results = (
-            Result.objects
-            .filter(ladder__season=self)
-            .annotate(date_only=TruncDate('date_added'))
-            .values('date_only')
-            .annotate(added_count=Count('id'))
-            .order_by('date_only')
-        )
-
-        # Player counts per ladder
-        ladder_player_counts = (
-            self.ladder_set
-            .annotate(player_count=Count('league'))
-            .values_list('player_count', flat=True)
-        )
-
-        # Process results
-        played = []
-        played_days = []
-        played_cumulative = []
-        played_cumulative_count = 0
-        latest_result = None
-
-        for r in daily_results:
-            date_added = r['date_only']
-            results_today = int(r['added_count'])
+        return Season.progress_for([self])[self.id]
 
-            # Convert results -> matches
-            matches_today = results_today // 2
-
-            played.append(matches_today)
-            played_days.append((date_added - self.start_date).days)
-
-            played_cumulative_count += matches_today
-            played_cumulative.append(int(played_cumulative_count))
-            latest_result = date_added
+    @classmethod
+    def progress_for(cls, seasons):
+        """
+        get_progress() of several seasons keyed by season id, read from the daily progress table in two queries
+        """
+        seasons = list(seasons)
+        daily = {season.id: [] for season in seasons}
+        for row in SeasonDailyProgress.objects.filter(season__in=seasons).order_by('season_id', 'day'):
+            daily[row.season_id].append(row)
 
         # Total possible matches across ladders: nC2 per ladder
-        total_matches = sum(
-            (pc - 1) * pc // 2
-            for pc in ladder_player_counts
+        total_matches = dict.fromkeys(daily, 0)
+        ladder_player_counts = (
+            Ladder.objects.filter(season__in=seasons)
+            .annotate(player_count=Count('league'))
+            .values_list('season_id', 'player_count')
         )
+        for season_id, pc in ladder_player_counts:
+            total_matches[season_id] += (pc - 1) * pc // 2
+
+        progress = {}
+        for season in seasons:
+            rows = daily[season.id]
+            latest_result = season.start_date + datetime.timedelta(days=rows[-1].day) if rows else None
+
+            season_length = (season.end_date - season.start_date).days
+            # Compute "today" relative to start; clamp to chart domain
+            today_idx = (now().date() - season.start_date).days
+            today_idx = max(0, min(today_idx, season_length))
+
+            progress[season.id] = {
+                "season_days": [0, season_length],
+                "season_total_matches": [0, int(total_matches[season.id])],
+                "played_days": [row.day for row in rows],
+                "played": [row.added for row in rows],
+                "played_cumulative": [row.cumulative for row in rows],
+                "latest_result": latest_result.strftime("%B %d, %Y") if latest_result else "-",
+                "season_start": season.start_date.isoformat(),  # "YYYY-MM-DD"
+                "today_day": today_idx,
+            }
+        return progress
 
-        season_length = (self.end_date - self.start_date).days
-        # Compute "today" relative to start; clamp to chart domain
-        today_idx = (now().date() - self.start_date).days
-        today_idx = max(0, min(today_idx, season_length))
 
-        return {
-            "season_days": [0, season_length],
-            "season_total_matches": [0, int(total_matches)],
-            "played_days": played_days,
-            "played": played,
-            "played_cumulative": played_cumulative,
-            "latest_result": latest_result.strftime("%B %d, %Y") if latest_result else "-",
-            "season_start": self.start_date.isoformat(),  # "YYYY-MM-DD"
-            "today_day": today_idx,
-        }
+def normalize_name(value):
+    """
+    Lower cased, accent folded and whitespace collapsed form of a name, as searched on
+    """
+    folded = unicodedata.normalize('NFKD', value or '')
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    return ' '.join(folded.lower().split())
 
 
 class Player(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, blank=True)
+    # normalize_name() of the names, kept in step on save, for the search index
+    search_first = models.CharField(max_length=100, db_index=True, editable=False, default='')
+    search_last = models.CharField(max_length=100, db_index=True, editable=False, default='')
     is_authed = False
 
     def __str__(self):
         return self.full_name(authenticated=self.is_authed)
 
+    def save(self, *args, **kwargs):
+        self.search_first = normalize_name(self.first_name)
+        self.search_last = normalize_name(self.last_name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'search_first', 'search_last'}
+        super().save(*args, **kwargs)
+
     def full_name(self, authenticated = False):
         string = self.first_name
         if self.last_name:
@@ -162,41 +228,29 @@ class Player(models.Model):
 
     def player_stats(self):
         """
-        Calculates stats about the players historical performance.
+        Stats about the players historical performance, read from their precomputed career stats.
         """
-        played = self.result_player.count()
-        won = float(self.result_player.filter(result=9).count())
-        lost = played - won  # more efficient than doing a count on the object
+        try:
+            career = self.career_stats
+        except PlayerCareerStats.DoesNotExist:
+            career = None
 
         # safe division (not by 0)
-        if played != 0:
-            win_rate = won / float(played) * 100.00
-            # 2 points for winning, 1 for playing
-            additional_points = ((won * 2) + played) / played
-        else:
+        if career is None or career.played == 0:
             return {
                 'played': "-",
                 'win_rate': "- %",
                 'average': "-"
             }
 
-        # work out the average with additional points
-        average = list(self.result_player.aggregate(Avg('result')).values())[0]
-        average_with_additional = average + additional_points
-
-        leagues = self.league_set.filter(player=self, ladder__season__is_draft=False)
-
-        match_count = 0
-        for league in leagues:
-            # count other players in ladder minus the player to get games
-            match_count += league.ladder.league_set.count() - 1
-
-        completion_rate = float(played) / float(match_count) * 100.00
+        win_rate = career.won / float(career.played) * 100.00
+        # points include 2 for winning and 1 for playing
+        average_with_additional = career.points / float(career.played)
 
         return {
-            'played': played,
+            'played': career.played,
             'win_rate': "{0:.2f} %".format(win_rate),
-            'completion_rate': "{0:.2f} %".format(completion_rate),
+            'completion_rate': "{0:.2f} %".format(career.completion),
             'average': "{0:.2f}".format(average_with_additional)
         }
 
@@ -220,27 +274,21 @@ class Ladder(models.Model):
         """
         Finds the leader of the ladder
         """
-        from collections import defaultdict
-
-        # Use defaultdict to avoid KeyError handling
-        totals = defaultdict(int)
-
-        # Get results with player data in one query
-        results = self.result_set.select_related('player').filter(ladder=self)
-
-        for result in results:
-            if result.result == 9:
-                totals[result.player] += int(result.result) + 3
-            else:
-                totals[result.player] += int(result.result) + 1
+        leader = self.standings.filter(position=1).select_related('player').first()
+        league_count = self.league_set.filter(ladder__season__is_draft=False).count()
+        return self.leader_stats(leader, league_count, self.matches.count(), user)
 
+    def leader_stats(self, leader, league_count, matches_played, user):
+        """
+        Formats the leader entry used by the season stats, from the top standing and the ladder's counts
+        """
         url = reverse('ladder', kwargs={
             'year': self.season.start_date.year,
             'season_round': self.season.season_round,
             'division_id': self.division
         })
 
-        if not totals:
+        if leader is None:
             return {
                 'player': 'No Results',
                 'player_id': '../#',
@@ -250,108 +298,68 @@ class Ladder(models.Model):
                 'played': 0
             }
 
-        # Find the leader
-        player = max(totals.items(), key=lambda x: x[1])[0]
-
-        # Calculate percentage played more efficiently
-        league_count = self.league_set.filter(ladder__season__is_draft=False).count()
+        # Calculate percentage played
         if league_count > 1:
             total_matches = league_count * (league_count - 1) / 2
-            matches_played = self.result_set.count() / 2
             perc_matches_played = (matches_played / total_matches) * 100 if total_matches > 0 else 0
         else:
             perc_matches_played = 0
 
         return {
-            'player': player.full_name(authenticated=user.is_authenticated),
-            'player_id': player.id,
-            'total': totals[player],
+            'player': leader.player.full_name(authenticated=user.is_authenticated),
+            'player_id': leader.player.id,
+            'total': leader.points,
             'division': self.division,
             'url': url,
             'played': round(perc_matches_played, 2)
         }
 
+    def latest_matches(self, limit=None, since=None, before=None, after_match=None, until_match=None):
+        """
+        Latest matches in the ladder, newest first, fetched with both players in one query.
+        `since` keeps matches added on or after a date and `before` those added earlier, so the two
+        can be used as a cursor. `after_match` and `until_match` do the same by match id, keeping matches
+        entered after one match and up to and including another. Each item is keyed by the match's order
+        independent pair_key:
+        {'pair_key', 'player', 'player_result', 'opponent_result', 'opponent', 'date_added'}
+        """
+        matches = self.matches.select_related('winner', 'loser').order_by('-date', '-id')
+        if since is not None:
+            matches = matches.filter(date__gte=since)
+        if before is not None:
+            matches = matches.filter(date__lt=before)
+        if after_match is not None:
+            matches = matches.filter(id__gt=after_match)
+        if until_match is not None:
+            matches = matches.filter(id__lte=until_match)
+        if limit is not None:
+            matches = matches[:limit]
+
+        return [{'pair_key': match.pair_key, 'player': match.winner, 'player_result': 9,
+                 'opponent_result': match.losing_score, 'opponent': match.loser, 'date_added': match.date}
+                for match in matches]
+
     def get_latest_results(self):
         """
         Gets latest results for the ladder
         """
-        results = {}
-        for result in self.result_set.filter(ladder=self).order_by('-date_added')[:10]:  # [:10] to limit to 5
-
-            try:
-                opponent = self.result_set.filter(ladder=self, player=result.opponent, opponent=result.player)[0]
-            except IndexError:
-                continue  # this exception happens if result does not have opponent
-            player_opponent_index = ''.join(str(e) for e in sorted([result.player.id, opponent.player.id]))
-            try:
-                if results[player_opponent_index]:
-                    continue
-            except KeyError:
-                results[player_opponent_index] = {'player': result.player, 'player_result': result.result,
-                                                  'opponent_result': opponent.result, 'opponent': opponent.player,
-                                                  'date_added': result.date_added}
-
-        ordered_results = {}
-        i = 0
-        for key in sorted(results, key=lambda x: (results[x]['date_added']), reverse=True):
-            ordered_results[i] = results[key]
-            i += 1
-
-        return list(ordered_results.items())
+        return list(enumerate(self.latest_matches(limit=5)))
 
-    def get_email_latest(self, days: int = 1, limit: int = 5):
+    def get_email_latest(self, days: int = 1, limit: int = 5, since=None, after_match=None, until_match=None):
         """
         Return two buckets for the email:
-          - 'new': all new results in the last `days` (deduped by pair, newest first)
-          - 'recent': the next `limit` recent results (deduped) excluding those already in 'new'
-        Structure of each item matches get_latest_results():
-        {'player', 'player_result', 'opponent_result', 'opponent', 'date_added'}
-        """
-        since = now().date() - datetime.timedelta(days=days)
-
-        # Helper to build the pairwise, deduped list with optional date filter
-        def _collect(filter_since=None, exclude_keys=None, max_items=None):
-            exclude_keys = exclude_keys or set()
-            out = {}
-            qs = self.result_set.filter(ladder=self)
-            if filter_since is not None:
-                qs = qs.filter(date_added__gte=filter_since)
-            qs = qs.order_by('-date_added')
-
-            for result in qs:
-                try:
-                    opponent = self.result_set.filter(
-                        ladder=self, player=result.opponent, opponent=result.player
-                    )[0]
-                except IndexError:
-                    continue  # skip incomplete pairs
-
-                pair_key = ''.join(str(e) for e in sorted([result.player_id, opponent.player_id]))
-                if pair_key in exclude_keys or pair_key in out:
-                    continue
-
-                out[pair_key] = {
-                    'player': result.player,
-                    'player_result': result.result,
-                    'opponent_result': opponent.result,
-                    'opponent': opponent.player,
-                    'date_added': result.date_added,
-                }
-
-                if max_items is not None and len(out) >= max_items:
-                    break
-
-            # order newest first
-            ordered = sorted(out.values(), key=lambda x: x['date_added'], reverse=True)
-            return ordered, set(out.keys())
-
-        # (1) Everything new in the past `days`
-        new_list, new_keys = _collect(filter_since=since)
-
-        # (2) Next N recent excluding the above
-        recent_list, _ = _collect(filter_since=None, exclude_keys=new_keys, max_items=limit)
-
-        return {'new': new_list, 'recent': recent_list}
+          - 'new': all new results in the last `days` (or on and after `since`), newest first
+          - 'recent': the next `limit` results added before that
+        With `after_match` new results are those entered after that match id instead, and `until_match` leaves
+        out anything entered after the given match. Structure of each item matches latest_matches().
+        """
+        if after_match is not None:
+            return {'new': self.latest_matches(after_match=after_match, until_match=until_match),
+                    'recent': self.latest_matches(limit=limit, until_match=after_match)}
+        if since is None:
+            since = now().date() - datetime.timedelta(days=days)
+        return {'new': self.latest_matches(since=since, until_match=until_match),
+                'recent': self.latest_matches(limit=limit, before=since, until_match=until_match)}
 
     def get_stats(self):
         """
@@ -359,7 +367,7 @@ class Ladder(models.Model):
         """
         total_matches_played = 0.00
         total_matches = self.league_set.count() * (self.league_set.count() - 1) / 2
-        total_matches_played += self.result_set.count() / 2
+        total_matches_played += self.matches.count()
         perc_matches_played = (total_matches_played / total_matches) * 100
 
         return {
@@ -373,6 +381,9 @@ class LadderSubscription(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     subscribed_at = models.DateField()
     unsubscribe_token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    # id of the newest match already emailed, None until the first email when everything played since
+    # subscribing, and no earlier than yesterday, is new. Not a foreign key, the match may be removed with its results.
+    last_notified_match_id = models.PositiveIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.user.email
@@ -390,13 +401,12 @@ class League(models.Model):
 
     def player_stats(self):
         """
-        Generates the player stats for player listings - Optimized to use prefetched data
+        Generates the player stats for player listings from the ladder standings.
+        Uses prefetched data from 'player__standings' and 'ladder__league_set' when available.
         """
-        # Get all results for this player in this ladder
-        # This should use prefetched data from 'player__result_player'
-        results = [r for r in self.player.result_player.all() if r.ladder_id == self.ladder.id]
+        standing = next((s for s in self.player.standings.all() if s.ladder_id == self.ladder_id), None)
 
-        if not results:
+        if standing is None:
             return {
                 'total_points': 0,
                 'games': 0,
@@ -405,29 +415,15 @@ class League(models.Model):
                 'percplayed': 0
             }
 
-        total_points = 0.0
-        games = len(results)
-        won_count = 0
-
-        for result in results:
-            if result.result == 9:
-                total_points += (result.result + 2 + 1)  # two for winning one for playing
-                won_count += 1
-            else:
-                total_points += (result.result + 1)  # one for playing
-
-        # Calculate stats
-        pointsdivgames = total_points / games if games > 0 else 0
-
         # Use prefetched league_set instead of .count() which always hits DB
         league_count = len(self.ladder.league_set.all())  # Uses prefetched data
-        percplayed = games / (league_count - 1) * 100 if league_count > 1 else 0
+        percplayed = standing.played / (league_count - 1) * 100 if league_count > 1 else 0
 
         return {
-            'total_points': total_points,
-            'games': games,
-            'pointsdivgames': pointsdivgames,
-            'won_count': won_count,
+            'total_points': float(standing.points),
+            'games': standing.played,
+            'pointsdivgames': standing.average,
+            'won_count': standing.won,
             'percplayed': percplayed
         }
 
@@ -441,10 +437,815 @@ class Result(models.Model):
     inaccurate_flag = models.BooleanField(default=None)
     entered_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='entered_results')
 
+    class Meta:
+        constraints = [
+            # one row per player per pairing, the unique index also serves (ladder, player[, opponent]) lookups
+            models.UniqueConstraint(fields=['ladder', 'player', 'opponent'], name='result_unique_ladder_player_opponent'),
+        ]
+        indexes = [
+            # latest results, email updates and recent activity checks
+            models.Index(fields=['ladder', 'date_added'], name='result_ladder_date_idx'),
+            # player history and head to head
+            models.Index(fields=['player', 'opponent'], name='result_player_opponent_idx'),
+        ]
+
     def __str__(self):
         return (self.player.first_name + ' ' + self.player.last_name) + ' vs ' + (
             self.opponent.first_name + ' ' + self.opponent.last_name) + (' score: ' + str(self.result))
 
+class LadderStanding(models.Model):
+    """
+    Materialised per-ladder totals for each player with results, kept current by the Result signals below.
+    """
+    ladder = models.ForeignKey(Ladder, on_delete=models.CASCADE, related_name='standings')
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='standings')
+    played = models.PositiveIntegerField(default=0)
+    won = models.PositiveIntegerField(default=0)
+    points = models.PositiveIntegerField(default=0)
+    average = models.FloatField(default=0)
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['ladder', 'player'], name='ladder_standing_unique_player'),
+        ]
+        indexes = [models.Index(fields=['ladder', 'position'])]
+
+    def __str__(self):
+        return f"{self.ladder}: {self.player} ({self.points})"
+
+    @staticmethod
+    def _totals(results):
+        """
+        Aggregates a Result queryset into played/won/points rows per (ladder, player).
+        """
+        return (
+            results
+            .values('ladder_id', 'player_id')
+            .annotate(played=Count('id'), won=Count('id', filter=Q(result=9)), points=Sum(POINTS_EXPRESSION))
+            .order_by()
+        )
+
+    @classmethod
+    def refresh(cls, ladder_id, player_ids):
+        """
+        Recalculates the standings of the given players in one ladder, then re-ranks the ladder.
+        """
+        totals = {
+            row['player_id']: row
+            for row in cls._totals(Result.objects.filter(ladder_id=ladder_id, player_id__in=player_ids))
+        }
+
+        for player_id in player_ids:
+            row = totals.get(player_id)
+            if row is None:
+                cls.objects.filter(ladder_id=ladder_id, player_id=player_id).delete()
+                continue
+            cls.objects.update_or_create(
+                ladder_id=ladder_id, player_id=player_id,
+                defaults={
+                    'played': row['played'],
+                    'won': row['won'],
+                    'points': row['points'],
+                    'average': row['points'] / row['played'],
+                }
+            )
+
+        cls.rank(ladder_id)
+
+    @classmethod
+    def rank(cls, ladder_id):
+        """
+        Renumbers positions in a ladder: most points first, ties broken by average.
+        """
+        standings = list(cls.objects.filter(ladder_id=ladder_id).order_by('-points', '-average', 'player_id'))
+        changed = []
+        for position, standing in enumerate(standings, start=1):
+            if standing.position != position:
+                standing.position = position
+                changed.append(standing)
+        if changed:
+            cls.objects.bulk_update(changed, ['position'])
+
+    @classmethod
+    def rebuild(cls, ladders):
+        """
+        Rebuilds the standings of the given ladders from scratch, returns the number of rows written.
+        """
+        ladder_ids = [ladder.id for ladder in ladders]
+        rows = []
+        for row in cls._totals(Result.objects.filter(ladder_id__in=ladder_ids)):
+            rows.append(cls(
+                ladder_id=row['ladder_id'],
+                player_id=row['player_id'],
+                played=row['played'],
+                won=row['won'],
+                points=row['points'],
+                average=row['points'] / row['played'],
+            ))
+
+        # rank in memory per ladder, mirroring rank()
+        rows.sort(key=lambda r: (r.ladder_id, -r.points, -r.average, r.player_id))
+        position, current_ladder = 0, None
+        for row in rows:
+            position = position + 1 if row.ladder_id == current_ladder else 1
+            current_ladder = row.ladder_id
+            row.position = position
+
+        cls.objects.filter(ladder_id__in=ladder_ids).delete()
+        cls.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
+
+
+class Match(models.Model):
+    """
+    One row per played match, derived from the mirrored winner/loser Result pair.
+
+    Result stays the record that is written (views, admin and the API), the Result signals below keep this
+    table in step so readers that think in matches never have to re-pair rows.
+    """
+    ladder = models.ForeignKey(Ladder, on_delete=models.CASCADE, related_name='matches')
+    winner = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='matches_won')
+    loser = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='matches_lost')
+    losing_score = models.IntegerField()
+    date = models.DateField('Date added')
+    entered_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='entered_matches')
+    inaccurate_flag = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-date', '-id']
+        constraints = [
+            models.UniqueConstraint(
+                F('ladder'), Least('winner', 'loser'), Greatest('winner', 'loser'),
+                name='match_unique_pair',
+            ),
+        ]
+        indexes = [models.Index(fields=['ladder', 'date'])]
+
+    def __str__(self):
+        return f"{self.winner} beat {self.loser} 9-{self.losing_score}"
+
+    @property
+    def pair_key(self):
+        """
+        Order independent key for the two players, as used by the result entry urls
+        """
+        return '-'.join(str(i) for i in sorted((self.winner_id, self.loser_id)))
+
+    @classmethod
+    def for_pair(cls, ladder_id, player_a_id, player_b_id):
+        return cls.objects.filter(ladder_id=ladder_id).filter(
+            Q(winner_id=player_a_id, loser_id=player_b_id) | Q(winner_id=player_b_id, loser_id=player_a_id)
+        )
+
+    @classmethod
+    def sync_pair(cls, ladder_id, player_a_id, player_b_id):
+        """
+        Brings the match for two players in line with their Result rows: written when both mirror rows
+        exist with exactly one winner, removed otherwise.
+        """
+        rows = list(Result.objects.filter(
+            Q(player_id=player_a_id, opponent_id=player_b_id) | Q(player_id=player_b_id, opponent_id=player_a_id),
+            ladder_id=ladder_id,
+        ).order_by('-id'))
+        by_player = {}
+        for row in rows:
+            by_player.setdefault(row.player_id, row)  # newest row wins if duplicates exist
+
+        winners = [r for r in by_player.values() if r.result == 9]
+        if len(by_player) != 2 or len(winners) != 1:
+            cls.for_pair(ladder_id, player_a_id, player_b_id).delete()
+            return None
+
+        winner_row = winners[0]
+        loser_row = by_player[winner_row.opponent_id]
+        fields = {
+            'winner_id': winner_row.player_id,
+            'loser_id': loser_row.player_id,
+            'losing_score': loser_row.result,
+            'date': winner_row.date_added,
+            'entered_by_id': winner_row.entered_by_id or loser_row.entered_by_id,
+            'inaccurate_flag': bool(winner_row.inaccurate_flag or loser_row.inaccurate_flag),
+        }
+
+        match = cls.for_pair(ladder_id, player_a_id, player_b_id).first()
+        if match is None:
+            return cls.objects.create(ladder_id=ladder_id, **fields)
+        if any(getattr(match, name) != value for name, value in fields.items()):
+            for name, value in fields.items():
+                setattr(match, name, value)
+            match.save()
+        return match
+
+    @classmethod
+    def rebuild(cls, ladders):
+        """
+        Brings every match of the given ladders in line with their Result rows, as sync_pair() does for one pair,
+        returns the number of matches. Matches that still stand keep their ids, which ratings and subscription
+        emails refer to. Bulk writes skip the Match signals, rebuild what is derived from matches after.
+        """
+        ladder_ids = [ladder.id for ladder in ladders]
+        rows = {}
+        for row in Result.objects.filter(ladder_id__in=ladder_ids).order_by('id'):
+            rows[(row.ladder_id, row.player_id, row.opponent_id)] = row  # newest row wins if duplicates exist
+
+        wanted = {}
+        for (ladder_id, player_id, opponent_id), winner_row in rows.items():
+            loser_row = rows.get((ladder_id, opponent_id, player_id))
+            if winner_row.result != 9 or loser_row is None or loser_row.result == 9:
+                continue  # lost, incomplete or both claiming the win
+            wanted[(ladder_id, min(player_id, opponent_id), max(player_id, opponent_id))] = {
+                'winner_id': player_id,
+                'loser_id': opponent_id,
+                'losing_score': loser_row.result,
+                'date': winner_row.date_added,
+                'entered_by_id': winner_row.entered_by_id or loser_row.entered_by_id,
+                'inaccurate_flag': bool(winner_row.inaccurate_flag or loser_row.inaccurate_flag),
+            }
+
+        existing = {
+            (match.ladder_id, min(match.winner_id, match.loser_id), max(match.winner_id, match.loser_id)): match
+            for match in cls.objects.filter(ladder_id__in=ladder_ids)
+        }
+        created, changed = [], []
+        for key, fields in wanted.items():
+            match = existing.pop(key, None)
+            if match is None:
+                created.append(cls(ladder_id=key[0], **fields))
+            elif any(getattr(match, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(match, name, value)
+                changed.append(match)
+
+        # whatever is left no longer has a valid pair of results
+        cls.objects.filter(id__in=[match.id for match in existing.values()]).delete()
+        cls.objects.bulk_update(changed, ['winner', 'loser', 'losing_score', 'date', 'entered_by', 'inaccurate_flag'],
+                                batch_size=500)
+        cls.objects.bulk_create(created, batch_size=500)
+        return len(wanted)
+
+
+class SeasonDailyProgress(models.Model):
+    """
+    Matches added on each day of a season with the running total, the series behind the progress chart.
+    Day is counted from the season start, only days with matches have a row. Kept in step by the Match signals.
+    """
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='daily_progress')
+    day = models.IntegerField()
+    added = models.PositiveIntegerField(default=0)
+    cumulative = models.PositiveIntegerField(default=0)
+
+    BATCH_SIZE = 500
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'day'], name='season_daily_progress_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.season} day {self.day}: {self.cumulative}"
+
+    @classmethod
+    def _season_day(cls, ladder_id, match_date):
+        ladder = Ladder.objects.filter(pk=ladder_id).values_list('season_id', 'season__start_date').first()
+        if ladder is None:
+            return None, None  # the ladder is being deleted along with its season
+        return ladder[0], (match_date - ladder[1]).days
+
+    @classmethod
+    def add(cls, ladder_id, match_date):
+        season_id, day = cls._season_day(ladder_id, match_date)
+        before = cls.objects.filter(season_id=season_id, day__lt=day).order_by('-day').values_list(
+            'cumulative', flat=True).first()
+        cls.objects.bulk_create([cls(season_id=season_id, day=day, cumulative=before or 0)], ignore_conflicts=True)
+        cls.objects.filter(season_id=season_id, day=day).update(added=F('added') + 1)
+        cls.objects.filter(season_id=season_id, day__gte=day).update(cumulative=F('cumulative') + 1)
+
+    @classmethod
+    def remove(cls, ladder_id, match_date):
+        """
+        Takes a match off its day, only updating and deleting rows so it is safe inside cascading deletes
+        """
+        season_id, day = cls._season_day(ladder_id, match_date)
+        if season_id is None:
+            return
+        cls.objects.filter(season_id=season_id, day__gte=day, cumulative__gt=0).update(cumulative=F('cumulative') - 1)
+        cls.objects.filter(season_id=season_id, day=day, added__gt=0).update(added=F('added') - 1)
+        cls.objects.filter(season_id=season_id, day=day, added=0).delete()
+
+    @classmethod
+    def rebuild(cls, seasons=None):
+        """
+        Recounts the series of the given seasons (default all) from the match table, returns the rows written.
+        """
+        seasons = Season.objects.all() if seasons is None else seasons
+        season_ids = list(seasons.values_list('id', flat=True))
+        counts = (
+            Match.objects.filter(ladder__season_id__in=season_ids)
+            .values('ladder__season_id', 'ladder__season__start_date', 'date')
+            .annotate(added=Count('id'))
+            .order_by('ladder__season_id', 'date')
+        )
+        rows, season_id, cumulative = [], None, 0
+        for row in counts:
+            if row['ladder__season_id'] != season_id:
+                season_id, cumulative = row['ladder__season_id'], 0
+            cumulative += row['added']
+            rows.append(cls(season_id=season_id, day=(row['date'] - row['ladder__season__start_date']).days,
+                            added=row['added'], cumulative=cumulative))
+
+        cls.objects.filter(season_id__in=season_ids).delete()
+        cls.objects.bulk_create(rows, batch_size=cls.BATCH_SIZE)
+        return len(rows)
+
+
+class SeasonSnapshot(models.Model):
+    """
+    The final grids, leaders, stats and progress of a closed season, see ladder.snapshot.
+    Pages of a season with a snapshot are rendered from it instead of the live tables.
+    """
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, primary_key=True, related_name='snapshot')
+    data = models.JSONField()
+    created = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.season} snapshot"
+
+
+class PairStats(models.Model):
+    """
+    Head to head totals of two players across every ladder, derived from their matches and kept in step by the
+    Result signals below. player_low is always the lower id of the pair.
+    """
+    player_low = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='pair_stats_low')
+    player_high = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='pair_stats_high')
+    played = models.PositiveIntegerField(default=0)
+    low_wins = models.PositiveIntegerField(default=0)
+    high_wins = models.PositiveIntegerField(default=0)
+    low_points = models.PositiveIntegerField(default=0)
+    high_points = models.PositiveIntegerField(default=0)
+    last_played = models.DateField(null=True)
+
+    BATCH_SIZE = 500
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['player_low', 'player_high'], name='pair_stats_unique_pair'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_low} v {self.player_high}: {self.low_wins}-{self.high_wins}"
+
+    def for_player(self, player_id):
+        """
+        The pair from one player's side: opponent, won, lost and points
+        """
+        if player_id == self.player_low_id:
+            return {'opponent_id': self.player_high_id, 'won': self.low_wins, 'lost': self.high_wins,
+                    'points': self.low_points}
+        return {'opponent_id': self.player_low_id, 'won': self.high_wins, 'lost': self.low_wins,
+                'points': self.high_points}
+
+    @classmethod
+    def involving(cls, player_id):
+        return cls.objects.filter(Q(player_low_id=player_id) | Q(player_high_id=player_id))
+
+    @classmethod
+    def for_pair(cls, player_a_id, player_b_id):
+        low, high = sorted((int(player_a_id), int(player_b_id)))
+        return cls.objects.filter(player_low_id=low, player_high_id=high).first()
+
+    @staticmethod
+    def _aggregates(low):
+        """
+        Aggregates of a pair's matches, low is the lower player id of the pair as a value or an expression.
+        """
+        low_won = Q(winner_id=low)
+        return {
+            'played': Count('id'),
+            'low_wins': Count('id', filter=low_won),
+            'high_wins': Count('id', filter=~low_won),
+            'low_points': Sum(Case(When(low_won, then=Value(12)), default=F('losing_score') + Value(1),
+                                   output_field=IntegerField())),
+            'high_points': Sum(Case(When(low_won, then=F('losing_score') + Value(1)), default=Value(12),
+                                    output_field=IntegerField())),
+            'last_played': Max('date'),
+        }
+
+    @classmethod
+    def refresh(cls, player_a_id, player_b_id, create=True):
+        """
+        Recounts one pair from its matches. With create=False an existing row is updated or removed but
+        never inserted, for deletes that may be cascading from one of the players.
+        """
+        low, high = sorted((player_a_id, player_b_id))
+        totals = Match.objects.filter(
+            Q(winner_id=low, loser_id=high) | Q(winner_id=high, loser_id=low)
+        ).aggregate(**cls._aggregates(low))
+
+        pair = cls.objects.filter(player_low_id=low, player_high_id=high)
+        if not totals['played']:
+            pair.delete()
+        elif create:
+            cls.objects.update_or_create(player_low_id=low, player_high_id=high, defaults=totals)
+        else:
+            pair.update(**totals)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recounts every pair from the match table, returns the number of pairs written.
+        """
+        rows = (
+            Match.objects.annotate(low=Least('winner', 'loser'), high=Greatest('winner', 'loser'))
+            .values('low', 'high')
+            .annotate(**cls._aggregates(F('low')))
+            .order_by()
+        )
+        pairs = [cls(player_low_id=row.pop('low'), player_high_id=row.pop('high'), **row) for row in rows]
+        cls.objects.all().delete()
+        cls.objects.bulk_create(pairs, batch_size=cls.BATCH_SIZE)
+        return len(pairs)
+
+
+class PlayerRating(models.Model):
+    """
+    A player's current Elo rating, see ladder.ratings. Updated as matches are entered and rebuilt by the
+    rebuild_ratings command.
+    """
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    rating = models.FloatField()
+    matches = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.player}: {self.rating:.0f}"
+
+
+class SeasonRating(models.Model):
+    """
+    A player's rating as it stood after their last match of a season.
+    """
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='ratings')
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='season_ratings')
+    rating = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'player'], name='season_rating_unique_player'),
+        ]
+
+
+class MatchRating(models.Model):
+    """
+    The rating change a match applied, kept so the change can be taken back when the match is removed or its
+    winner changes.
+    """
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='+')
+    winner = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='+')
+    loser = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='+')
+    change = models.FloatField()
+
+
+class PlayerCareerStats(models.Model):
+    """
+    Precomputed career totals for a player, kept current by the Result, League and Season signals below.
+    """
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, primary_key=True, related_name='career_stats')
+    played = models.PositiveIntegerField(default=0)
+    won = models.PositiveIntegerField(default=0)
+    points = models.PositiveIntegerField(default=0)
+    possible_matches = models.PositiveIntegerField(default=0)
+    completion = models.FloatField(default=0)
+
+    BATCH_SIZE = 500
+
+    def __str__(self):
+        return f"{self.player}: {self.played} played"
+
+    @classmethod
+    def refresh(cls, player_ids, create=True):
+        """
+        Recalculates the career stats of the given players with a fixed number of queries per batch.
+
+        Deletes pass create=False so a cascade removing a player never re-inserts that player's row.
+        """
+        player_ids = list(player_ids)
+        if not create:
+            player_ids = list(cls.objects.filter(player_id__in=player_ids).values_list('player_id', flat=True))
+        for start in range(0, len(player_ids), cls.BATCH_SIZE):
+            cls._refresh_batch(player_ids[start:start + cls.BATCH_SIZE])
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recalculates every player's career stats, returns the number of rows written.
+        """
+        player_ids = list(Player.objects.order_by('id').values_list('id', flat=True))
+        cls.refresh(player_ids)
+        return len(player_ids)
+
+    @classmethod
+    def _refresh_batch(cls, player_ids):
+        totals = {
+            row['player_id']: row
+            for row in Result.objects.filter(player_id__in=player_ids)
+            .values('player_id')
+            .annotate(played=Count('id'), won=Count('id', filter=Q(result=9)), points=Sum(POINTS_EXPRESSION))
+            .order_by()
+        }
+
+        # count other players in each published ladder the player joined to get possible matches
+        memberships = list(
+            League.objects.filter(player_id__in=player_ids, ladder__season__is_draft=False)
+            .values_list('player_id', 'ladder_id')
+        )
+        ladder_sizes = dict(
+            League.objects.filter(ladder_id__in={ladder_id for _, ladder_id in memberships})
+            .values('ladder_id')
+            .annotate(players=Count('id'))
+            .order_by()
+            .values_list('ladder_id', 'players')
+        )
+        possible = {}
+        for player_id, ladder_id in memberships:
+            possible[player_id] = possible.get(player_id, 0) + ladder_sizes[ladder_id] - 1
+
+        rows = []
+        for player_id in player_ids:
+            row = totals.get(player_id, {'played': 0, 'won': 0, 'points': 0})
+            possible_matches = possible.get(player_id, 0)
+            rows.append(cls(
+                player_id=player_id,
+                played=row['played'],
+                won=row['won'],
+                points=row['points'] or 0,
+                possible_matches=possible_matches,
+                completion=row['played'] / possible_matches * 100.00 if possible_matches else 0,
+            ))
+
+        # updated and inserted apart rather than upserted, MySQL cannot name the conflicting column
+        existing = set(cls.objects.filter(player_id__in=player_ids).values_list('player_id', flat=True))
+        cls.objects.bulk_update([row for row in rows if row.player_id in existing],
+                                ['played', 'won', 'points', 'possible_matches', 'completion'])
+        # a row written meanwhile by another request holds the same totals
+        cls.objects.bulk_create([row for row in rows if row.player_id not in existing], ignore_conflicts=True)
+
+
+class DataVersion(models.Model):
+    """
+    Version counter for a season or ladder, bumped by every write that changes what its pages show.
+    Cached renders are keyed by it, so a bump invalidates them everywhere without touching the cache.
+    """
+    SEASON = 'season'
+    LADDER = 'ladder'
+    PLAYER = 'player'
+    SITE = 'site'
+    PLAYERS = 'players'
+    SEASONS = 'seasons'
+    SCOPE_CHOICES = (
+        (SEASON, 'Season'),
+        (LADDER, 'Ladder'),
+        (PLAYER, 'Player'),
+        (SITE, 'Whole site'),
+        (PLAYERS, 'Player list'),
+        (SEASONS, 'Season list'),
+    )
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    version = models.PositiveIntegerField(default=1)
+    updated = models.DateTimeField(default=now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'object_id'], name='data_version_unique_object'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope} {self.object_id} v{self.version}'
+
+    def cache_key(self, user):
+        """
+        Key for renders of this object; surnames are masked for anonymous users so they get their own copy
+        """
+        return f'{self.scope}:{self.object_id}:{self.version}:{int(user.is_authenticated)}'
+
+    @classmethod
+    def current(cls, scope, object_id):
+        """
+        Current version of an object, version 0 if it has never been written since versions were introduced.
+        """
+        return (cls.objects.filter(scope=scope, object_id=object_id).first()
+                or cls(scope=scope, object_id=object_id, version=0))
+
+    @classmethod
+    def summary(cls, q=Q()):
+        """
+        Combined (token, last modified) of every version matching q, for pages that show several objects.
+        The token changes whenever any of them is bumped or the set of rows changes.
+        """
+        totals = cls.objects.filter(q).aggregate(rows=Count('id'), total=Sum('version'), updated=Max('updated'))
+        return f"{totals['rows']}.{totals['total'] or 0}", totals['updated']
+
+    @classmethod
+    def bump(cls, season_ids=(), ladder_ids=(), player_ids=(), season_list=False):
+        """
+        Moves the given seasons, ladders and players, and the seasons those ladders belong to, to a new version.
+        The single site row (object 0) moves with every bump, the player list row (object 0) with any player and
+        the season list row (object 0) with season_list, for writes to the seasons themselves.
+        """
+        ladder_ids = set(ladder_ids) - {None}
+        season_ids = (set(season_ids) - {None}) | set(
+            Ladder.objects.filter(id__in=ladder_ids).values_list('season_id', flat=True)
+        )
+        player_ids = set(player_ids) - {None}
+        stamp = now()
+        for scope, object_ids in ((cls.SEASON, season_ids), (cls.LADDER, ladder_ids), (cls.PLAYER, player_ids),
+                                  (cls.PLAYERS, {0} if player_ids else ()), (cls.SEASONS, {0} if season_list else ()),
+                                  (cls.SITE, {0})):
+            if not object_ids:
+                continue
+            cls.objects.filter(scope=scope, object_id__in=object_ids).update(version=F('version') + 1, updated=stamp)
+            cls.objects.bulk_create(
+                [cls(scope=scope, object_id=object_id, updated=stamp) for object_id in object_ids],
+                ignore_conflicts=True,
+            )
+
+
+@receiver(pre_save, sender=Result)
+def remember_previous_result(sender, instance: Result, update_fields=None, **kwargs):
+    # an edit can move a result to another ladder or pairing, where it was is refreshed as well as where it is
+    instance._previous_ladder_id = instance._previous_player_id = instance._previous_opponent_id = None
+    if instance.pk and (update_fields is None or {'ladder', 'player', 'opponent'} & set(update_fields)):
+        previous = Result.objects.filter(pk=instance.pk).values_list('ladder_id', 'player_id', 'opponent_id').first()
+        if previous is not None:
+            instance._previous_ladder_id, instance._previous_player_id, instance._previous_opponent_id = previous
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def update_standings_on_result_change(sender, instance: Result, **kwargs):
+    LadderStanding.refresh(instance.ladder_id, [instance.player_id])
+    previous = (getattr(instance, '_previous_ladder_id', None), getattr(instance, '_previous_player_id', None))
+    if previous[0] is not None and previous != (instance.ladder_id, instance.player_id):
+        LadderStanding.refresh(previous[0], [previous[1]])
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def sync_match_on_result_change(sender, instance: Result, **kwargs):
+    Match.sync_pair(instance.ladder_id, instance.player_id, instance.opponent_id)
+    previous = (getattr(instance, '_previous_ladder_id', None), getattr(instance, '_previous_player_id', None),
+                getattr(instance, '_previous_opponent_id', None))
+    if previous[0] is not None and previous != (instance.ladder_id, instance.player_id, instance.opponent_id):
+        Match.sync_pair(*previous)
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def update_pair_stats_on_result_change(sender, instance: Result, signal, **kwargs):
+    # runs after sync_match_on_result_change, it counts the pair's matches
+    PairStats.refresh(instance.player_id, instance.opponent_id, create=signal is post_save)
+    previous = {getattr(instance, '_previous_player_id', None), getattr(instance, '_previous_opponent_id', None)}
+    if None not in previous and previous != {instance.player_id, instance.opponent_id}:
+        # the pair the result was moved from has a row already, it is updated or removed
+        PairStats.refresh(*previous, create=False)
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+def discard_snapshot_on_change(sender, instance, **kwargs):
+    # a closed season being corrected is reopened, close it again to take a new snapshot
+    ladder_ids = {instance.ladder_id, getattr(instance, '_previous_ladder_id', None)} - {None}
+    SeasonSnapshot.objects.filter(season__ladder__in=ladder_ids).delete()
+
+
+@receiver(pre_save, sender=Ladder)
+def remember_previous_season(sender, instance: Ladder, update_fields=None, **kwargs):
+    instance._previous_season_id = None
+    if instance.pk and (update_fields is None or 'season' in update_fields):
+        instance._previous_season_id = Ladder.objects.filter(pk=instance.pk).values_list('season_id', flat=True).first()
+
+
+@receiver(post_save, sender=Ladder)
+@receiver(post_delete, sender=Ladder)
+def discard_snapshot_on_ladder_change(sender, instance: Ladder, **kwargs):
+    # an added, moved or renumbered division is not in the snapshot
+    season_ids = {instance.season_id, getattr(instance, '_previous_season_id', None)} - {None}
+    SeasonSnapshot.objects.filter(season__in=season_ids).delete()
+
+
+@receiver(post_save, sender=Season)
+def discard_snapshot_on_season_change(sender, instance: Season, **kwargs):
+    # the name, round and dates are shown on the frozen pages and shape the progress
+    SeasonSnapshot.objects.filter(season=instance).delete()
+
+
+@receiver(pre_save, sender=Match)
+def remember_previous_match_date(sender, instance: Match, **kwargs):
+    instance._previous_date = None
+    if instance.pk:
+        instance._previous_date = Match.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Match)
+def update_daily_progress_on_match_save(sender, instance: Match, created, **kwargs):
+    previous = getattr(instance, '_previous_date', None)
+    if created or previous is None:
+        SeasonDailyProgress.add(instance.ladder_id, instance.date)
+    elif previous != instance.date:
+        SeasonDailyProgress.remove(instance.ladder_id, previous)
+        SeasonDailyProgress.add(instance.ladder_id, instance.date)
+
+
+@receiver(post_delete, sender=Match)
+def update_daily_progress_on_match_delete(sender, instance: Match, **kwargs):
+    SeasonDailyProgress.remove(instance.ladder_id, instance.date)
+
+
+@receiver(post_save, sender=Match)
+def rate_match_on_save(sender, instance: Match, created, **kwargs):
+    from ladder import ratings
+    ratings.match_saved(instance, created)
+
+
+@receiver(pre_delete, sender=Match)
+def unrate_match_on_delete(sender, instance: Match, **kwargs):
+    from ladder import ratings
+    ratings.match_deleted(instance)
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def update_career_stats_on_result_change(sender, instance: Result, signal, **kwargs):
+    player_ids = {instance.player_id, getattr(instance, '_previous_player_id', None)} - {None}
+    PlayerCareerStats.refresh(player_ids, create=signal is post_save)
+
+
+@receiver(pre_save, sender=League)
+def remember_previous_ladder(sender, instance: League, update_fields=None, **kwargs):
+    instance._previous_ladder_id = None
+    if instance.pk and (update_fields is None or 'ladder' in update_fields):
+        instance._previous_ladder_id = League.objects.filter(pk=instance.pk).values_list('ladder_id', flat=True).first()
+
+
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+def update_career_stats_on_league_change(sender, instance: League, signal, update_fields=None, **kwargs):
+    # re-ordering within a ladder does not change anyone's possible matches
+    if update_fields is not None and 'ladder' not in update_fields:
+        return
+    ladder_ids = {instance.ladder_id, getattr(instance, '_previous_ladder_id', None)} - {None}
+    player_ids = set(League.objects.filter(ladder_id__in=ladder_ids).values_list('player_id', flat=True))
+    PlayerCareerStats.refresh(player_ids | {instance.player_id}, create=signal is post_save)
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def bump_version_on_result_change(sender, instance: Result, **kwargs):
+    DataVersion.bump(ladder_ids=[instance.ladder_id, getattr(instance, '_previous_ladder_id', None)])
+
+
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+def bump_version_on_league_change(sender, instance: League, **kwargs):
+    # sort order changes count too, they move rows in the grid
+    DataVersion.bump(ladder_ids=[instance.ladder_id, getattr(instance, '_previous_ladder_id', None)])
+
+
+@receiver(post_save, sender=Ladder)
+@receiver(post_delete, sender=Ladder)
+def bump_version_on_ladder_change(sender, instance: Ladder, **kwargs):
+    DataVersion.bump(season_ids=[instance.season_id], ladder_ids=[instance.id])
+
+
+@receiver(post_save, sender=Season)
+@receiver(post_delete, sender=Season)
+def bump_version_on_season_change(sender, instance: Season, **kwargs):
+    DataVersion.bump(season_ids=[instance.id], ladder_ids=instance.ladder_set.values_list('id', flat=True),
+                     season_list=True)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def bump_version_on_player_change(sender, instance: Player, signal, **kwargs):
+    # names are shown on every grid the player is in
+    ladder_ids = instance.league_set.values_list('ladder_id', flat=True) if signal is post_save else ()
+    DataVersion.bump(ladder_ids=ladder_ids, player_ids=[instance.id])
+
+
+@receiver(post_save, sender=Season)
+def update_career_stats_on_season_change(sender, instance: Season, **kwargs):
+    # publishing or un-publishing a season changes which leagues count towards possible matches
+    PlayerCareerStats.refresh(
+        set(League.objects.filter(ladder__season=instance).values_list('player_id', flat=True))
+    )
+
+
 @receiver(post_save, sender=League)
 def auto_subscribe_on_league_create(sender, instance: League, created, **kwargs):
     if not created:
@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.db.models import F
+
+from ladder.models import Ladder, Match, MatchRating, PlayerRating, Season, SeasonRating
+
+"""
+Elo ratings over the match history.
+New matches move the two players' ratings as they are entered, each change is logged in MatchRating so an
+edited or removed match can be taken back. Taking a change back is exact for the latest match only, replay()
+walks the whole history in date order and is the reference the incremental updates approximate.
+"""
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32
+BATCH_SIZE = 500
+
+
+def expected(rating, opponent_rating):
+    """
+    Chance of rating beating opponent_rating
+    """
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def rating_change(winner_rating, loser_rating):
+    """
+    Points the winner takes from the loser
+    """
+    return K_FACTOR * (1 - expected(winner_rating, loser_rating))
+
+
+def apply_match(match):
+    season_id = Ladder.objects.values_list('season_id', flat=True).get(pk=match.ladder_id)
+    player_ids = [match.winner_id, match.loser_id]
+    with transaction.atomic():
+        PlayerRating.objects.bulk_create(
+            [PlayerRating(player_id=player_id, rating=INITIAL_RATING) for player_id in player_ids],
+            ignore_conflicts=True,
+        )
+        ratings = {r.player_id: r for r in PlayerRating.objects.select_for_update().filter(player_id__in=player_ids)}
+        winner, loser = ratings[match.winner_id], ratings[match.loser_id]
+        change = rating_change(winner.rating, loser.rating)
+        MatchRating.objects.create(match=match, season_id=season_id, winner_id=winner.player_id,
+                                   loser_id=loser.player_id, change=change)
+
+        winner.rating += change
+        loser.rating -= change
+        for rating in (winner, loser):
+            rating.matches += 1
+            rating.save(update_fields=['rating', 'matches'])
+            SeasonRating.objects.update_or_create(season_id=season_id, player_id=rating.player_id,
+                                                  defaults={'rating': rating.rating})
+
+
+def reverse_match(event):
+    """
+    Takes a logged change back off both players, only updating rows so it is safe inside cascading deletes
+    """
+    for player_id, change in ((event.winner_id, -event.change), (event.loser_id, event.change)):
+        PlayerRating.objects.filter(player_id=player_id, matches__gt=0).update(
+            rating=F('rating') + change, matches=F('matches') - 1)
+        SeasonRating.objects.filter(season_id=event.season_id, player_id=player_id).update(
+            rating=F('rating') + change)
+
+
+def match_saved(match, created):
+    event = None if created else MatchRating.objects.filter(match=match).first()
+    if event is not None:
+        if (event.winner_id, event.loser_id) == (match.winner_id, match.loser_id):
+            return  # the score or date changed, the outcome did not
+        reverse_match(event)
+        event.delete()
+    apply_match(match)
+
+
+def match_deleted(match):
+    event = MatchRating.objects.filter(match=match).first()
+    if event is not None:
+        reverse_match(event)
+
+
+def replay(chunk_size=2000, progress=None):
+    """
+    Recomputes every rating from scratch, a season at a time in start date order with each season's matches
+    streamed in date order. Returns the number of matches rated, progress(season, matches) is called after
+    each season.
+    """
+    MatchRating.objects.all().delete()
+    SeasonRating.objects.all().delete()
+    PlayerRating.objects.all().delete()
+
+    ratings, played = {}, {}
+    total = 0
+    for season in Season.objects.order_by('start_date', 'id').iterator():
+        events, snapshot = [], {}
+        matches = (
+            Match.objects.filter(ladder__season=season)
+            .order_by('date', 'id')
+            .values_list('id', 'winner_id', 'loser_id')
+        )
+        for match_id, winner_id, loser_id in matches.iterator(chunk_size=chunk_size):
+            winner = ratings.get(winner_id, INITIAL_RATING)
+            loser = ratings.get(loser_id, INITIAL_RATING)
+            change = rating_change(winner, loser)
+            ratings[winner_id] = snapshot[winner_id] = winner + change
+            ratings[loser_id] = snapshot[loser_id] = loser - change
+            played[winner_id] = played.get(winner_id, 0) + 1
+            played[loser_id] = played.get(loser_id, 0) + 1
+            events.append(MatchRating(match_id=match_id, season_id=season.id, winner_id=winner_id,
+                                      loser_id=loser_id, change=change))
+            if len(events) >= chunk_size:
+                MatchRating.objects.bulk_create(events, batch_size=BATCH_SIZE)
+                total += len(events)
+                events = []
+
+        MatchRating.objects.bulk_create(events, batch_size=BATCH_SIZE)
+        total += len(events)
+        SeasonRating.objects.bulk_create(
+            [SeasonRating(season_id=season.id, player_id=player_id, rating=rating)
+             for player_id, rating in snapshot.items()],
+            batch_size=BATCH_SIZE,
+        )
+        if progress is not None:
+            progress(season, total)
+
+    PlayerRating.objects.bulk_create(
+        [PlayerRating(player_id=player_id, rating=rating, matches=played[player_id])
+         for player_id, rating in ratings.items()],
+        batch_size=BATCH_SIZE,
+    )
+    return total
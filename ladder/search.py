@@ -0,0 +1,74 @@
+import bisect
+import threading
+
+from ladder.models import DataVersion, Player, normalize_name
+
+"""
+Player name search for the autocompletes and the results page.
+Names are matched by token prefix against sorted arrays held in process, rebuilt when the player list version moves.
+"""
+
+_index = None
+_lock = threading.Lock()
+
+
+class PlayerNameIndex(object):
+    def __init__(self, version, rows):
+        """
+        rows are (id, search_first, search_last) with the names already normalized
+        """
+        self.version = version
+        self.names = {}
+        first_tokens, last_tokens = [], []
+        for player_id, search_first, search_last in rows:
+            self.names[player_id] = (search_first, search_last)
+            first_tokens.extend((token, player_id) for token in search_first.split())
+            last_tokens.extend((token, player_id) for token in search_last.split())
+        first_tokens.sort()
+        last_tokens.sort()
+        self.first_tokens = first_tokens
+        self.last_tokens = last_tokens
+
+    @staticmethod
+    def _prefixed(tokens, prefix):
+        start = bisect.bisect_left(tokens, (prefix,))
+        end = bisect.bisect_left(tokens, (prefix + '\uffff',), start)
+        return {player_id for _, player_id in tokens[start:end]}
+
+    def search(self, query, authenticated, limit=None):
+        """
+        Ids of players matching every term of the query, ordered by name.
+        Anonymous users may only search first names, narrowed by a surname initial ("First L.").
+        """
+        terms = normalize_name(query).split()
+        if not terms:
+            return []
+
+        if authenticated:
+            ids = None
+            for term in terms:
+                matched = self._prefixed(self.first_tokens, term) | self._prefixed(self.last_tokens, term)
+                ids = matched if ids is None else ids & matched
+        else:
+            ids = self._prefixed(self.first_tokens, terms[0])
+            initial = terms[-1].rstrip('.')
+            if len(terms) > 1 and len(initial) == 1:
+                ids = {player_id for player_id in ids if self.names[player_id][1].startswith(initial)}
+            # a full surname is ignored and the search falls back to the first name only
+
+        return sorted(ids, key=lambda player_id: (self.names[player_id], player_id))[:limit]
+
+
+def player_index():
+    """
+    The process's name index, rebuilt from the normalized name columns when any player has changed
+    """
+    global _index
+    version = DataVersion.current(DataVersion.PLAYERS, 0).version
+    index = _index
+    if index is None or index.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                _index = PlayerNameIndex(version, Player.objects.values_list('id', 'search_first', 'search_last'))
+            index = _index
+    return index
@@ -0,0 +1,167 @@
+import datetime
+
+from django.db.models import prefetch_related_objects
+
+from ladder.grid import LadderGrid
+from ladder.models import Ladder, LadderStanding, Player, Result, SeasonSnapshot
+
+"""
+Frozen copies of closed seasons.
+Closing a season stores its grids, leaders, stats and progress in one SeasonSnapshot row, and the season's pages
+and endpoints are then rendered from that row without reading results. Players are stored by id so names are
+still read live.
+"""
+
+
+def build(season):
+    """
+    Snapshot data for a season, as stored in SeasonSnapshot.data
+    """
+    ladders = list(Ladder.objects.filter(season=season))
+    prefetch_related_objects(ladders, 'league_set')
+    results = {}
+    for ladder_id, *row in Result.objects.filter(ladder__season=season).values_list(
+            'ladder_id', 'player_id', 'opponent_id', 'result', 'inaccurate_flag'):
+        results.setdefault(ladder_id, []).append(row)
+    leaders = {
+        standing.ladder_id: [standing.player_id, standing.points]
+        for standing in LadderStanding.objects.filter(ladder__season=season, position=1)
+    }
+
+    frozen = []
+    for ladder in ladders:
+        player_ids = [league.player_id for league in ladder.league_set.all()]
+        matches_played = ladder.matches.count()
+        size = len(player_ids)
+        total_matches = size * (size - 1) // 2
+        frozen.append({
+            'id': ladder.id,
+            'division': ladder.division,
+            'ladder_type': ladder.ladder_type,
+            'players': player_ids,
+            'results': results.get(ladder.id, []),
+            'leader': leaders.get(ladder.id),
+            'matches_played': matches_played,
+            'stats': {
+                'total_matches_played': matches_played,
+                'total_matches': total_matches,
+                'perc_matches_played': matches_played / total_matches * 100 if total_matches else 0,
+            },
+            'latest': [
+                [item['player'].id, item['opponent'].id, item['opponent_result'], item['date_added'].isoformat()]
+                for item in ladder.latest_matches(limit=5)
+            ],
+        })
+
+    return {
+        'stats': season.get_stats(),
+        'progress': season.get_progress(),
+        'ladders': frozen,
+    }
+
+
+def close_season(season):
+    """
+    Stores the snapshot of a closed season, replacing any earlier one. Raises ValueError for a season that is
+    still running or a draft.
+    """
+    if not season.is_closed:
+        raise ValueError(f'{season} is not finished')
+    snapshot, _ = SeasonSnapshot.objects.update_or_create(season=season, defaults={'data': build(season)})
+    return snapshot
+
+
+def frozen_values(seasons, key):
+    """
+    One part of the snapshot ('stats', 'progress') of each of the seasons that have one, keyed by season id.
+    Only that part is read from the database.
+    """
+    return dict(SeasonSnapshot.objects.filter(season__in=seasons).values_list('season_id', f'data__{key}'))
+
+
+class FrozenSeason(object):
+    """
+    Read side of a snapshot, giving the same shapes the live season pages use
+    """
+
+    def __init__(self, season, data):
+        self.season = season
+        self.data = data
+        self.stats = data['stats']
+        self.progress = data['progress']
+        self._players = None
+        self._ladders = {
+            row['division']: (Ladder(id=row['id'], season=season, division=row['division'],
+                                     ladder_type=row['ladder_type']), row)
+            for row in data['ladders']
+        }
+
+    @classmethod
+    def of(cls, season):
+        """
+        The season's snapshot, None while it has not been closed. Select the season with its snapshot to save
+        a query.
+        """
+        try:
+            snapshot = season.snapshot
+        except SeasonSnapshot.DoesNotExist:
+            return None
+        return cls(season, snapshot.data)
+
+    @property
+    def players(self):
+        # one query for every player named in the season
+        if self._players is None:
+            player_ids = set()
+            for row in self.data['ladders']:
+                player_ids.update(row['players'])
+                player_ids.update(player_id for item in row['latest'] for player_id in item[:2])
+            self._players = Player.objects.in_bulk(player_ids)
+        return self._players
+
+    def _player(self, player_id):
+        # a player deleted since the season closed is shown as a placeholder
+        return self.players.get(player_id) or Player(id=player_id, first_name='Unknown', last_name='')
+
+    def _grid(self, ladder, row):
+        return LadderGrid(ladder, [self._player(player_id) for player_id in row['players']], row['results'])
+
+    def covers(self, ladder):
+        """
+        Is the ladder in the snapshot under its current division. A ladder added or renumbered without its
+        signals (a bulk write) is not, and has to be read live.
+        """
+        frozen = self._ladders.get(ladder.division)
+        return frozen is not None and frozen[0].id == ladder.id
+
+    def grids(self):
+        return [self._grid(ladder, row) for ladder, row in self._ladders.values()]
+
+    def grid(self, division):
+        return self._grid(*self._ladders[division])
+
+    def ladder_stats(self, division):
+        return self._ladders[division][1]['stats']
+
+    def latest_results(self, division):
+        """
+        Ladder.get_latest_results() as it stood when the season closed
+        """
+        return list(enumerate(
+            {'player': self._player(winner_id), 'player_result': 9, 'opponent_result': losing_score,
+             'opponent': self._player(loser_id), 'date_added': datetime.date.fromisoformat(added)}
+            for winner_id, loser_id, losing_score, added in self._ladders[division][1]['latest']
+        ))
+
+    def leader_stats(self, user):
+        """
+        Season.get_leader_stats() as it stood when the season closed
+        """
+        current_leaders = {}
+        for ladder, row in self._ladders.values():
+            leader = None
+            if row['leader'] is not None:
+                player_id, points = row['leader']
+                leader = LadderStanding(player=self._player(player_id), points=points)
+            current_leaders[ladder.id] = ladder.leader_stats(leader, len(row['players']), row['matches_played'], user)
+        return {'current_leaders': current_leaders}
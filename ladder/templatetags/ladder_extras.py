@@ -12,6 +12,10 @@ def getkey(value, arg):
 
 @register.filter(name='gettotal')
 def gettotal(value, arg):
+    """
+    Total points for a player scanned from a {player_id: [Result]} dict, how grids totalled rows before
+    LadderStanding. Only the benchmark_grid baseline still renders with it.
+    """
     total = 0
     try:
         for result in value[arg]:
@@ -23,24 +27,6 @@ def gettotal(value, arg):
     except KeyError:
         return total
 
-@register.filter(name='getaverage')
-def getaverage(value, arg):
-    total = 0.0
-    count = 0.0
-    try:
-        for result in value[arg]:
-            if result.result == 9:
-                total = total + result.result + 3
-            else:
-                total = total + result.result + 1
-            count += 1
-        if count != 0:
-            return "%.2f" % (total / count)
-        return 0
-    except KeyError:
-        if count != 0:
-            return "%.2f" % (total / count)
-        return 0
 @register.filter(name='unplayed')
 def unplayed(value, arg):
     not_played = []
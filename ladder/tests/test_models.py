@@ -1,6 +1,30 @@
+import datetime
+import io
+import itertools
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test import TestCase
-from ladder.models import Player, Result, League, Season
-from django.db.models import Avg
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import Workbook, load_workbook
+from ladder import context_processors
+from ladder.context_processors import navigation
+from ladder.counters import SiteCounters
+from ladder.grid import LadderGrid
+from ladder.management.commands.excel_export import Export, Formula
+from ladder.search import player_index
+from ladder.models import Player, Result, League, Season, Ladder, LadderStanding, Match, PlayerCareerStats, \
+    DataVersion, PairStats, PlayerRating, MatchRating, LadderSubscription, SeasonSnapshot
+from ladder import ratings
+from ladder.snapshot import close_season
+from django.db.models import Avg, Count, Q
 
 
 class PlayerModelTest(TestCase):
@@ -74,4 +98,783 @@ class SeasonModelTest(TestCase):
         self.assertEqual(stats['results_count'], results_count)
 
         # player count assertion
-        self.assertEqual(stats['player_count'], player_count)
\ No newline at end of file
+        self.assertEqual(stats['player_count'], player_count)
+
+    def test_season_leader_stats(self):
+        """
+        Tests the season wide leader stats agree with each ladder's own leader, in two queries.
+        """
+        season = Season.objects.first()
+        user = AnonymousUser()
+        expected = {ladder.id: ladder.get_leader(user) for ladder in season.ladder_set.all()}
+
+        with self.assertNumQueries(2):
+            leaders = season.get_leader_stats(user)
+
+        self.assertEqual(leaders['current_leaders'], expected)
+
+    def test_batch_season_stats(self):
+        """
+        Tests the batch stats agree with each season's own stats and come from the cache once computed.
+        """
+        cache.clear()
+        seasons = Season.objects.all()
+        url = reverse('season_ajax_stats_batch') + '?ids=' + ','.join(str(season.id) for season in seasons)
+        data = self.client.get(url).json()['seasons']
+        self.assertEqual(data, {str(season.id): season.get_stats() for season in seasons})
+
+        self.client.get(reverse('list'))
+        with self.assertNumQueries(3):  # the season versions, the seasons and the navigation's version
+            self.client.get(reverse('list'))
+
+    def test_season_progress(self):
+        """
+        Tests the daily progress series agrees with the season's matches as results are moved and removed.
+        """
+        season = Match.objects.first().ladder.season
+
+        def assertProgressMatchesMatches():
+            daily = Match.objects.filter(ladder__season=season).values('date').annotate(n=Count('id')).order_by('date')
+            progress = season.get_progress()
+            self.assertEqual(progress['played_days'], [(row['date'] - season.start_date).days for row in daily])
+            self.assertEqual(progress['played'], [row['n'] for row in daily])
+            self.assertEqual(progress['played_cumulative'], list(itertools.accumulate(row['n'] for row in daily)))
+
+        assertProgressMatchesMatches()
+        winner_row = Result.objects.filter(ladder__season=season, result=9).first()
+        winner_row.date_added = season.start_date + datetime.timedelta(days=3)
+        winner_row.save()
+        assertProgressMatchesMatches()
+
+        winner_row.delete()
+        assertProgressMatchesMatches()
+
+        seasons = list(Season.objects.all())
+        with self.assertNumQueries(2):
+            Season.progress_for(seasons)
+
+
+class LadderStandingModelTest(TestCase):
+
+    def assertStandingMatchesResults(self, ladder, player):
+        results = Result.objects.filter(ladder=ladder, player=player)
+        points = sum(12 if r.result == 9 else r.result + 1 for r in results)
+        standing = LadderStanding.objects.get(ladder=ladder, player=player)
+        self.assertEqual(standing.played, results.count())
+        self.assertEqual(standing.won, results.filter(result=9).count())
+        self.assertEqual(standing.points, points)
+
+    def test_result_writes_update_standings(self):
+        """
+        Tests standings follow result saves and deletes, and positions stay ranked by points.
+        """
+        result = Result.objects.filter(result__lt=9).first()
+        ladder, player = result.ladder, result.player
+        self.assertStandingMatchesResults(ladder, player)
+
+        result.result = 8
+        result.save()
+        self.assertStandingMatchesResults(ladder, player)
+
+        result.delete()
+        self.assertStandingMatchesResults(ladder, player)
+
+        Result.objects.create(ladder=ladder, player=player, opponent=result.opponent, result=9,
+                              date_added=datetime.date.today(), inaccurate_flag=False)
+        self.assertStandingMatchesResults(ladder, player)
+
+        Result.objects.filter(ladder=ladder, player=player).delete()
+        self.assertFalse(LadderStanding.objects.filter(ladder=ladder, player=player).exists())
+
+        points = list(LadderStanding.objects.filter(ladder=ladder).values_list('points', flat=True))
+        positions = list(LadderStanding.objects.filter(ladder=ladder).values_list('position', flat=True))
+        self.assertEqual(points, sorted(points, reverse=True))
+        self.assertEqual(positions, list(range(1, len(positions) + 1)))
+
+    def test_moving_results_refreshes_both_ladders(self):
+        """
+        Tests a pair's results moved to another ladder leave the old ladder's standings as well as fill the new.
+        """
+        loser_row = Result.objects.filter(result__lt=9).first()
+        rows = [loser_row, Result.objects.get(ladder=loser_row.ladder, player=loser_row.opponent,
+                                              opponent=loser_row.player)]
+        old_ladder = loser_row.ladder
+        new_ladder = Ladder.objects.filter(season=old_ladder.season).exclude(pk=old_ladder.pk).first()
+        for row in rows:
+            row.ladder = new_ladder
+            row.save()
+
+        for row in rows:
+            self.assertStandingMatchesResults(new_ladder, row.player)
+            remaining = Result.objects.filter(ladder=old_ladder, player=row.player)
+            if remaining.exists():
+                self.assertStandingMatchesResults(old_ladder, row.player)
+            else:
+                self.assertFalse(LadderStanding.objects.filter(ladder=old_ladder, player=row.player).exists())
+
+    def test_rebuild(self):
+        """
+        Tests a rebuild reproduces the incrementally maintained standings.
+        """
+        ladder = Result.objects.first().ladder
+        before = list(LadderStanding.objects.filter(ladder=ladder).values_list('player', 'points', 'position'))
+        LadderStanding.rebuild([ladder])
+        after = list(LadderStanding.objects.filter(ladder=ladder).values_list('player', 'points', 'position'))
+        self.assertEqual(before, after)
+
+
+class MatchModelTest(TestCase):
+
+    def test_matches_follow_result_pairs(self):
+        """
+        Tests a match row exists for every complete pair and follows edits and deletes of either row.
+        """
+        self.assertEqual(Match.objects.count(), Result.objects.count() / 2)
+
+        loser_row = Result.objects.filter(result__lt=9).first()
+        match = Match.for_pair(loser_row.ladder_id, loser_row.player_id, loser_row.opponent_id).get()
+        self.assertEqual(match.loser_id, loser_row.player_id)
+        self.assertEqual(match.losing_score, loser_row.result)
+
+        loser_row.result = 7
+        loser_row.save()
+        match.refresh_from_db()
+        self.assertEqual(match.losing_score, 7)
+
+        loser_row.delete()
+        self.assertFalse(Match.for_pair(loser_row.ladder_id, loser_row.player_id, loser_row.opponent_id).exists())
+
+        # the remaining winner row alone is not a match until its mirror is entered again
+        Result.objects.create(ladder_id=loser_row.ladder_id, player_id=loser_row.player_id,
+                              opponent_id=loser_row.opponent_id, result=3,
+                              date_added=datetime.date.today(), inaccurate_flag=False)
+        match = Match.for_pair(loser_row.ladder_id, loser_row.player_id, loser_row.opponent_id).get()
+        self.assertEqual((match.winner_id, match.losing_score), (loser_row.opponent_id, 3))
+
+    def test_moved_results_move_their_match(self):
+        """
+        Tests a pair's results moved to another ladder take their match with them rather than leaving it behind.
+        """
+        loser_row = Result.objects.filter(result__lt=9).first()
+        old_ladder = loser_row.ladder
+        new_ladder = Ladder.objects.filter(season=old_ladder.season).exclude(pk=old_ladder.pk).first()
+        matches = Match.objects.count()
+        for row in Result.objects.filter(Q(player=loser_row.player, opponent=loser_row.opponent)
+                                         | Q(player=loser_row.opponent, opponent=loser_row.player), ladder=old_ladder):
+            row.ladder = new_ladder
+            row.save()
+
+        self.assertFalse(Match.for_pair(old_ladder.id, loser_row.player_id, loser_row.opponent_id).exists())
+        self.assertTrue(Match.for_pair(new_ladder.id, loser_row.player_id, loser_row.opponent_id).exists())
+        self.assertEqual(Match.objects.count(), matches)
+
+    def test_latest_matches(self):
+        """
+        Tests latest matches come newest first in one query and the since/before cursor splits them cleanly.
+        """
+        ladder = Match.objects.values('ladder').annotate(n=Count('id')).order_by('-n')[0]['ladder']
+        ladder = Ladder.objects.get(pk=ladder)
+        with self.assertNumQueries(1):
+            latest = ladder.latest_matches(limit=5)
+            names = [(str(item['player']), str(item['opponent'])) for item in latest]
+        self.assertEqual(len(names), min(5, ladder.matches.count()))
+        self.assertEqual([item['date_added'] for item in latest],
+                         sorted((item['date_added'] for item in latest), reverse=True))
+
+        since = latest[-1]['date_added']
+        newer = ladder.latest_matches(since=since)
+        older = ladder.latest_matches(before=since)
+        self.assertEqual(len(newer) + len(older), ladder.matches.count())
+        self.assertFalse({item['pair_key'] for item in newer} & {item['pair_key'] for item in older})
+
+
+class PlayerCareerStatsModelTest(TestCase):
+
+    def test_career_stats_follow_results_and_leagues(self):
+        """
+        Tests career stats follow result and league writes and match a full rebuild.
+        """
+        result = Result.objects.filter(result__lt=9).first()
+        player = result.player
+        played = player.career_stats.played
+
+        # moved to another player, the result stops counting for the one it came from
+        newcomer = Player.objects.create(first_name='New', last_name='Member')
+        result.player = newcomer
+        result.save()
+        player.refresh_from_db()
+        self.assertEqual(player.career_stats.played, played - 1)
+        self.assertEqual(newcomer.career_stats.played, 1)
+
+        result.player = player
+        result.save()
+        result.delete()
+        player.refresh_from_db()
+        self.assertEqual(player.career_stats.played, played - 1)
+
+        # a new member adds one possible match for everyone in the ladder
+        possible = player.career_stats.possible_matches
+        League.objects.create(ladder=result.ladder, player=newcomer)
+        player.career_stats.refresh_from_db()
+        self.assertEqual(player.career_stats.possible_matches, possible + 1)
+
+        before = list(PlayerCareerStats.objects.order_by('player').values_list())
+        PlayerCareerStats.rebuild()
+        self.assertEqual(before, list(PlayerCareerStats.objects.order_by('player').values_list()))
+
+    def test_refresh_updates_and_inserts_without_upsert(self):
+        """
+        Tests one refresh updates existing rows and inserts missing ones with MySQL's features, which has no
+        upsert naming a conflict column.
+        """
+        stale, missing = Result.objects.values_list('player_id', flat=True).distinct()[:2]
+        expected = list(PlayerCareerStats.objects.filter(player_id__in=[stale, missing]).order_by('player')
+                        .values_list())
+        PlayerCareerStats.objects.filter(player_id=stale).update(played=0, won=0, points=0)
+        PlayerCareerStats.objects.filter(player_id=missing).delete()
+
+        with mock.patch.multiple(connection.features, supports_update_conflicts=False,
+                                 supports_update_conflicts_with_target=False):
+            PlayerCareerStats.refresh([stale, missing])
+        self.assertEqual(expected, list(PlayerCareerStats.objects.filter(player_id__in=[stale, missing])
+                                        .order_by('player').values_list()))
+
+    def test_deleting_player_cascades(self):
+        """
+        Tests deleting a player with history removes all derived rows without re-creating them.
+        """
+        player_id = Result.objects.first().player_id
+        Player.objects.get(pk=player_id).delete()
+        self.assertFalse(PlayerCareerStats.objects.filter(player_id=player_id).exists())
+        self.assertFalse(LadderStanding.objects.filter(player_id=player_id).exists())
+        self.assertFalse(Match.objects.filter(Q(winner_id=player_id) | Q(loser_id=player_id)).exists())
+
+
+class DataVersionModelTest(TestCase):
+
+    def versions(self, ladder):
+        return (DataVersion.current(DataVersion.LADDER, ladder.id).version,
+                DataVersion.current(DataVersion.SEASON, ladder.season_id).version)
+
+    def test_writes_bump_versions(self):
+        """
+        Tests result, league and season writes move both the ladder and its season to a new version.
+        """
+        result = Result.objects.first()
+        ladder = result.ladder
+        for write in (result.save,
+                      lambda: ladder.league_set.first().save(update_fields=['sort_order']),
+                      ladder.season.save):
+            before = self.versions(ladder)
+            write()
+            self.assertEqual(self.versions(ladder), (before[0] + 1, before[1] + 1))
+
+    def test_season_page_is_served_from_cache(self):
+        """
+        Tests the season grid is not rebuilt until a result write bumps the version.
+        """
+        cache.clear()
+        season = Season.objects.filter(is_draft=False).first()
+        url = reverse('season', args=(season.start_date.year, season.season_round))
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(url)
+        self.assertFalse([q for q in queries if 'ladder_result' in q['sql']])
+
+        result = Result.objects.filter(ladder__season=season, result__lt=9).first()
+        result.result = 8 if result.result != 8 else 7
+        result.save()
+        fresh = self.client.get(url)
+        self.assertNotEqual(cached.content, fresh.content)
+
+    def test_unchanged_ladder_page_is_not_modified(self):
+        """
+        Tests the ladder page answers a matching ETag with 304 until a result write bumps the version.
+        """
+        ladder = Ladder.objects.filter(season__is_draft=False).first()
+        url = reverse('ladder', args=(ladder.season.start_date.year, ladder.season.season_round, ladder.division))
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ladder.result_set.first().save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Last-Modified', response)
+
+
+class LadderGridTest(TestCase):
+
+    def test_grid_matches_results_and_standings(self):
+        """
+        Tests every grid cell holds the row player's result against the column player and totals agree with standings.
+        """
+        ladder = Result.objects.first().ladder
+        with self.assertNumQueries(3):
+            grid = LadderGrid.for_ladder(ladder)
+
+        players = [league.player for league in ladder.league_set.all()]
+        self.assertEqual([row.player for row in grid.rows], players)
+        for row in grid.rows:
+            self.assertEqual([cell.opponent for cell in row.cells], players)
+            for cell in row.cells:
+                result = Result.objects.filter(ladder=ladder, player=row.player, opponent=cell.opponent).first()
+                self.assertEqual(cell.score, result.result if result else None)
+                self.assertEqual(cell.is_self, row.player == cell.opponent)
+
+            standing = LadderStanding.objects.filter(ladder=ladder, player=row.player).first()
+            self.assertEqual(row.points, standing.points if standing else 0)
+
+
+class SiteCountersTest(TestCase):
+
+    def test_counters_follow_writes(self):
+        """
+        Tests the homepage counters come from the cache until a write moves the site version on.
+        """
+        cache.clear()
+        counters = SiteCounters.current()
+        self.assertEqual(counters.matches, Match.objects.count())
+        self.assertEqual(counters.players, Player.objects.count())
+        with self.assertNumQueries(1):
+            self.assertEqual(SiteCounters.current(), counters)
+
+        Player.objects.create(first_name='New', last_name='Player')
+        self.assertEqual(SiteCounters.current().players, counters.players + 1)
+
+
+class NavigationContextTest(TestCase):
+
+    def test_navigation_is_lazy_and_follows_season_saves(self):
+        """
+        Tests the navigation costs no queries until used, is cached after, and a season save refreshes it while
+        other writes leave it be.
+        """
+        cache.clear()
+        with mock.patch.object(context_processors, '_local_navigation', (None, None)):
+            with self.assertNumQueries(0):
+                context = navigation(None)
+            with self.assertNumQueries(4):  # the season list version, then the navigation
+                season_count = context['season_count'] + context['season_count']
+            self.assertEqual(season_count, 2 * Season.objects.filter(is_draft=False).count())
+            with self.assertNumQueries(1):
+                self.assertEqual(navigation(None)['season_first'], context['season_first'])
+
+            Player.objects.create(first_name='New', last_name='Player')
+            with self.assertNumQueries(1):
+                self.assertEqual(navigation(None)['season_count'], context['season_count'])
+
+            season = Season.objects.filter(is_draft=False).latest('start_date')
+            season.is_draft = True
+            season.save()
+            self.assertNotEqual(navigation(None)['season_first'], season)
+
+
+class PlayerSearchTest(TestCase):
+
+    def test_prefix_search_and_anonymous_rule(self):
+        """
+        Tests names are matched by accent folded token prefix and anonymous users can't search surnames.
+        """
+        zoe = Player.objects.create(first_name='Zoë', last_name='Ångström')
+        zack = Player.objects.create(first_name='Zack', last_name='Anders')
+        index = player_index()
+
+        self.assertEqual(index.search('zo ang', authenticated=True), [zoe.id])
+        self.assertEqual(index.search('ZOE', authenticated=True), [zoe.id])
+        self.assertEqual(index.search('angstr', authenticated=True), [zoe.id])
+        self.assertEqual(index.search('angstr', authenticated=False), [])
+        self.assertEqual(index.search('z', authenticated=False), [zack.id, zoe.id])
+        self.assertEqual(index.search('z A.', authenticated=False), [zack.id, zoe.id])
+        self.assertEqual(index.search('z Anders', authenticated=False), [zack.id, zoe.id])
+
+        # renames are picked up by the next lookup
+        zack.last_name = 'Brown'
+        zack.save(update_fields=['last_name'])
+        self.assertEqual(player_index().search('z a.', authenticated=False), [zoe.id])
+
+    def test_single_match_redirects_to_the_player(self):
+        """
+        Tests a search finding one player is sent to the player's page, so a second match shows the list.
+        """
+        zoe = Player.objects.create(first_name='Zoë', last_name='Ångström')
+        url = reverse('player_result') + '?player_name=zoe'
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse('player_history', args=(zoe.id,)), fetch_redirect_response=False)
+
+        Player.objects.create(first_name='Zoe', last_name='Baker')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['players']), 2)
+
+
+class PairStatsModelTest(TestCase):
+
+    def test_pair_stats_follow_matches(self):
+        """
+        Tests pair stats agree with the pair's matches after writes, and a rebuild reproduces them.
+        """
+        match = Match.objects.first()
+        low, high = sorted((match.winner_id, match.loser_id))
+
+        def assertPairMatchesMatches():
+            matches = Match.objects.filter(Q(winner_id=low, loser_id=high) | Q(winner_id=high, loser_id=low))
+            pair = PairStats.for_pair(high, low)
+            self.assertEqual(pair.played, matches.count())
+            self.assertEqual(pair.low_wins, matches.filter(winner_id=low).count())
+            self.assertEqual(pair.for_player(low)['lost'], matches.filter(loser_id=low).count())
+            self.assertEqual(pair.low_points + pair.high_points,
+                             sum(12 + m.losing_score + 1 for m in matches))
+
+        assertPairMatchesMatches()
+        Result.objects.filter(ladder=match.ladder, player=match.loser, opponent=match.winner).update(result=2)
+        Result.objects.get(ladder=match.ladder, player=match.loser, opponent=match.winner).save()
+        assertPairMatchesMatches()
+
+        before = list(PairStats.objects.order_by('player_low', 'player_high').values())
+        PairStats.rebuild()
+        after = list(PairStats.objects.order_by('player_low', 'player_high').values())
+        self.assertEqual([dict(row, id=None) for row in before], [dict(row, id=None) for row in after])
+
+        # both rows moved to a new opponent leave the old pair with one match fewer
+        played = PairStats.for_pair(low, high).played
+        stranger = Player.objects.create(first_name='New', last_name='Opponent')
+        for row in Result.objects.filter(ladder=match.ladder, player__in=(low, high), opponent__in=(low, high)):
+            if row.player_id == low:
+                row.opponent = stranger
+            else:
+                row.player = stranger
+            row.save()
+        pair = PairStats.for_pair(low, high)
+        self.assertEqual(pair.played if pair else 0, played - 1)
+        self.assertEqual(PairStats.for_pair(low, stranger.id).played, 1)
+
+        Result.objects.filter(ladder=match.ladder, player__in=(low, high), opponent__in=(low, high)).delete()
+        if not Match.objects.filter(Q(winner_id=low, loser_id=high) | Q(winner_id=high, loser_id=low)).exists():
+            self.assertIsNone(PairStats.for_pair(low, high))
+
+
+class RatingsTest(TestCase):
+
+    def test_ratings_follow_matches(self):
+        """
+        Tests a replay rates every match, and removing and re-entering a match takes its change off and back on.
+        """
+        ratings.replay()
+        self.assertEqual(MatchRating.objects.count(), Match.objects.count())
+        self.assertAlmostEqual(sum(PlayerRating.objects.values_list('rating', flat=True)),
+                               ratings.INITIAL_RATING * PlayerRating.objects.count())
+
+        match = Match.objects.first()
+        event = match.rating
+        winner = PlayerRating.objects.get(player_id=match.winner_id)
+        loser_row = Result.objects.get(ladder=match.ladder, player=match.loser, opponent=match.winner)
+        loser_row.delete()
+        self.assertAlmostEqual(PlayerRating.objects.get(pk=winner.pk).rating, winner.rating - event.change)
+        self.assertEqual(PlayerRating.objects.get(pk=winner.pk).matches, winner.matches - 1)
+
+        loser_row.pk = None
+        loser_row.save()
+        match = Match.for_pair(match.ladder_id, match.winner_id, match.loser_id).get()
+        self.assertEqual(PlayerRating.objects.get(pk=winner.pk).matches, winner.matches)
+        self.assertAlmostEqual(PlayerRating.objects.get(pk=winner.pk).rating,
+                               winner.rating - event.change + match.rating.change)
+        self.assertAlmostEqual(sum(PlayerRating.objects.values_list('rating', flat=True)),
+                               ratings.INITIAL_RATING * PlayerRating.objects.count())
+
+
+class SeasonSnapshotTest(TestCase):
+
+    def test_closed_season_renders_from_snapshot(self):
+        """
+        Tests a closed season's pages are the same from its snapshot, read no results, and a result write reopens it.
+        """
+        ladder = Match.objects.first().ladder
+        season = ladder.season
+        urls = [reverse('season', args=(season.start_date.year, season.season_round)),
+                reverse('ladder', args=(season.start_date.year, season.season_round, ladder.division)),
+                reverse('season_ajax_stats') + '?id=%d&leader=1' % season.id,
+                reverse('season_ajax_progress') + '?id=%d' % season.id]
+
+        def render_all():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                pages = [self.client.get(url).content for url in urls]
+            return pages, [q['sql'] for q in queries if 'ladder_result' in q['sql']]
+
+        live, _ = render_all()
+        close_season(season)
+        frozen, result_queries = render_all()
+        self.assertEqual(frozen, live)
+        self.assertEqual(result_queries, [])
+
+        Result.objects.filter(ladder=ladder).first().save()
+        self.assertFalse(Season.objects.filter(pk=season.pk, snapshot__isnull=False).exists())
+
+    def test_ladder_and_season_changes_discard_snapshot(self):
+        """
+        Tests a new division or a season edit reopens a closed season, and a division missing from a snapshot
+        is read live rather than failing.
+        """
+        season = Match.objects.first().ladder.season
+        args = (season.start_date.year, season.season_round)
+
+        close_season(season)
+        Ladder.objects.create(season=season, division=99, ladder_type='First to 9')
+        self.assertFalse(Season.objects.filter(pk=season.pk, snapshot__isnull=False).exists())
+
+        close_season(season)
+        season.name = 'Renamed'
+        season.save()
+        self.assertFalse(Season.objects.filter(pk=season.pk, snapshot__isnull=False).exists())
+
+        # written without signals, as a bulk import does
+        close_season(season)
+        Ladder.objects.bulk_create([Ladder(season=season, division=98, ladder_type='First to 9')])
+        League.objects.bulk_create([League(ladder_id=Ladder.objects.get(season=season, division=98).id, player=player)
+                                    for player in Player.objects.all()[:2]])
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('ladder', args=args + (98,))).status_code, 200)
+
+
+
+class SubscriptionEmailTest(TestCase):
+
+    def test_one_message_per_subscriber_from_one_render_per_ladder(self):
+        """
+        Tests every subscriber of a ladder with new results gets their own message, and the results are only
+        queried once however many subscribe.
+        """
+        from ladder.management.commands.subscription_email import send_ladder_emails
+
+        season = Season.objects.filter(is_draft=False).latest('start_date')
+        ladder = season.ladder_set.first()
+        result = Result.objects.filter(ladder=ladder).first()
+        result.date_added = datetime.date.today()
+        result.save()
+        subscriptions = [
+            LadderSubscription.objects.create(
+                ladder=ladder, subscribed_at=datetime.date.today(),
+                user=User.objects.create(username=f'subscriber{n}', email=f'subscriber{n}@example.com'))
+            for n in range(3)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            sent, failed = send_ladder_emails(batch_size=2)
+        self.assertEqual((sent, failed), (3, 0))
+        # the new and recent results, read once
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('SELECT "ladder_match"')]), 2)
+
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         [subscription.user.email for subscription in subscriptions])
+        for message in mail.outbox:
+            subscription = next(s for s in subscriptions if s.user.email == message.to[0])
+            self.assertIn(str(subscription.unsubscribe_token), message.extra_headers['List-Unsubscribe'])
+            self.assertIn(str(subscription.unsubscribe_token), message.body)
+
+    def test_refused_address_is_skipped_and_dropped_connection_retried(self):
+        """
+        Tests a refused recipient only loses its own message, and a dropped connection is reopened without
+        sending anything twice.
+        """
+        import smtplib
+        from ladder.management.commands import subscription_email
+
+        delivered, events = [], iter(['ok', 'refused', 'disconnect', 'ok', 'ok'])
+
+        class FakeConnection(object):
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def send_messages(self, messages):
+                event = next(events)
+                if event == 'refused':
+                    raise smtplib.SMTPRecipientsRefused({messages[0].to[0]: (550, b'No such user')})
+                if event == 'disconnect':
+                    raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+                delivered.extend(messages)
+
+        messages = [mail.EmailMessage(to=[f'player{n}@example.com']) for n in range(4)]
+        with mock.patch.object(subscription_email, 'get_connection', FakeConnection):
+            sent, failed = subscription_email.send_batch(messages, backoff=0)
+        self.assertEqual((sent, failed), (delivered, 1))
+        self.assertEqual(delivered, [messages[0], messages[2], messages[3]])
+
+    def test_subscriptions_are_only_sent_new_matches(self):
+        """
+        Tests a first run only sends matches dated since yesterday, a run again sends nothing, and a match entered
+        afterwards is sent on its own whatever its date.
+        """
+        from ladder.management.commands.subscription_email import send_ladder_emails
+
+        season = Season.objects.filter(is_draft=False).latest('start_date')
+        ladder = season.ladder_set.first()
+        user = User.objects.create(username='subscriber', email='subscriber@example.com')
+        subscription = LadderSubscription.objects.create(ladder=ladder, user=user,
+                                                         subscribed_at=datetime.date(2000, 1, 1))
+        # an existing subscriber is not sent matches played before yesterday
+        Result.objects.filter(ladder=ladder).update(date_added=datetime.date(2000, 1, 1))
+        Match.objects.filter(ladder=ladder).update(date=datetime.date(2000, 1, 1))
+        self.assertEqual(send_ladder_emails(), (0, 0))
+
+        # the pair entered again today, under a lower id than older matches as recompute can leave them
+        match = ladder.matches.order_by('id').first()
+        players = [match.winner, match.loser]
+        Result.objects.filter(ladder=ladder, player__in=players, opponent__in=players).update(
+            date_added=datetime.date.today())
+        Match.objects.filter(pk=match.pk).update(date=datetime.date.today())
+        self.assertEqual(send_ladder_emails(), (1, 0))
+        self.assertEqual(send_ladder_emails(), (0, 0))
+
+        match = ladder.matches.order_by('-id').first()
+        players = [match.winner, match.loser]
+        Result.objects.filter(ladder=ladder, player__in=players, opponent__in=players).delete()
+        Result.objects.create(ladder=ladder, player=players[0], opponent=players[1], result=9,
+                              date_added=datetime.date(2000, 1, 1), inaccurate_flag=False)
+        Result.objects.create(ladder=ladder, player=players[1], opponent=players[0], result=4,
+                              date_added=datetime.date(2000, 1, 1), inaccurate_flag=False)
+        mail.outbox.clear()
+        self.assertEqual(send_ladder_emails(), (1, 0))
+        subscription.refresh_from_db()
+        self.assertEqual(subscription.last_notified_match_id, ladder.matches.order_by('-id').first().id)
+        new_section = mail.outbox[0].body.split('More recent results')[0]
+        self.assertEqual(new_section.count('NEW</span>'), 1)
+
+    def test_digest_merges_a_users_ladders(self):
+        """
+        Tests a digest sends one email per user with every ladder's section and unsubscribe link.
+        """
+        from ladder.management.commands.subscription_email import send_ladder_emails
+
+        season = Season.objects.filter(is_draft=False).latest('start_date')
+        ladders = list(season.ladder_set.order_by('division')[:2])
+        user = User.objects.create(username='digest', email='digest@example.com')
+        subscriptions = []
+        for ladder in ladders:
+            result = Result.objects.filter(ladder=ladder).first()
+            result.date_added = datetime.date.today()
+            result.save()
+            subscriptions.append(LadderSubscription.objects.create(ladder=ladder, user=user,
+                                                                   subscribed_at=datetime.date.today()))
+
+        self.assertEqual(send_ladder_emails(digest=True), (1, 0))
+        message, = mail.outbox
+        self.assertEqual(message.subject, f'{season} Result Update - Divisions: 1, 2')
+        for subscription in subscriptions:
+            self.assertIn(str(subscription.unsubscribe_token), message.extra_headers['List-Unsubscribe'])
+            self.assertIn(str(subscription.unsubscribe_token), message.body)
+
+
+class RecomputeAllTest(TestCase):
+
+    def test_data_fix_reaches_matches_standings_and_snapshots(self):
+        """
+        Tests a result fixed without signals is carried into its match, keeping the match id, and on into the
+        standings and the closed season's snapshot.
+        """
+        match = Match.objects.first()
+        season = match.ladder.season
+        close_season(season)
+        losing_score = (match.losing_score + 1) % 9
+        Result.objects.filter(ladder=match.ladder, player=match.loser, opponent=match.winner).update(
+            result=losing_score)
+
+        call_command('recompute_all', workers=1, stdout=io.StringIO())
+
+        self.assertEqual(Match.objects.get(pk=match.pk).losing_score, losing_score)
+        standing = LadderStanding.objects.get(ladder=match.ladder, player=match.loser)
+        self.assertEqual(standing.points, sum(12 if r.result == 9 else r.result + 1 for r in
+                                              Result.objects.filter(ladder=match.ladder, player=match.loser)))
+        frozen = next(row for row in SeasonSnapshot.objects.get(season=season).data['ladders']
+                      if row['id'] == match.ladder_id)
+        self.assertIn([match.loser_id, match.winner_id, losing_score, False], frozen['results'])
+
+
+class StaticArchiveTest(TestCase):
+
+    def test_season_list_is_only_archived_while_no_season_is_open(self):
+        """
+        Tests the live season list stays with django while a season is open and is archived once all are closed.
+        """
+        latest = Season.objects.filter(is_draft=False).latest('start_date')
+        latest.end_date = datetime.date.today() + datetime.timedelta(days=30)
+        latest.save()
+        with tempfile.TemporaryDirectory() as output:
+            call_command('render_static_archive', output=output, stdout=io.StringIO())
+            self.assertFalse(os.path.exists(os.path.join(output, 'list', 'index.html')))
+            closed = Season.objects.filter(is_draft=False).exclude(pk=latest.pk).latest('start_date')
+            self.assertTrue(os.path.exists(os.path.join(
+                output, str(closed.start_date.year), 'round', str(closed.season_round), 'index.html')))
+
+            latest.end_date = datetime.date.today() - datetime.timedelta(days=1)
+            latest.save()
+            call_command('render_static_archive', output=output, stdout=io.StringIO())
+            self.assertTrue(os.path.exists(os.path.join(output, 'list', 'index.html')))
+
+
+class ExcelImportTest(TestCase):
+
+    def test_players_are_matched_whatever_the_case(self):
+        """
+        Tests a sheet name differing from the player's only in case and accents joins the existing player.
+        """
+        season = Season.objects.create(name='Import', start_date=datetime.date(2030, 1, 1),
+                                       end_date=datetime.date(2030, 3, 1), season_round=1)
+        existing = Player.objects.create(first_name='john', last_name='smith')
+        book = Workbook()
+        sheet = book.active
+        sheet.append([None, None, None, None, None, 'DIVISION', None, None, 1])
+        sheet.append([1, 'John', 'Smith'])
+        sheet.append([2, 'Zoë', 'New'])
+        sheet.append([3, 'zoe', 'NEW'])
+        with tempfile.TemporaryDirectory() as directory:
+            book.save(os.path.join(directory, 'import.xlsx'))
+            call_command('excel_import', season=season.id, file=os.path.join(directory, 'import.xlsx'),
+                         stdout=io.StringIO())
+
+        self.assertEqual(Player.objects.filter(search_first='john', search_last='smith').count(), 1)
+        self.assertEqual(Player.objects.filter(search_first='zoe', search_last='new').count(), 1)
+        league = League.objects.filter(ladder__season=season)
+        self.assertEqual(league.count(), 2)
+        self.assertTrue(league.filter(player=existing).exists())
+
+
+class RefreshCacheTest(TestCase):
+
+    def test_in_process_warming_needs_a_shared_cache(self):
+        """
+        Tests pages are not rendered into a local memory cache that would go away with the command.
+        """
+        with self.assertRaisesMessage(CommandError, '--base-url'):
+            call_command('refresh_cache', stdout=io.StringIO())
+
+        with mock.patch('ladder.management.commands.refresh_cache.Command.fetch', return_value=200) as fetch:
+            call_command('refresh_cache', base_url='http://web:8000', anonymous_only=True, stdout=io.StringIO())
+        self.assertTrue(fetch.called)
+
+
+class ExcelExportTest(TestCase):
+
+    def test_sheet_is_produced_a_row_at_a_time(self):
+        """
+        Tests the sheet comes a row at a time in order and both formats write the same cells from it.
+        """
+        season = Ladder.objects.first().season
+        rows = Export(season).sheet()
+        self.assertEqual(next(rows)[0], 1)
+        numbers = [1] + [number for number, _, _ in rows]
+        self.assertEqual(numbers, sorted(set(numbers)))
+
+        with tempfile.TemporaryDirectory() as directory:
+            Export(season).save_xls(directory)
+            book = load_workbook(Export(season).save_xlsx(directory))
+        cells = {(cell.row - 1, cell.column - 1): cell.value
+                 for row in book.active.iter_rows() for cell in row if cell.value is not None}
+        expected = {(number, column): '=' + value.text if isinstance(value, Formula) else value
+                    for number, _, columns in Export(season).sheet() for column, (value, _) in columns.items()
+                    if value != ''}  # the grey self cells are blank
+        self.assertEqual(cells, expected)
@@ -23,6 +23,7 @@ urlpatterns = [
     re_path(r'^player/h2h/(?P<player_id>\d+)/$', views.h2h_search, name='h2h_search'),
     re_path(r'^player/results/$', views.player_result, name='player_result'),
     re_path(r'^season/ajax/stats/$', views.season_ajax_stats, name='season_ajax_stats'),
+    re_path(r'^season/ajax/stats/batch/$', views.season_ajax_stats_batch, name='season_ajax_stats_batch'),
     re_path(r'^season/ajax/progress/$', views.season_ajax_progress, name='season_ajax_progress'),
     path('result/entry/', views.result_entry, name='result_entry'),
     path('result/entry/add/', views.result_entry_add, name='result_entry_add'),
@@ -1,8 +1,11 @@
 import datetime
+import functools
 import json
 
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Count, Max
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
 from django.http import HttpResponseRedirect, Http404, HttpResponse, HttpResponseForbidden, JsonResponse, \
     HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404
@@ -12,15 +15,21 @@ from django.views.decorators.cache import never_cache
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
 
+from ladder.conditional import condition_on_version
+from ladder.counters import SiteCounters
 from ladder.forms import AddResultForm, AddEntryForm
-from ladder.models import Ladder, Player, Result, Season, League, LadderSubscription
+from ladder.grid import LadderGrid
+from ladder.models import Ladder, Player, Result, Season, League, LadderSubscription, Match, \
+    DataVersion, PairStats
+from ladder.search import player_index
+from ladder.snapshot import FrozenSeason, frozen_values
 
 def _unplayed_opponents_for(user_player, ladder):
     # players in this ladder, in ladder order
     league_players = [l.player for l in ladder.league_set.select_related('player').all()]
     # all pairings already played (either direction)
     played_pairs = set()
-    for r in Result.objects.filter(ladder=ladder).values_list('player_id', 'opponent_id'):
+    for r in Match.objects.filter(ladder=ladder).values_list('winner_id', 'loser_id'):
         played_pairs.add(tuple(sorted(r)))
     # opponents the user hasn't played yet, in league (sort_order) order
     unplayed = []
@@ -32,30 +41,101 @@ def _unplayed_opponents_for(user_player, ladder):
             unplayed.append(p)
     return unplayed
 
-def index(request):
-    current_season = Season.objects.filter(is_draft=False).latest('start_date')
-    os_year = Season.objects.order_by('start_date')[0].start_date.year
-    cs_year = current_season.start_date.year
 
-    at_ladders = Season.objects.count()
-    at_divisions = Ladder.objects.count()
-    at_results = int(Result.objects.count() / 2)
-    at_players = Player.objects.count()
+def _season_state(request, year, season_round):
+    season_object = Season.objects.filter(start_date__year=year, season_round=season_round).first()
+    if season_object is None or (season_object.is_draft and not request.user.is_superuser):
+        return None  # left to the view to 404 or redirect
+    return DataVersion.summary(Q(scope=DataVersion.SEASON, object_id=season_object.id))
+
+
+def _ladder_state(request, year, season_round, division_id):
+    ladder_object = Ladder.objects.filter(season__is_draft=False, division=division_id,
+                                          season__start_date__year=year, season__season_round=season_round).first()
+    if ladder_object is None:
+        return None
+    token, last_modified = DataVersion.summary(Q(scope=DataVersion.LADDER, object_id=ladder_object.id))
+    if request.user.is_authenticated:
+        # the subscribe link is part of the page
+        token += ':%d' % LadderSubscription.objects.filter(user=request.user, ladder=ladder_object).exists()
+    return token, last_modified
+
+
+def _players_state(request, player_id, opponent_id=None):
+    player_ids = [i for i in (player_id, opponent_id) if i is not None]
+    if not all(str(i).isdigit() for i in player_ids):
+        return None
+    return DataVersion.summary(
+        Q(scope=DataVersion.PLAYER, object_id__in=player_ids)
+        | Q(scope=DataVersion.LADDER,
+            object_id__in=League.objects.filter(player_id__in=player_ids).values('ladder_id'))
+    )
+
+
+def _ajax_season_state(request):
+    season_id = request.GET.get('id', '')
+    if not season_id.isdigit():
+        return None
+    return DataVersion.summary(Q(scope=DataVersion.SEASON, object_id=season_id))
+
+
+def _compare_ids(request):
+    # further seasons for the progress chart to overlay, as ?compare=3,2
+    return [int(season_id) for season_id in request.GET.get('compare', '').split(',') if season_id.isdigit()]
+
+
+def _ajax_progress_state(request):
+    season_id = request.GET.get('id', '')
+    if not season_id.isdigit():
+        return None
+    season_ids = [int(season_id)] + _compare_ids(request)
+    return DataVersion.summary(Q(scope=DataVersion.SEASON, object_id__in=season_ids))
+
+
+def index(request):
+    counters = SiteCounters.current()
 
     context = {
-        'current_season': current_season,
-        'at_years': (cs_year - os_year),
-        'at_years_str': ' (' + os_year.__str__() + ' -> ' + cs_year.__str__() + ')',
-        'at_divisions': at_divisions,
-        'at_ladders': at_ladders,
-        'at_results': at_results,
-        'at_players': at_players,
+        'current_season': counters.current_season,
+        'previous_season': counters.previous_season,
+        'at_years': (counters.current_year - counters.first_year),
+        'at_years_str': ' (' + str(counters.first_year) + ' -> ' + str(counters.current_year) + ')',
+        'at_divisions': counters.divisions,
+        'at_ladders': counters.seasons,
+        'at_results': counters.matches,
+        'at_players': counters.players,
     }
     return render(request, 'ladder/index.html', context)
 
 
+def _season_stats(seasons):
+    """
+    get_stats() of the given seasons keyed by id, each cached under its own season version so a result entered
+    in one season leaves the others' cached stats in place
+    """
+    seasons = list(seasons)
+    versions = dict(DataVersion.objects.filter(
+        scope=DataVersion.SEASON, object_id__in=[season.id for season in seasons]
+    ).values_list('object_id', 'version'))
+    keys = {'season_stats:%d:%d' % (season.id, versions.get(season.id, 0)): season for season in seasons}
+
+    stats = {keys[key].id: value for key, value in cache.get_many(keys).items()}
+    missing = [season for season in seasons if season.id not in stats]
+    if missing:
+        # closed seasons from their snapshots, the rest counted live
+        stats.update(frozen_values(missing, 'stats'))
+        stats.update(Season.stats_for([season for season in missing if season.id not in stats]))
+        for key, season in keys.items():
+            if season in missing:
+                cache.set(key, stats[season.id], season.cache_timeout())
+    return stats
+
+
 def list_rounds(request):
-    seasons = Season.objects.filter(is_draft=False).order_by('-start_date')
+    seasons = list(Season.objects.filter(is_draft=False).order_by('-start_date'))
+    stats = _season_stats(seasons)
+    for season in seasons:
+        season.stats = stats[season.id]
     context = {
         'seasons': seasons,
     }
@@ -70,8 +150,10 @@ def current_season_redirect(request):
     ))
 
 
+@condition_on_version(_season_state)
 def season(request, year, season_round):
-    season_object = get_object_or_404(Season, start_date__year=year, season_round=season_round)
+    season_object = get_object_or_404(Season.objects.select_related('snapshot'),
+                                      start_date__year=year, season_round=season_round)
 
     if season_object.is_draft and not request.user.is_superuser:
         prev = (Season.objects
@@ -82,33 +164,33 @@ def season(request, year, season_round):
             return HttpResponseRedirect(reverse('season', args=(prev.start_date.year, prev.season_round)))
         raise Http404  # no published season to show
 
-    # Optimize with prefetch_related to avoid N+1 queries
-    ladders = Ladder.objects.filter(season=season_object).prefetch_related(
-        'league_set__player__user'  # Prefetch leagues, players, and users
-    )
+    @functools.cache
+    def grids():
+        frozen = FrozenSeason.of(season_object)
+        if frozen is not None:
+            return frozen.grids()
 
-    # Get all results for this season with related data in one query
-    results = Result.objects.filter(
-        ladder__season=season_object
-    ).select_related(
-        'player', 'opponent', 'ladder'
-    )
+        # Optimize with prefetch_related to avoid N+1 queries
+        ladders = Ladder.objects.filter(season=season_object).select_related('season').prefetch_related(
+            'league_set__player__user'  # Prefetch leagues, players, and users
+        )
 
-    # Build results dictionary efficiently
-    results_dict = {}
-    for result in results:
-        results_dict.setdefault(result.player.id, []).append(result)
+        # one results query for every division's grid
+        return LadderGrid.for_ladders(ladders)
 
-    # No need to fetch league separately as it's prefetched
-    return render(
-        request, 'ladder/season/index.html',
-        dict(season=season_object, ladders=ladders, results_dict=results_dict)
-    )
+    # the template calls grids only when its cached fragment is missing, so the grid is read at most once and a
+    # fragment expiring mid request is still rendered in full
+    version = DataVersion.current(DataVersion.SEASON, season_object.id)
+    return render(request, 'ladder/season/index.html', dict(
+        season=season_object, cache_key=version.cache_key(request.user), cache_timeout=season_object.cache_timeout(),
+        grids=grids,
+    ))
 
 
+@condition_on_version(_ladder_state)
 def ladder(request, year, season_round, division_id):
     ladder_object = get_object_or_404(
-        Ladder.objects.filter(season__is_draft=False).prefetch_related('league_set__player__user'),
+        Ladder.objects.filter(season__is_draft=False).select_related('season__snapshot'),
         division=division_id,
         season__start_date__year=year,
         season__season_round=season_round
@@ -123,17 +205,27 @@ def ladder(request, year, season_round, division_id):
             ladder__season__season_round=season_round
         ).exists()  # Use exists() instead of count() > 0
 
-    # Optimize results query with select_related
-    results = Result.objects.filter(ladder=ladder_object).select_related(
-        'player', 'opponent'
-    )
-
-    results_dict = {}
-    for result in results:
-        results_dict.setdefault(result.player.id, []).append(result)
-
-    return render(request, 'ladder/ladder/index.html',
-                  {'ladder': ladder_object, 'results_dict': results_dict, 'subscribed': subscribed})
+    @functools.cache
+    def fragment():
+        frozen = FrozenSeason.of(ladder_object.season)
+        if frozen is not None and frozen.covers(ladder_object):
+            division = ladder_object.division
+            return {'grid': frozen.grid(division), 'ladder_stats': frozen.ladder_stats(division),
+                    'latest_results': frozen.latest_results(division)}
+
+        prefetch_related_objects([ladder_object], 'league_set__player__user')
+        return {'grid': LadderGrid.for_ladder(ladder_object), 'ladder_stats': ladder_object.get_stats(),
+                'latest_results': ladder_object.get_latest_results()}
+
+    # read lazily by the template, only when its cached fragment is missing (see season())
+    version = DataVersion.current(DataVersion.LADDER, ladder_object.id)
+    return render(request, 'ladder/ladder/index.html', {
+        'ladder': ladder_object, 'subscribed': subscribed, 'cache_key': version.cache_key(request.user),
+        'cache_timeout': ladder_object.season.cache_timeout(),
+        'grid': lambda: fragment()['grid'],
+        'ladder_stats': lambda: fragment()['ladder_stats'],
+        'latest_results': lambda: fragment()['latest_results'],
+    })
 
 @login_required
 @never_cache
@@ -206,51 +298,49 @@ def add(request, year, season_round, division_id):
         if form.is_valid():
             losing_result = form.save(commit=False)
 
-            # check for existing results, assume update if find a match aka delete
-            try:
-                existing_player_result = Result.objects.get(ladder=ladder_object, player=losing_result.player,
-                                                            opponent=losing_result.opponent)
-                existing_player_result.delete()
-                existing_opponent_result = Result.objects.get(ladder=ladder_object, player=losing_result.opponent,
-                                                              opponent=losing_result.player)
-                existing_opponent_result.delete()
-            except Result.DoesNotExist:
-                pass
-
-            # build the mirror result (aka winner) from losing form data
-            winning_result = Result(ladder=losing_result.ladder, player=losing_result.opponent,
-                                    opponent=losing_result.player, result=9, date_added=losing_result.date_added,
-                                    inaccurate_flag=losing_result.inaccurate_flag)
-            losing_result.save()
-            winning_result.save()
+            # results and standings are written together
+            with transaction.atomic():
+                # check for existing results, assume update if find a match aka delete
+                try:
+                    existing_player_result = Result.objects.get(ladder=ladder_object, player=losing_result.player,
+                                                                opponent=losing_result.opponent)
+                    existing_player_result.delete()
+                    existing_opponent_result = Result.objects.get(ladder=ladder_object, player=losing_result.opponent,
+                                                                  opponent=losing_result.player)
+                    existing_opponent_result.delete()
+                except Result.DoesNotExist:
+                    pass
+
+                # build the mirror result (aka winner) from losing form data
+                winning_result = Result(ladder=losing_result.ladder, player=losing_result.opponent,
+                                        opponent=losing_result.player, result=9, date_added=losing_result.date_added,
+                                        inaccurate_flag=losing_result.inaccurate_flag)
+                losing_result.save()
+                winning_result.save()
 
             return HttpResponseRedirect(reverse('add', args=(
                 ladder_object.season.start_date.year, ladder_object.season.season_round, ladder_object.division)))
     else:
         form = AddResultForm(ladder_object, instance=result)
 
-    # prepare the results for displaying
-    results = Result.objects.filter(ladder=ladder_object)
-    results_dict = {}
-    for result in results:
-        results_dict.setdefault(result.player.id, []).append(result)
-
     return render(request, 'ladder/ladder/add.html',
-                  {'ladder': ladder_object, 'results_dict': results_dict, 'form': form,
+                  {'ladder': ladder_object, 'grid': LadderGrid.for_ladder(ladder_object), 'form': form,
                    'next_ladder': next_ladder, 'previous_ladder': previous_ladder})
 
 
+@condition_on_version(_players_state)
 def player_history(request, player_id):
     get_object_or_404(Player, pk=player_id)
 
-    # Prefetch player results at the player level
-    player = Player.objects.prefetch_related('result_player').get(pk=player_id)
+    # Career stats and the rating are precomputed, join them in with the player
+    player = Player.objects.select_related('career_stats', 'rating').get(pk=player_id)
 
     # Get league_set with comprehensive prefetching
     league_set = player.league_set.select_related(
         'ladder__season'
     ).prefetch_related(
-        'ladder__league_set'  # For league counts
+        'ladder__league_set',  # For league counts
+        'player__standings',  # For per ladder totals
     ).order_by('-ladder__season__start_date')
 
     # Force evaluation of league_set to ensure prefetching works
@@ -259,13 +349,13 @@ def player_history(request, player_id):
     # Pre-calculate player stats
     player_stats = player.player_stats()
 
-    # Return top 10 played against
-    try:
-        head = Result.objects.values('opponent', 'opponent__first_name', 'opponent__last_name').filter(
-            player=player).annotate(times_played=Count('opponent'), last_played=Max('date_added')).order_by(
-            '-times_played')[:10]
-    except Result.DoesNotExist:
-        raise Http404
+    # Return top 10 played against, from the precomputed pair stats
+    head = []
+    for pair in PairStats.involving(player.id).select_related('player_low', 'player_high').order_by('-played')[:10]:
+        opponent = pair.player_high if pair.player_low_id == player.id else pair.player_low
+        head.append({'opponent': opponent.id, 'opponent__first_name': opponent.first_name,
+                     'opponent__last_name': opponent.last_name, 'times_played': pair.played,
+                     'last_played': pair.last_played})
 
     return render(request, 'ladder/player/history.html', {
         'player': player,
@@ -276,21 +366,23 @@ def player_history(request, player_id):
     })
 
 
+@condition_on_version(_players_state)
 def head_to_head(request, player_id, opponent_id):
     player = get_object_or_404(Player, pk=player_id)
     opponent = get_object_or_404(Player, pk=opponent_id)
 
-    results1 = Result.objects.filter(player=player, opponent=opponent, result__lt=9).order_by(
-        '-ladder__season__end_date')
-    results2 = Result.objects.filter(player=opponent, opponent=player, result__lt=9).order_by(
-        '-ladder__season__end_date')
-
-    results = results1 | results2
-
-    stats = {'won': results2.count(), 'lost': results1.count(), 'played': results1.count() + results2.count()}
+    pair = PairStats.for_pair(player.id, opponent.id)
+    stats = {'won': 0, 'lost': 0, 'played': 0}
+    matches = []
+    if pair is not None:
+        side = pair.for_player(player.id)
+        stats = {'won': side['won'], 'lost': side['lost'], 'played': pair.played}
+        matches = (Match.objects.filter(Q(winner=player, loser=opponent) | Q(winner=opponent, loser=player))
+                   .select_related('ladder__season', 'winner', 'loser')
+                   .order_by('-ladder__season__end_date'))
 
     return render(request, 'ladder/head_to_head/index.html',
-                  {'stats': stats, 'results': results, 'player': player, 'opponent': opponent})
+                  {'stats': stats, 'matches': matches, 'player': player, 'opponent': opponent})
 
 
 def player_result(request):
@@ -298,33 +390,14 @@ def player_result(request):
     if not query:
         raise Http404
 
-    terms = query.split()
-    qs = Player.objects.all()
-
-    if request.user.is_authenticated:
-        # Member view: allow first or last name search
-        for term in terms:
-            qs = qs.filter(Q(first_name__icontains=term) | Q(last_name__icontains=term))
-    else:
-        # Public view: block last-name enumeration
-        if len(terms) == 1:
-            # single token => treat as first name only
-            first = terms[0]
-            qs = qs.filter(first_name__icontains=first)
-        else:
-            # "First L." pattern allowed; ignore full surnames
-            first = terms[0]
-            last_token = terms[-1].rstrip('.')
-            if len(last_token) == 1:
-                qs = qs.filter(first_name__icontains=first, last_name__istartswith=last_token)
-            else:
-                # if they typed a full surname, fall back to first-name search only
-                qs = qs.filter(first_name__icontains=first)
-
-    results = list(qs[:25])  # small cap to avoid enumeration
+    # anonymous users only get first name (plus surname initial) matches, see PlayerNameIndex.search
+    ids = player_index().search(query, request.user.is_authenticated, limit=25)  # small cap to avoid enumeration
+    players = Player.objects.in_bulk(ids)
+    results = [players[i] for i in ids if i in players]
 
     if len(results) == 1:
-        return player_history(request, results[0].id)
+        # sent on rather than rendered here, the player page's validators know nothing of who else the search finds
+        return HttpResponseRedirect(reverse('player_history', args=(results[0].id,)))
 
     # names will be trimmed for anonymous via full_name(authenticated=…)
     return render(
@@ -339,12 +412,10 @@ def player_search(request):
     if len(q) < 2:
         return JsonResponse({"options": []})
 
-    qs = Player.objects.all()
-    for term in q.split():
-        qs = qs.filter(Q(first_name__icontains=term) | Q(last_name__icontains=term))
-
     authed = request.user.is_authenticated
-    options = [{"id": p.id, "label": p.full_name(authenticated=authed)} for p in qs[:10]]
+    ids = player_index().search(q, authed, limit=10)
+    players = Player.objects.in_bulk(ids)
+    options = [{"id": i, "label": players[i].full_name(authenticated=authed)} for i in ids if i in players]
     return JsonResponse({"options": options})
 
 
@@ -353,39 +424,18 @@ def h2h_search(request, player_id):
     if not q:
         raise Http404
 
-    terms = q.split()
-
-    # Start with this player's results
-    qs = Result.objects.filter(player_id=player_id)
-
-    if request.user.is_authenticated:
-        # Allow first OR last name searches
-        for term in terms:
-            qs = qs.filter(
-                Q(opponent__first_name__icontains=term) |
-                Q(opponent__last_name__icontains=term)
-            )
-    else:
-        # Public: block last-name enumeration
-        if len(terms) == 1:
-            qs = qs.filter(opponent__first_name__icontains=terms[0])
-        else:
-            first = terms[0]
-            last_token = terms[-1].rstrip('.')
-            if len(last_token) == 1:  # allow "First L." pattern
-                qs = qs.filter(
-                    opponent__first_name__icontains=first,
-                    opponent__last_name__istartswith=last_token
-                )
-            else:
-                qs = qs.filter(opponent__first_name__icontains=first)
-
-    # Aggregate and order by frequency
-    head = (qs.values('opponent', 'opponent__first_name', 'opponent__last_name')
-              .annotate(times_played=Count('opponent'))
-              .order_by('-times_played')[:10])
-
     authed = request.user.is_authenticated
+    matching = set(player_index().search(q, authed))
+
+    # everyone this player has played, then keep the opponents whose names match
+    head = []
+    for pair in PairStats.involving(player_id).select_related('player_low', 'player_high').order_by('-played'):
+        opponent = pair.player_high if pair.player_low_id == int(player_id) else pair.player_low
+        if opponent.id in matching:
+            head.append({'opponent': opponent.id, 'opponent__first_name': opponent.first_name,
+                         'opponent__last_name': opponent.last_name, 'times_played': pair.played})
+            if len(head) == 10:
+                break
 
     # Build response: { opponent_id: "N x First Last/LastInitial." }
     def masked_name(first, last, authenticated):
@@ -409,6 +459,7 @@ def h2h_search(request, player_id):
     return HttpResponse(json.dumps({"options": results}), content_type="application/json")
 
 
+@condition_on_version(_ajax_season_state)
 def season_ajax_stats(request):
 
     season_id = request.GET.get('id', False)
@@ -422,15 +473,42 @@ def season_ajax_stats(request):
     except ValueError:
         raise Http404
 
-    stats = season_object.get_stats()
-
     include_leader = request.GET.get('leader', False)
-    if include_leader:
-        stats.update(season_object.get_leader_stats(user=request.user))
 
-    return HttpResponse(json.dumps(stats), content_type="application/json")
+    def build():
+        stats = _season_stats([season_object])[season_object.id]
+        if include_leader:
+            frozen = FrozenSeason.of(season_object)
+            if frozen is None:
+                stats.update(season_object.get_leader_stats(user=request.user))
+            else:
+                stats.update(frozen.leader_stats(request.user))
+        return json.dumps(stats)
+
+    version = DataVersion.current(DataVersion.SEASON, season_object.id)
+    key = 'season_ajax_stats:%s:%d' % (version.cache_key(request.user), bool(include_leader))
+    return HttpResponse(cache.get_or_set(key, build, season_object.cache_timeout()),
+                        content_type="application/json")
+
+
+def _stats_batch_ids(request):
+    return [int(season_id) for season_id in request.GET.get('ids', '').split(',') if season_id.isdigit()]
+
+
+def _ajax_stats_batch_state(request):
+    return DataVersion.summary(Q(scope=DataVersion.SEASON, object_id__in=_stats_batch_ids(request)))
 
 
+@condition_on_version(_ajax_stats_batch_state)
+def season_ajax_stats_batch(request):
+    """
+    Stats of many seasons in one request, as ?ids=3,2,1
+    """
+    seasons = Season.objects.filter(pk__in=_stats_batch_ids(request))
+    return HttpResponse(json.dumps({'seasons': _season_stats(seasons)}), content_type="application/json")
+
+
+@condition_on_version(_ajax_progress_state)
 def season_ajax_progress(request):
     season_id = request.GET.get('id', False)
     if season_id is False:
@@ -443,12 +521,31 @@ def season_ajax_progress(request):
     except ValueError:
         raise Http404
 
-    return HttpResponse(json.dumps(season_object.get_progress()), content_type="application/json")
+    compare = list(Season.objects.filter(pk__in=_compare_ids(request)).exclude(pk=season_object.id))
+
+    def build():
+        seasons = [season_object] + compare
+        progress = frozen_values(seasons, 'progress')
+        progress.update(Season.progress_for([season for season in seasons if season.id not in progress]))
+        data = progress[season_object.id]
+        if compare:
+            data['compare'] = [dict(progress[season.id], season_id=season.id, name=str(season))
+                               for season in compare]
+        return json.dumps(data)
+
+    version = DataVersion.current(DataVersion.SEASON, season_object.id)
+    key = 'season_ajax_progress:%s' % version.cache_key(request.user)
+    if compare:
+        token, _ = DataVersion.summary(Q(scope=DataVersion.SEASON, object_id__in=[season.id for season in compare]))
+        key += ':%s:%s' % (','.join(str(season.id) for season in compare), token)
+    return HttpResponse(cache.get_or_set(key, build, season_object.cache_timeout()),
+                        content_type="application/json")
 
 # views.py
 # views.py  (replace the body of result_entry with this improved part)
 
 @login_required
+@never_cache
 def result_entry(request):
     user = request.user
     try:
@@ -464,49 +561,22 @@ def result_entry(request):
     unplayed = _unplayed_opponents_for(me, ladder)
 
     # Entered: only matches where the logged-in player took part
-    entered_raw = (
-        Result.objects
+    matches = (
+        Match.objects
         .filter(ladder=ladder)
-        .filter(Q(player=me) | Q(opponent=me))  # <-- change models.Q -> Q
-        .select_related('player', 'opponent', 'entered_by')
-        .order_by('-date_added')
+        .filter(Q(winner=me) | Q(loser=me))
+        .select_related('winner', 'loser', 'entered_by')
+        .order_by('-date')
     )
 
-    # Collapse mirror rows to a single “match”
-    pairs = {}
-    for r in entered_raw:
-        key = tuple(sorted((r.player_id, r.opponent_id)))
-        pairs.setdefault(key, []).append(r)
-
-    entered = []
-    for (a_id, b_id), rows in pairs.items():
-        if len(rows) == 1:
-            r = rows[0]
-            # find mirror so we can compute losing score reliably
-            try:
-                mirror = Result.objects.get(ladder=ladder, player_id=r.opponent_id, opponent_id=r.player_id)
-                rows = [r, mirror]
-            except Result.DoesNotExist:
-                continue
-
-        # normalize winner/loser
-        ra, rb = rows[0], rows[1]
-        if ra.result == 9:
-            winner_row, loser_row = ra, rb
-        elif rb.result == 9:
-            winner_row, loser_row = rb, ra
-        else:
-            # invalid pair (shouldn’t happen), skip
-            continue
-
-        entered.append({
-            'winner': winner_row.player,
-            'loser': loser_row.player,
-            'losing_score': loser_row.result,
-            'date_added': winner_row.date_added,     # use winner row date
-            'entered_by': winner_row.entered_by or loser_row.entered_by,
-            'pair_key': f'{a_id}-{b_id}',
-        })
+    entered = [{
+        'winner': match.winner,
+        'loser': match.loser,
+        'losing_score': match.losing_score,
+        'date_added': match.date,
+        'entered_by': match.entered_by,
+        'pair_key': match.pair_key,
+    } for match in matches]
 
     # form as before
     result = Result(ladder=ladder, date_added=datetime.datetime.now(), result=0)
@@ -549,10 +619,6 @@ def result_entry_add(request):
     me = user_result.player
     opp = user_result.opponent
 
-    # de-duplicate if the pair already exists
-    Result.objects.filter(ladder=ladder, player=me, opponent=opp).delete()
-    Result.objects.filter(ladder=ladder, player=opp, opponent=me).delete()
-
     # build mirror
     opponent_result = Result(
         ladder=user_result.ladder,
@@ -572,8 +638,13 @@ def result_entry_add(request):
     user_result.entered_by = user
     opponent_result.entered_by = user
 
-    user_result.save()
-    opponent_result.save()
+    with transaction.atomic():
+        # de-duplicate if the pair already exists
+        Result.objects.filter(ladder=ladder, player=me, opponent=opp).delete()
+        Result.objects.filter(ladder=ladder, player=opp, opponent=me).delete()
+
+        user_result.save()
+        opponent_result.save()
 
     return HttpResponseRedirect(reverse('result_entry'))
 
@@ -601,18 +672,10 @@ def result_entry_edit(request, pair_key):
     if not _can_edit(request.user, ladder, a_id, b_id):
         return HttpResponseForbidden()
 
-    # fetch the two rows
-    try:
-        r_ab = Result.objects.get(ladder=ladder, player_id=a_id, opponent_id=b_id)
-        r_ba = Result.objects.get(ladder=ladder, player_id=b_id, opponent_id=a_id)
-    except Result.DoesNotExist:
+    match = Match.for_pair(ladder.id, a_id, b_id).select_related('winner', 'loser').first()
+    if match is None:
         raise Http404
-
-    # normalize to winner/loser
-    if r_ab.result == 9:
-        winner, loser, losing_score = r_ab.player, r_ba.player, r_ba.result
-    else:
-        winner, loser, losing_score = r_ba.player, r_ab.player, r_ab.result
+    winner, loser, losing_score = match.winner, match.loser, match.losing_score
 
     if request.method == 'POST':
         # light friction: require a checkbox confirm and the new losing score
@@ -628,14 +691,14 @@ def result_entry_edit(request, pair_key):
 
             # rewrite both rows
             win_id, lose_id = (a_id, b_id) if new_winner_id == a_id else (b_id, a_id)
-            Result.objects.filter(ladder=ladder, player_id=a_id, opponent_id=b_id).delete()
-            Result.objects.filter(ladder=ladder, player_id=b_id, opponent_id=a_id).delete()
-
             win_row = Result(ladder=ladder, player_id=win_id, opponent_id=lose_id, inaccurate_flag=0,
                              result=9, date_added=datetime.datetime.now(), entered_by=request.user)
             lose_row = Result(ladder=ladder, player_id=lose_id, opponent_id=win_id, inaccurate_flag=0,
                               result=new_losing_score, date_added=win_row.date_added, entered_by=request.user)
-            win_row.save(); lose_row.save()
+            with transaction.atomic():
+                Result.objects.filter(ladder=ladder, player_id=a_id, opponent_id=b_id).delete()
+                Result.objects.filter(ladder=ladder, player_id=b_id, opponent_id=a_id).delete()
+                win_row.save(); lose_row.save()
             messages.success(request, 'Result updated.')
             return HttpResponseRedirect(reverse('result_entry'))
 
@@ -654,8 +717,9 @@ def result_entry_delete(request, pair_key):
     if not _can_edit(request.user, ladder, a_id, b_id):
         return HttpResponseForbidden()
     if request.method == 'POST':
-        Result.objects.filter(ladder=ladder, player_id=a_id, opponent_id=b_id).delete()
-        Result.objects.filter(ladder=ladder, player_id=b_id, opponent_id=a_id).delete()
+        with transaction.atomic():
+            Result.objects.filter(ladder=ladder, player_id=a_id, opponent_id=b_id).delete()
+            Result.objects.filter(ladder=ladder, player_id=b_id, opponent_id=a_id).delete()
         messages.success(request, 'Result removed.')
         return HttpResponseRedirect(reverse('result_entry'))
     return render(request, 'ladder/result/delete_confirm.html', {'pair_key': pair_key, 'ladder': ladder})
@@ -117,6 +117,10 @@ MEDIA_URL = ''
 # Example: "/var/www/example.com/static/"
 STATIC_ROOT = os.path.abspath(os.path.join(SETTINGS_DIR, '..', 'static'))
 
+# Where render_static_archive writes the pre-rendered pages of closed seasons, served by nginx to
+# anonymous visitors (see data/nginx/app.conf.template).
+STATIC_ARCHIVE_ROOT = os.path.abspath(os.path.join(SETTINGS_DIR, '..', 'data', 'archive'))
+
 # URL prefix for static files.
 # Example: "http://example.com/static/", "http://static.example.com/"
 STATIC_URL = '/static/'
@@ -179,10 +183,17 @@ if DEBUG:
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+        },
     }
 }
 
+# Season and ladder renders are keyed by a data version, so this only bounds how long entries for
+# open seasons linger; closed seasons are cached until evicted.
+LADDER_CACHE_TIMEOUT = 60 * 60
+
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
 
 # A sample logging configuration. The only tangible logging